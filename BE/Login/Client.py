@@ -2,8 +2,8 @@ import requests
 
 # 1. Setup
 BASE_URL = "http://127.0.0.1:8000"  # Assuming your FastAPI app runs here
-LOGIN_URL = f"{BASE_URL}/login"
-PROTECTED_URL = f"{BASE_URL}/users/me"
+LOGIN_URL = f"{BASE_URL}/auth/login"
+PROTECTED_URL = f"{BASE_URL}/auth/me"
 
 def main():
     # ---------------------------------------------------------
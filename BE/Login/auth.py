@@ -1,17 +1,34 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-super-secret-key") # Use environment variables in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12")) # bcrypt cost factor (4-31)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "4"))
 
 # Password Hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+# while capping how many cores a login burst can take.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _hash_executor
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -19,6 +36,20 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
+def shutdown_password_hashing():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -29,24 +60,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str, credentials_exception):
+def decode_token(token: str, credentials_exception) -> dict:
+    """Decode and validate a JWT, returning its payload (which always has a 'sub')."""
     try:
-        print(f"Verifying token: {token[:20]}...")  # Debug: show first 20 chars
-        print(f"Using SECRET_KEY: {SECRET_KEY[:10]}...")  # Debug: show first 10 chars of secret
-        
+        logger.debug("Verifying token: %s...", token[:20])
+
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"Token payload: {payload}")  # Debug: show decoded payload
-        
-        username: str = payload.get("sub")
-        if username is None:
-            print("No 'sub' field in token payload")  # Debug
+        logger.debug("Token payload: %s", payload)
+
+        if payload.get("sub") is None:
+            logger.debug("No 'sub' field in token payload")
             raise credentials_exception
-            
-        print(f"Extracted username: {username}")  # Debug
-        return username # lookup username from db here if needed later on
+
+        return payload
     except JWTError as e:
-        print(f"JWT Error: {e}")  # Debug: show actual JWT error
+        logger.debug("JWT Error: %s", e)
         raise credentials_exception
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"General error in verify_token: {e}")  # Debug: catch any other errors
+        logger.debug("General error in verify_token: %s", e)
         raise credentials_exception
+
+def verify_token(token: str, credentials_exception):
+    return decode_token(token, credentials_exception)["sub"] # lookup username from db here if needed later on
@@ -0,0 +1,148 @@
+"""
+Latent business embeddings trained with implicit-feedback ALS
+
+Offline, alternating least squares factorizes the Yelp user x business
+"liked" matrix (Hu, Koren & Volinsky's confidence-weighted formulation:
+every liked pair has preference 1 and confidence 1 + alpha, every other
+pair preference 0 and confidence 1). Only the business factors are kept,
+as float32.
+
+At request time a user is folded in: one f x f solve over the factors of
+the businesses they clicked or swiped, then one dense matvec against all
+business factors and a top-k partition.
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ALS_FILENAME = "als_embeddings.npz"
+ALS_FORMAT = 1
+
+
+def _solve_rows(fixed: np.ndarray, gram: np.ndarray, rows: List[np.ndarray], confidences: List[np.ndarray],
+                reg: float) -> np.ndarray:
+    """Least-squares factors for every row given the other side's `fixed` factors."""
+    factors = fixed.shape[1]
+    out = np.zeros((len(rows), factors), dtype=np.float64)
+    ridge = reg * np.eye(factors)
+    for r, (cols, conf) in enumerate(zip(rows, confidences)):
+        if len(cols) == 0:
+            continue
+        y = fixed[cols]
+        # (YtY + Yt (C - I) Y + reg I) x = Yt C p, with p = 1 on the observed columns
+        a = gram + (y.T * (conf - 1.0)) @ y + ridge
+        b = y.T @ conf
+        out[r] = np.linalg.solve(a, b)
+    return out
+
+
+def train_als(user_items: Iterable[Sequence[str]], factors: int = 32, reg: float = 0.1, alpha: float = 10.0,
+              iterations: int = 10, seed: int = 0) -> "BusinessEmbeddings":
+    """
+    Factorize users' liked-business lists and return the business side.
+
+    Each business a user liked counts once, with confidence 1 + alpha.
+    """
+    item_ids: Dict[str, int] = {}
+    user_rows: List[np.ndarray] = []
+    for items in user_items:
+        ids = [item_ids.setdefault(bid, len(item_ids)) for bid in dict.fromkeys(items)]
+        if ids:
+            user_rows.append(np.asarray(ids, dtype=np.int64))
+
+    n_items = len(item_ids)
+    item_cols: List[list] = [[] for _ in range(n_items)]
+    for u, ids in enumerate(user_rows):
+        for i in ids:
+            item_cols[i].append(u)
+    item_rows = [np.asarray(users, dtype=np.int64) for users in item_cols]
+
+    conf = 1.0 + alpha
+    user_conf = [np.full(len(ids), conf) for ids in user_rows]
+    item_conf = [np.full(len(users), conf) for users in item_rows]
+
+    rng = np.random.default_rng(seed)
+    item_factors = rng.normal(scale=0.01, size=(n_items, factors))
+    user_factors = np.zeros((len(user_rows), factors))
+    for _ in range(iterations):
+        user_factors = _solve_rows(item_factors, item_factors.T @ item_factors, user_rows, user_conf, reg)
+        item_factors = _solve_rows(user_factors, user_factors.T @ user_factors, item_rows, item_conf, reg)
+
+    return BusinessEmbeddings(
+        list(item_ids),
+        item_factors.astype(np.float32),
+        meta={"factors": factors, "reg": reg, "alpha": alpha, "iterations": iterations},
+    )
+
+
+class BusinessEmbeddings:
+    def __init__(self, business_ids: Sequence[str], item_factors: np.ndarray, meta: Optional[dict] = None):
+        self.business_ids = list(business_ids)
+        self.id_to_index = {bid: i for i, bid in enumerate(self.business_ids)}
+        self.item_factors = np.ascontiguousarray(item_factors, dtype=np.float32)
+        self.meta = meta or {}
+        self.reg = float(self.meta.get("reg", 0.1))
+        self.alpha = float(self.meta.get("alpha", 10.0))
+        factors64 = self.item_factors.astype(np.float64)
+        self.gram = factors64.T @ factors64
+
+    def __len__(self) -> int:
+        return len(self.business_ids)
+
+    @property
+    def factors(self) -> int:
+        return self.item_factors.shape[1]
+
+    def fold_in(self, history: Sequence[Tuple[str, float]]) -> Optional[np.ndarray]:
+        """
+        Project (business_id, weight) interactions into the latent space.
+
+        A weight w scales the confidence to 1 + alpha * w, so a swipe weighted
+        3x counts like three clicks. Returns None if no business is known.
+        """
+        weights: Dict[int, float] = {}
+        for bid, weight in history:
+            idx = self.id_to_index.get(bid)
+            if idx is not None:
+                weights[idx] = weights.get(idx, 0.0) + weight
+        if not weights:
+            return None
+        cols = np.fromiter(weights, dtype=np.int64, count=len(weights))
+        conf = 1.0 + self.alpha * np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        y = self.item_factors[cols].astype(np.float64)
+        a = self.gram + (y.T * (conf - 1.0)) @ y + self.reg * np.eye(self.factors)
+        return np.linalg.solve(a, y.T @ conf).astype(np.float32)
+
+    def recommend(self, history: Sequence[Tuple[str, float]], top_k: int = 10,
+                  exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Top `top_k` (business_id, score) for the folded-in history, skipping `exclude`."""
+        user_vector = self.fold_in(history)
+        if user_vector is None:
+            return []
+        scores = self.item_factors @ user_vector
+        excluded = [self.id_to_index[bid] for bid in exclude if bid in self.id_to_index]
+        if excluded:
+            scores[excluded] = -np.inf
+        k = min(top_k, len(scores) - len(excluded))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.business_ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            business_ids=np.asarray(self.business_ids),
+            item_factors=self.item_factors,
+            meta=np.asarray(json.dumps({"format": ALS_FORMAT, **self.meta})),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BusinessEmbeddings":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != ALS_FORMAT:
+                raise ValueError(f"{path}: unsupported embeddings format {meta.get('format')}")
+            return cls(data["business_ids"].tolist(), data["item_factors"], meta)
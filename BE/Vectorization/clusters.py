@@ -0,0 +1,174 @@
+"""
+Taste clusters: precomputed rankings for groups of similar Yelp users
+
+Offline, spherical k-means (cosine similarity on the unit category
+vectors) groups the Yelp users into taste clusters. Each centroid is
+scored against every restaurant once, like an aggregated neighbor vector
+would be, and its top businesses are stored CSR-style: the list of
+cluster c is businesses[indptr[c]:indptr[c + 1]].
+
+At request time the user's profile is compared with the centroids (one
+small matvec), the nearest few clusters are picked and their lists merged,
+each weighted by its similarity to the user. There is no neighbor search
+and no full ranking pass.
+"""
+import json
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .quantize import top_k_indices
+except ImportError:  # imported as a top-level module (tests, scripts run from this folder)
+    from quantize import top_k_indices
+
+TASTE_CLUSTERS_FILENAME = "taste_clusters.npz"
+TASTE_CLUSTERS_FORMAT = 1
+CHUNK_ROWS = 65536
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest centroid (by cosine) of every row, and that similarity, chunk by chunk."""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    similarity = np.empty(len(vectors), dtype=np.float64)
+    for start in range(0, len(vectors), CHUNK_ROWS):
+        sims = vectors[start:start + CHUNK_ROWS] @ centroids.T
+        labels[start:start + CHUNK_ROWS] = sims.argmax(axis=1)
+        similarity[start:start + CHUNK_ROWS] = sims.max(axis=1)
+    return labels, similarity
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 20,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster unit rows by cosine similarity; returns (unit centroids, labels).
+
+    Seeded with k-means++ (on 1 - cosine). A cluster that loses all its rows
+    is re-seeded with the row currently worst served by its centroid.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    n_clusters = min(n_clusters, n)
+    centroids = np.empty((n_clusters, vectors.shape[1]))
+    centroids[0] = vectors[rng.integers(n)]
+    distance = 1.0 - vectors @ centroids[0]
+    for c in range(1, n_clusters):
+        weights = np.clip(distance, 0, None)
+        total = weights.sum()
+        pick = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centroids[c] = vectors[pick]
+        np.minimum(distance, 1.0 - vectors @ centroids[c], out=distance)
+
+    labels = np.zeros(n, dtype=np.int64)
+    for _ in range(iterations):
+        labels, similarity = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = np.flatnonzero(~sums.any(axis=1))
+        for c, row in zip(empty, np.argsort(similarity)[:len(empty)]):
+            sums[c] = vectors[row]
+        updated = _normalize_rows(sums)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    labels, _ = _assign(vectors, centroids)
+    return centroids, labels
+
+
+def build_taste_clusters(user_vectors: np.ndarray, restaurant_vectors: np.ndarray, business_ids: Sequence[str],
+                         n_clusters: int = 256, list_size: int = 500, iterations: int = 20, seed: int = 0,
+                         meta: Optional[dict] = None) -> "TasteClusters":
+    """
+    Cluster the Yelp user vectors and rank `list_size` businesses per centroid.
+
+    `restaurant_vectors` rows line up with `business_ids`. `meta` is stored
+    with the clusters (e.g. the category vocabulary version).
+    """
+    centroids, labels = spherical_kmeans(user_vectors, n_clusters, iterations, seed)
+    indptr = [0]
+    businesses: List[np.ndarray] = []
+    scores: List[np.ndarray] = []
+    for centroid in centroids:
+        ranked_scores = restaurant_vectors @ centroid
+        top = top_k_indices(ranked_scores, list_size)
+        businesses.append(top.astype(np.int32))
+        scores.append(ranked_scores[top].astype(np.float32))
+        indptr.append(indptr[-1] + len(top))
+
+    sizes = np.bincount(labels, minlength=len(centroids))
+    return TasteClusters(
+        business_ids,
+        centroids.astype(np.float32),
+        np.asarray(indptr, dtype=np.int64),
+        np.concatenate(businesses) if businesses else np.zeros(0, dtype=np.int32),
+        np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32),
+        meta={**(meta or {}), "n_clusters": len(centroids), "list_size": list_size, "iterations": iterations,
+              "largest_cluster": int(sizes.max(initial=0)), "users": len(user_vectors)},
+    )
+
+
+class TasteClusters:
+    def __init__(self, business_ids: Sequence[str], centroids: np.ndarray, indptr: np.ndarray,
+                 businesses: np.ndarray, scores: np.ndarray, meta: Optional[dict] = None):
+        self.business_ids = list(business_ids)
+        self.id_to_index = {bid: i for i, bid in enumerate(self.business_ids)}
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.indptr = indptr
+        self.businesses = businesses
+        self.scores = scores
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.centroids)
+
+    def nearest(self, user_vector: np.ndarray, n_probe: int = 3) -> List[Tuple[int, float]]:
+        """(cluster, cosine) of the `n_probe` centroids closest to the user, positive similarity only."""
+        sims = self.centroids @ user_vector.astype(np.float32, copy=False)
+        return [(int(c), float(sims[c])) for c in top_k_indices(sims, n_probe) if sims[c] > 0]
+
+    def recommend(self, user_vector: np.ndarray, top_k: int = 10, exclude: Iterable[str] = (),
+                  n_probe: int = 3) -> List[Tuple[str, float]]:
+        """
+        Merge the ranked lists of the nearest clusters, skipping `exclude`.
+
+        A business's score is the sum over probed clusters of
+        (cluster similarity x its score in that cluster's list).
+        """
+        probes = self.nearest(user_vector, n_probe)
+        if not probes:
+            return []
+        ids = np.concatenate([self.businesses[self.indptr[c]:self.indptr[c + 1]] for c, _ in probes])
+        contributions = np.concatenate([self.scores[self.indptr[c]:self.indptr[c + 1]] * sim for c, sim in probes])
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=contributions)
+
+        excluded = [self.id_to_index[bid] for bid in exclude if bid in self.id_to_index]
+        if excluded:
+            keep = ~np.isin(unique_ids, excluded)
+            unique_ids, totals = unique_ids[keep], totals[keep]
+        return [(self.business_ids[unique_ids[i]], float(totals[i])) for i in top_k_indices(totals, top_k)]
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            business_ids=np.asarray(self.business_ids),
+            centroids=self.centroids,
+            indptr=self.indptr,
+            businesses=self.businesses,
+            scores=self.scores,
+            meta=np.asarray(json.dumps({"format": TASTE_CLUSTERS_FORMAT, **self.meta})),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TasteClusters":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != TASTE_CLUSTERS_FORMAT:
+                raise ValueError(f"{path}: unsupported taste clusters format {meta.get('format')}")
+            return cls(data["business_ids"].tolist(), data["centroids"], data["indptr"], data["businesses"],
+                       data["scores"], meta)
@@ -0,0 +1,155 @@
+"""
+Item-item co-occurrence recommender
+
+Offline, every pair of businesses rated highly by the same Yelp user gets a
+co-occurrence count. Counts are turned into cosine similarities
+(c_ij / sqrt(n_i * n_j)) and only the top-N neighbors of each business are
+kept, stored CSR-style: the neighbors of business i are
+neighbors[indptr[i]:indptr[i + 1]].
+
+At request time a user's clicked/swiped businesses look up their neighbor
+lists and the scores are summed, so the cost depends on the history length
+and N, never on the number of businesses or Yelp users.
+"""
+import json
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+COOCCURRENCE_FILENAME = "cooccurrence_index.npz"
+COOCCURRENCE_FORMAT = 1
+
+
+def build_cooccurrence(user_items: Iterable[Sequence[str]], top_n: int = 50, min_support: int = 2,
+                       max_items_per_user: int = 200) -> "CooccurrenceIndex":
+    """
+    Build the pruned similarity table from each user's highly rated businesses.
+
+    Users with more than `max_items_per_user` businesses only contribute their
+    first ones: pair counting is quadratic per user, and a handful of prolific
+    reviewers would otherwise dominate both the cost and the neighbors.
+    Pairs seen fewer than `min_support` times are dropped as noise.
+    """
+    item_ids: Dict[str, int] = {}
+    item_counts: List[int] = []
+    pair_counts: Dict[int, Counter] = defaultdict(Counter)
+
+    for items in user_items:
+        ids = []
+        for bid in dict.fromkeys(items):  # dedupe, keep order
+            idx = item_ids.get(bid)
+            if idx is None:
+                idx = item_ids[bid] = len(item_counts)
+                item_counts.append(0)
+            ids.append(idx)
+            if len(ids) == max_items_per_user:
+                break
+        for idx in ids:
+            item_counts[idx] += 1
+        for a in ids:
+            counts = pair_counts[a]
+            for b in ids:
+                if a != b:
+                    counts[b] += 1
+
+    business_ids = list(item_ids)
+    n_items = np.asarray(item_counts, dtype=np.float64)
+    indptr = [0]
+    neighbors: List[int] = []
+    scores: List[float] = []
+    for a in range(len(business_ids)):
+        candidates = [(b, c) for b, c in pair_counts.get(a, {}).items() if c >= min_support]
+        if candidates:
+            ids = np.fromiter((b for b, _ in candidates), dtype=np.int64, count=len(candidates))
+            counts = np.fromiter((c for _, c in candidates), dtype=np.float64, count=len(candidates))
+            sims = counts / np.sqrt(n_items[a] * n_items[ids])
+            # Ties broken by neighbor id so the table is reproducible
+            order = np.lexsort((ids, -sims))[:top_n]
+            neighbors.extend(ids[order].tolist())
+            scores.extend(sims[order].tolist())
+        indptr.append(len(neighbors))
+
+    return CooccurrenceIndex(
+        business_ids,
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(neighbors, dtype=np.int32),
+        np.asarray(scores, dtype=np.float32),
+        meta={"top_n": top_n, "min_support": min_support, "max_items_per_user": max_items_per_user},
+    )
+
+
+class CooccurrenceIndex:
+    def __init__(self, business_ids: Sequence[str], indptr: np.ndarray, neighbors: np.ndarray,
+                 scores: np.ndarray, meta: Optional[dict] = None):
+        self.business_ids = list(business_ids)
+        self.id_to_index = {bid: i for i, bid in enumerate(self.business_ids)}
+        self.indptr = indptr
+        self.neighbors = neighbors
+        self.scores = scores
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.business_ids)
+
+    def neighbors_of(self, business_id: str) -> List[Tuple[str, float]]:
+        idx = self.id_to_index.get(business_id)
+        if idx is None:
+            return []
+        start, end = self.indptr[idx], self.indptr[idx + 1]
+        return [(self.business_ids[j], float(s)) for j, s in zip(self.neighbors[start:end], self.scores[start:end])]
+
+    def recommend(self, history: Sequence[Tuple[str, float]], top_k: int = 10,
+                  exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Sum the weighted neighbor lists of the (business_id, weight) history.
+
+        Returns up to `top_k` (business_id, score) pairs, best first, skipping
+        `exclude`. Businesses unknown to the index contribute nothing.
+        """
+        slices, weights = [], []
+        for bid, weight in history:
+            idx = self.id_to_index.get(bid)
+            if idx is None:
+                continue
+            start, end = self.indptr[idx], self.indptr[idx + 1]
+            if end > start:
+                slices.append(slice(start, end))
+                weights.append(weight)
+        if not slices:
+            return []
+
+        ids = np.concatenate([self.neighbors[s] for s in slices])
+        contributions = np.concatenate([self.scores[s] * w for s, w in zip(slices, weights)])
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=contributions)
+
+        excluded = {self.id_to_index[bid] for bid in exclude if bid in self.id_to_index}
+        if excluded:
+            keep = ~np.isin(unique_ids, list(excluded))
+            unique_ids, totals = unique_ids[keep], totals[keep]
+
+        k = min(top_k, len(unique_ids))
+        if k == 0:
+            return []
+        top = np.argpartition(-totals, k - 1)[:k]
+        top = top[np.lexsort((unique_ids[top], -totals[top]))]
+        return [(self.business_ids[unique_ids[i]], float(totals[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            business_ids=np.asarray(self.business_ids),
+            indptr=self.indptr,
+            neighbors=self.neighbors,
+            scores=self.scores,
+            meta=np.asarray(json.dumps({"format": COOCCURRENCE_FORMAT, **self.meta})),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CooccurrenceIndex":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != COOCCURRENCE_FORMAT:
+                raise ValueError(f"{path}: unsupported co-occurrence index format {meta.get('format')}")
+            return cls(data["business_ids"].tolist(), data["indptr"], data["neighbors"], data["scores"], meta)
@@ -0,0 +1,88 @@
+"""
+Maximal-marginal-relevance re-ranking
+
+The best-scored candidates often share one category set (twenty "Pizza,
+Restaurants" in a row), because their scores tie. MMR picks the top k
+greedily, each time taking the candidate with the best
+
+    (1 - diversity) * relevance - diversity * (max similarity to those already picked)
+
+Relevance is the candidate's score divided by the largest one, so the
+weight means the same for every engine. Similarities are cosines of the
+candidates' category vectors. Each pick costs one matrix-vector product
+(the picked row against all N) and a vectorized max/argmax, so the pass is
+k numpy steps and never builds the full N x N matrix.
+
+A deep list (a page of infinite scroll) can keep its head identical to a
+short request's: with `head` and `head_candidates`, the first `head` picks
+only consider the first `head_candidates` candidates, exactly what an MMR
+pass over that shorter candidate list picks, and the rest of the picks
+continue from there over all N.
+"""
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def category_columns(business_index: dict, cat_to_index: Dict[str, int]) -> Dict[str, Tuple[int, ...]]:
+    """business_id -> vector columns of its categories, computed once at load time."""
+    return {
+        bid: tuple(cat_to_index[cat] for cat in categories if cat in cat_to_index)
+        for bid, categories in business_index.items()
+    }
+
+
+def category_matrix(business_ids: Sequence[str], columns: Dict[str, Tuple[int, ...]],
+                    n_categories: int) -> np.ndarray:
+    """L2-normalized category indicator rows (float32), one per business."""
+    per_row = [columns.get(bid, ()) for bid in business_ids]
+    lengths = np.fromiter(map(len, per_row), dtype=np.int64, count=len(per_row))
+    rows = np.repeat(np.arange(len(per_row)), lengths)
+    cols = np.fromiter(chain.from_iterable(per_row), dtype=np.int64, count=int(lengths.sum()))
+    matrix = np.zeros((len(per_row), n_categories), dtype=np.float32)
+    # A row with n categories has n entries of 1/sqrt(n): unit length without a norm pass
+    matrix[rows, cols] = 1.0 / np.sqrt(lengths[rows])
+    return matrix
+
+
+def mmr_order(scores: np.ndarray, vectors: np.ndarray, top_k: int, diversity: float, head: int = 0,
+              head_candidates: Optional[int] = None) -> List[int]:
+    """Indices of the `top_k` candidates picked by MMR, in pick order."""
+    n = len(scores)
+    k = min(top_k, n)
+    if k == 0:
+        return []
+    head_candidates = n if head_candidates is None else max(min(head_candidates, n), 1)
+    scores = np.asarray(scores, dtype=np.float64)
+    # Scaled by the head's candidates, like a pass over only those would be
+    scale = np.abs(scores[:head_candidates] if head else scores).max()
+    relevance = (1.0 - diversity) * (scores / scale if scale > 0 else np.ones(n))
+
+    max_similarity = np.zeros(n, dtype=np.float32)
+    gain = np.empty(n)
+    picked = []
+    for i in range(k):
+        np.multiply(max_similarity, -diversity, out=gain)
+        gain += relevance
+        best = int(gain[:head_candidates].argmax() if i < head else gain.argmax())
+        picked.append(best)
+        relevance[best] = -np.inf  # never picked twice
+        np.maximum(max_similarity, vectors @ vectors[best], out=max_similarity)
+    return picked
+
+
+def mmr_rerank(ranked: Sequence[Tuple[str, float]], columns: Dict[str, Tuple[int, ...]], n_categories: int,
+               top_k: int, diversity: float, head: int = 0,
+               head_candidates: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Re-rank (business_id, score) candidates by MMR, keeping their scores.
+
+    `diversity` 0 keeps the score order; 1 ignores scores and only spreads
+    categories. See mmr_order() for `head` and `head_candidates`.
+    """
+    if diversity <= 0 or len(ranked) <= 1:
+        return list(ranked[:top_k])
+    vectors = category_matrix([bid for bid, _ in ranked], columns, n_categories)
+    scores = np.fromiter((score for _, score in ranked), dtype=np.float64, count=len(ranked))
+    return [ranked[i] for i in mmr_order(scores, vectors, top_k, diversity, head, head_candidates)]
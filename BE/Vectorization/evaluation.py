@@ -0,0 +1,81 @@
+"""
+Offline evaluation of recommendation quality
+
+split_recent_likes() holds out every Yelp user's most recent liked
+reviews, so the indexes are built only from what came before them, exactly
+as if those reviews had not happened yet. An engine is then asked for top-k
+recommendations from the remaining history and scored against the held-out
+businesses:
+
+- recall@k: fraction of the held-out businesses in the top k
+- NDCG@k: the same, discounted by rank (1 at the top, 1/log2(r + 1) at r)
+- catalog coverage: distinct businesses recommended over all queries,
+  divided by the catalog size
+"""
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (history, held-out businesses) of one evaluated user
+EvaluationCase = Tuple[List[str], List[str]]
+
+
+def split_recent_likes(reviews: Iterable[Tuple[str, str, float, Optional[str]]], holdout: int = 1,
+                       min_history: int = 2, min_stars: float = 4.0
+                       ) -> Tuple[Dict[str, List[str]], Dict[str, EvaluationCase]]:
+    """
+    Split (user_id, business_id, stars, date) reviews into (train likes, cases).
+
+    A like is a review of `min_stars` or more; each user's likes are ordered
+    by date, with reviews without a date (or on the same date) in input
+    order, and repeat likes of a business count once. Users with at least
+    `holdout + min_history` distinct likes lose their last `holdout` from
+    the train likes and get a case (history, held out).
+    """
+    dated: Dict[str, List[Tuple[str, int, str]]] = {}
+    for position, (user_id, bid, stars, date) in enumerate(reviews):
+        if stars is not None and stars >= min_stars:
+            dated.setdefault(user_id, []).append((date or "", position, bid))
+
+    train: Dict[str, List[str]] = {}
+    cases: Dict[str, EvaluationCase] = {}
+    for user_id, likes in dated.items():
+        ordered = [bid for _, _, bid in sorted(likes)]
+        distinct = list(dict.fromkeys(ordered))
+        if len(distinct) < holdout + min_history:
+            train[user_id] = ordered
+            continue
+        history, held_out = distinct[:-holdout], distinct[-holdout:]
+        held = set(held_out)
+        train[user_id] = [bid for bid in ordered if bid not in held]
+        cases[user_id] = (history, held_out)
+    return train, cases
+
+
+def sample_cases(cases: Dict[str, EvaluationCase], n: int, seed: int = 0) -> List[EvaluationCase]:
+    """`n` cases picked reproducibly (all of them if `n` is 0 or more than there are)."""
+    users = sorted(cases)
+    if 0 < n < len(users):
+        users = random.Random(seed).sample(users, n)
+    return [cases[uid] for uid in users]
+
+
+def recall_at_k(ranked: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(ranked[:k]) & set(relevant)) / len(set(relevant))
+
+
+def ndcg_at_k(ranked: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    relevant = set(relevant)
+    if not relevant:
+        return 0.0
+    dcg = sum(1 / math.log2(rank + 2) for rank, bid in enumerate(ranked[:k]) if bid in relevant)
+    ideal = sum(1 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal
+
+
+def catalog_coverage(recommendations: Iterable[Sequence[str]], catalog_size: int) -> float:
+    if catalog_size <= 0:
+        return 0.0
+    return len({bid for ranked in recommendations for bid in ranked}) / catalog_size
@@ -124,18 +124,6 @@ class RestaurantRecommendationSystem:
             finally:
                 await db.close()
 
-    async def get_all_users_with_clicks(self) -> List[str]:
-        """Get all user IDs that have click history."""
-        async for db in get_async_db():
-            try:
-                result = await db.execute(
-                    select(UserClick.user_id).distinct()
-                )
-                user_ids = result.scalars().all()
-                return [str(uid) for uid in user_ids]
-            finally:
-                await db.close()
-
     def get_recommendations_for_user(self, user_clicks: List[str], top_k: int = 10) -> List[Tuple[str, float, List[str]]]:
         """
         Get restaurant recommendations for a simulated user.
@@ -199,57 +187,10 @@ class RestaurantRecommendationSystem:
         
         return user_profiles
 
-    async def run_with_real_users(self):
-        """Run the recommendation system with real users from the database."""
-        print(" Starting Restaurant Recommendation with Real Users")
-        print("=" * 60)
-        
-        # Get users with click history from database
-        users_with_clicks = await self.get_all_users_with_clicks()
-        
-        if not users_with_clicks:
-            print("⚠️  No users with click history found in database")
-            print("   Add some click data first using the /tracking/click API")
-            return
-            
-        print(f"📊 Found {len(users_with_clicks)} users with click history")
-        
-        # Process first few users (limit for demo)
-        for i, user_id in enumerate(users_with_clicks[:5], 1):
-            print(f"\n USER {i}: {user_id}")
-            
-            # Get real user clicks from database
-            user_clicks = await self.get_user_clicks_from_database(user_id)
-            print(f"📊 User has {len(user_clicks)} restaurant clicks")
-            
-            if not user_clicks:
-                print("   No clicks found for this user")
-                continue
-            
-            # Use your existing algorithm to get recommendations
-            recommendations = self.get_recommendations_for_user(user_clicks, top_k=10)
-            
-            print(f"\n TOP 10 RESTAURANT RECOMMENDATIONS:")
-            print("-" * 50)
-            
-            for rank, (bid, score, categories) in enumerate(recommendations, 1):
-                # Use actual restaurant name if available, otherwise fallback to business ID
-                display_name = self.business_names.get(bid, f"Business {bid[:8]}...")
-                print(f"{rank:2d}. {display_name}")
-                print(f"    Score: {score:.4f}")
-                print(f"    Categories: {', '.join(categories[:3])}{'...' if len(categories) > 3 else ''}")
-                print()
-            
-            if not recommendations:
-                print(" No recommendations could be generated for this user")
-            
-            print("=" * 60)
-
 async def main():
-    """Main function to run the restaurant recommendation system with real database users."""
+    """Load the indexes and report their sizes; batch recommendations come from api.precompute."""
     
     print(" Food Recommendation System")
-    print(" Using Real User Data from Database")
     print("\n Expected Index Paths:")
     print("   - Business Index: BE/data_extraction/complete_business_index.json")
     print("   - Category Reviews: BE/data_extraction/category_review_index.json")
@@ -259,19 +200,19 @@ async def main():
         # Initialize the recommendation system
         rec_system = RestaurantRecommendationSystem()
         
-        # Run with real users from database
-        await rec_system.run_with_real_users()
-         
+        # Ranking every user with click history is the batch job's work now
+        print("\n Recommendations for every user with click history are written by:")
+        print("   python -m api.precompute   (run from BE/)")
+
         print("\n System Complete!")
         print("\n Summary:")
         print(f"   - Total Businesses in Index: {len(rec_system.business_index)}")
         print(f"   - Total Food Categories: {len(FOOD_CATEGORIES)}")
         print(f"   - Yelp Users with Vectors: {len(rec_system.yelp_user_vectors)}")
-        print(f"   - Using Real User Click Data from Database")
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        print("   Make sure your database is running and contains user click data")
+        print("   Make sure the index files above exist")
 
 # API Integration Function
 async def get_recommendations_for_user_api(user_id: str, top_k: int = 10) -> Dict:
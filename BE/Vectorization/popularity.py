@@ -0,0 +1,131 @@
+"""
+Precomputed popularity lists for users with no history
+
+Offline, every business gets a Bayesian-average rating: its Yelp stars
+shrunk toward the catalogue mean by `prior_count` pseudo-reviews, so a 5.0
+with 3 reviews does not outrank a 4.5 with 2,000. Businesses are then
+ranked globally, per city and per category, and only the top N of each
+list is kept.
+
+At request time a list is a lookup and a slice: O(k), independent of the
+catalogue size.
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+POPULARITY_FILENAME = "popularity_lists.json"
+POPULARITY_FORMAT = 1
+
+
+def _key(name: str) -> str:
+    return name.strip().lower()
+
+
+def popularity_score(stars: float, review_count: int, mean_stars: float, prior_count: float) -> float:
+    """Stars averaged with `prior_count` reviews at `mean_stars`."""
+    return (review_count * stars + prior_count * mean_stars) / (review_count + prior_count)
+
+
+def build_popularity(businesses: Iterable[Tuple[str, Optional[str], Sequence[str], float, int]],
+                     top_n: int = 200, prior_count: float = 25.0) -> "PopularityLists":
+    """
+    Rank (business_id, city, categories, stars, review_count) rows.
+
+    Rows without stars are skipped. Ties are broken by review count, then id,
+    so the lists are reproducible.
+    """
+    rows = [(bid, city, categories, float(stars), int(review_count or 0))
+            for bid, city, categories, stars, review_count in businesses if bid and stars is not None]
+    reviews = sum(count for *_, count in rows)
+    mean_stars = sum(stars * count for *_, stars, count in rows) / reviews if reviews else 0.0
+
+    scored = sorted(
+        ((round(popularity_score(stars, count, mean_stars, prior_count), 4), count, bid, city, categories)
+         for bid, city, categories, stars, count in rows),
+        key=lambda row: (-row[0], -row[1], row[2]),
+    )
+
+    top_global: List[Tuple[str, float]] = []
+    by_city: Dict[str, List[Tuple[str, float]]] = {}
+    by_category: Dict[str, List[Tuple[str, float]]] = {}
+    for score, _, bid, city, categories in scored:
+        if len(top_global) < top_n:
+            top_global.append((bid, score))
+        if city:
+            ranked = by_city.setdefault(_key(city), [])
+            if len(ranked) < top_n:
+                ranked.append((bid, score))
+        for category in categories:
+            ranked = by_category.setdefault(category, [])
+            if len(ranked) < top_n:
+                ranked.append((bid, score))
+
+    return PopularityLists(
+        top_global, by_city, by_category,
+        meta={"top_n": top_n, "prior_count": prior_count, "mean_stars": round(mean_stars, 4)},
+    )
+
+
+class PopularityLists:
+    def __init__(self, top_global: List[Tuple[str, float]], by_city: Dict[str, List[Tuple[str, float]]],
+                 by_category: Dict[str, List[Tuple[str, float]]], meta: Optional[dict] = None):
+        self.top_global = [(bid, float(score)) for bid, score in top_global]
+        self.by_city = {city: [(bid, float(score)) for bid, score in ranked] for city, ranked in by_city.items()}
+        self.by_category = {cat: [(bid, float(score)) for bid, score in ranked] for cat, ranked in by_category.items()}
+        self.meta = meta or {}
+        # Cuisine names as users type them ("italian", " Sushi Bars") -> category
+        self._category_keys = {_key(cat): cat for cat in self.by_category}
+
+    def __len__(self) -> int:
+        return len(self.top_global)
+
+    def category_for(self, name: Optional[str]) -> Optional[str]:
+        """The category matching a free-text cuisine name, case-insensitively, if any."""
+        return self._category_keys.get(_key(name)) if name else None
+
+    def top(self, top_k: int = 10, city: Optional[str] = None, category: Optional[str] = None,
+            exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Up to `top_k` (business_id, score) pairs, skipping `exclude`.
+
+        Draws from the `category` list first, then the `city` list, then the
+        global list, so an unknown or exhausted seed still fills the page.
+        """
+        sources = []
+        if category is not None:
+            sources.append(self.by_category.get(self.category_for(category) or category, ()))
+        if city:
+            sources.append(self.by_city.get(_key(city), ()))
+        sources.append(self.top_global)
+
+        taken = set(exclude)
+        out: List[Tuple[str, float]] = []
+        for ranked in sources:
+            for bid, score in ranked:
+                if bid not in taken:
+                    taken.add(bid)
+                    out.append((bid, score))
+                    if len(out) == top_k:
+                        return out
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "format":      POPULARITY_FORMAT,
+            "meta":        self.meta,
+            "global":      self.top_global,
+            "by_city":     self.by_city,
+            "by_category": self.by_category,
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "PopularityLists":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != POPULARITY_FORMAT:
+            raise ValueError(f"{path}: unsupported popularity lists format {data.get('format')}")
+        return cls(data["global"], data["by_city"], data["by_category"], data.get("meta"))
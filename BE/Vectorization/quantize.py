@@ -0,0 +1,136 @@
+"""
+Quantized storage for the user and restaurant category vectors
+
+A QuantizedMatrix keeps one vector per row as float64, float32, float16 or
+int8. int8 rows are scaled symmetrically: row i is stored as
+round(x / scale_i) with scale_i = max|x_i| / 127, and scale_i is applied
+after the dot product, so scoring never materializes the float matrix.
+float16 and int8 rows are upcast to float32 a chunk at a time, so the
+temporary memory is bounded by CHUNK_ROWS no matter how many rows there are.
+
+quantization_report() scores the same queries at full precision and at
+each candidate dtype and reports top-k overlap and score error, to pick the
+smallest representation that keeps rankings stable.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+VECTOR_DTYPES = ("float64", "float32", "float16", "int8")
+CHUNK_ROWS = 2048  # keeps each upcast chunk (2048 x categories float32) in cache
+INT8_MAX = 127
+
+
+class QuantizedMatrix:
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None, ids: Optional[Sequence[str]] = None):
+        self.data = data
+        self.scales = scales  # per-row float32 scales, int8 only
+        self.ids = list(ids) if ids is not None else None
+        self.id_to_index: Dict[str, int] = {rid: i for i, rid in enumerate(self.ids)} if ids is not None else {}
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray, dtype: str = "float64",
+                   ids: Optional[Sequence[str]] = None) -> "QuantizedMatrix":
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"dtype must be one of: {', '.join(VECTOR_DTYPES)}")
+        if dtype != "int8":
+            return cls(np.ascontiguousarray(matrix, dtype=dtype), ids=ids)
+        peaks = np.abs(matrix).max(axis=1) if len(matrix) else np.zeros(0)
+        scales = np.where(peaks > 0, peaks / INT8_MAX, 1.0).astype(np.float32)
+        data = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return cls(data, scales, ids=ids)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def dtype(self) -> str:
+        return self.data.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Dot product of every row with `query`."""
+        if self.data.dtype in (np.float64, np.float32):
+            return self.data @ query.astype(self.data.dtype, copy=False)
+        query = query.astype(np.float32, copy=False)
+        out = np.empty(len(self.data), dtype=np.float32)
+        for start in range(0, len(self.data), CHUNK_ROWS):
+            end = start + CHUNK_ROWS
+            np.matmul(self.data[start:end].astype(np.float32), query, out=out[start:end])
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def rows(self, indices) -> np.ndarray:
+        """Dequantized rows, as float64."""
+        rows = self.data[indices].astype(np.float64)
+        if self.scales is not None:
+            rows *= self.scales[indices, None]
+        return rows
+
+    def top_k(self, query: np.ndarray, k: int):
+        """(row indices, scores) of the `k` best rows for `query`."""
+        scores = self.scores(query)
+        top = top_k_indices(scores, k)
+        return top, scores[top]
+
+
+def top_k_indices(scores: np.ndarray, k: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the `k` highest scores, best first, skipping `exclude`.
+
+    Equal scores keep row order, exactly like a stable sort of the whole
+    array, but only the rows at or above the k-th score are sorted.
+    """
+    if exclude is not None and len(exclude):
+        scores = scores.astype(np.float64)
+        scores[exclude] = -np.inf
+        n = len(scores) - len(np.unique(exclude))
+    else:
+        n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+    candidates = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((candidates, -scores[candidates]))[:k]
+    return candidates[order]
+
+
+def quantization_report(matrix: np.ndarray, queries: np.ndarray, k: int = 10,
+                        dtypes: Sequence[str] = VECTOR_DTYPES) -> List[dict]:
+    """
+    Compare each dtype against float64 on the same queries.
+
+    `topk_overlap` is the mean fraction of the float64 top k that the dtype
+    also returns (1.0 = identical sets); `min_topk_overlap` the worst query.
+    Score errors are absolute differences over every row and query.
+    """
+    exact = QuantizedMatrix.from_dense(matrix, "float64")
+    exact_scores = [exact.scores(q) for q in queries]
+    exact_top = [set(top_k_indices(s, k).tolist()) for s in exact_scores]
+
+    report = []
+    for dtype in dtypes:
+        quantized = QuantizedMatrix.from_dense(matrix, dtype)
+        overlaps, max_error, error_sum, count = [], 0.0, 0.0, 0
+        for query, scores, top in zip(queries, exact_scores, exact_top):
+            approx = quantized.scores(query)
+            if top:
+                overlaps.append(len(top & set(top_k_indices(approx, k).tolist())) / len(top))
+            error = np.abs(approx.astype(np.float64) - scores)
+            max_error = max(max_error, float(error.max(initial=0.0)))
+            error_sum += float(error.sum())
+            count += len(error)
+        report.append({
+            "dtype":            dtype,
+            "bytes":            quantized.nbytes,
+            "topk_overlap":     round(float(np.mean(overlaps)), 4) if overlaps else 1.0,
+            "min_topk_overlap": round(float(np.min(overlaps)), 4) if overlaps else 1.0,
+            "max_abs_error":    max_error,
+            "mean_abs_error":   error_sum / count if count else 0.0,
+        })
+    return report
@@ -0,0 +1,124 @@
+"""
+Per-user Bloom filter of every business the user has clicked or swiped
+
+A bit array holds the user's whole history, however long, so ranking can
+exclude it without fetching it. It starts at RECOMMENDATION_SEEN_FILTER_BITS
+(2 KB by default) and is rebuilt twice as large, or larger, whenever the
+expected false-positive rate of its count passes the configured limit
+(see bits_for()). Bits are derived from the business id itself, not from its
+row in an index, so a stored filter stays valid when the indexes are
+rebuilt from new data.
+
+BloomPositions hashes a list of business ids once (e.g. the loaded business
+index, at startup) and derives their bit positions for each filter size the
+first time it is asked for; SeenFilter.mask() then tests all of them
+against one user's filter with one vectorized gather per hash. A Bloom filter
+has no false negatives: a business the user saw is always masked, and an
+unseen one is masked by mistake with probability false_positive_rate().
+"""
+import hashlib
+import math
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_BITS = 16384
+DEFAULT_HASHES = 5
+
+
+def bloom_hashes(business_ids: Sequence[str], n_hashes: int = DEFAULT_HASHES) -> np.ndarray:
+    """
+    (n_hashes, len(business_ids)) uint64 probes, by double hashing one 128-bit
+    BLAKE2b digest per id. Probe modulo a filter's size is the bit position.
+    """
+    digests = np.frombuffer(
+        b"".join(hashlib.blake2b(bid.encode(), digest_size=16).digest() for bid in business_ids), dtype="<u8"
+    ).reshape(-1, 2)
+    h1, h2 = digests[:, 0], digests[:, 1] | 1  # odd step: every probe differs for power-of-two sizes
+    steps = np.arange(n_hashes, dtype=np.uint64)[:, None]
+    return h1 + h2 * steps
+
+
+def bloom_positions(business_ids: Sequence[str], n_bits: int = DEFAULT_BITS,
+                    n_hashes: int = DEFAULT_HASHES) -> np.ndarray:
+    """(n_hashes, len(business_ids)) bit positions. One row per hash, so mask() gathers contiguous rows."""
+    return (bloom_hashes(business_ids, n_hashes) % np.uint64(n_bits)).astype(np.int64)
+
+
+def expected_false_positive_rate(count: int, n_bits: int, n_hashes: int) -> float:
+    return (1 - math.exp(-n_hashes * count / n_bits)) ** n_hashes
+
+
+def bits_for(count: int, n_hashes: int = DEFAULT_HASHES, max_fp_rate: float = 0.01,
+             min_bits: int = DEFAULT_BITS, max_bits: int = 64 * DEFAULT_BITS) -> int:
+    """
+    Filter size for `count` businesses: the smallest min_bits * 2**j whose
+    false-positive rate is at most max_fp_rate, and at most max_bits.
+    """
+    n_bits = min_bits
+    while expected_false_positive_rate(count, n_bits, n_hashes) > max_fp_rate and n_bits * 2 <= max_bits:
+        n_bits *= 2
+    return n_bits
+
+
+class BloomPositions:
+    """Bit positions of a fixed list of business ids, derived once per filter size."""
+
+    def __init__(self, business_ids: Sequence[str], n_hashes: int = DEFAULT_HASHES):
+        self.n_hashes = n_hashes
+        self.hashes = bloom_hashes(business_ids, n_hashes)
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return self.hashes.shape[1]
+
+    def for_bits(self, n_bits: int) -> np.ndarray:
+        positions = self._positions.get(n_bits)
+        if positions is None:
+            positions = self._positions[n_bits] = (self.hashes % np.uint64(n_bits)).astype(np.int64)
+        return positions
+
+
+class SeenFilter:
+    def __init__(self, n_bits: int = DEFAULT_BITS, n_hashes: int = DEFAULT_HASHES,
+                 bits: Optional[np.ndarray] = None, count: int = 0):
+        if n_bits <= 0 or n_bits % 8:
+            raise ValueError(f"n_bits must be a positive multiple of 8, got {n_bits}")
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        # Packed little-endian: bit p is bit (p % 8) of byte p // 8
+        self.bits = np.zeros(n_bits // 8, dtype=np.uint8) if bits is None else bits
+        self.count = count  # businesses added that weren't already (probably) in the filter
+
+    @classmethod
+    def from_bytes(cls, data: bytes, n_hashes: int = DEFAULT_HASHES, count: int = 0) -> "SeenFilter":
+        return cls(len(data) * 8, n_hashes, np.frombuffer(data, dtype=np.uint8).copy(), count)
+
+    def to_bytes(self) -> bytes:
+        return self.bits.tobytes()
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def add(self, business_ids: Iterable[str]) -> None:
+        for positions in bloom_positions(list(dict.fromkeys(business_ids)), self.n_bits, self.n_hashes).T:
+            byte, bit = positions >> 3, (positions & 7).astype(np.uint8)
+            if not np.all(self.bits[byte] >> bit & 1):
+                np.bitwise_or.at(self.bits, byte, np.uint8(1) << bit)
+                self.count += 1
+
+    def __contains__(self, business_id: str) -> bool:
+        return bool(self.mask(bloom_positions([business_id], self.n_bits, self.n_hashes))[0])
+
+    def mask(self, positions: np.ndarray) -> np.ndarray:
+        """Boolean mask over the businesses of bloom_positions() for this size: True where (probably) seen."""
+        bits = np.unpackbits(self.bits, bitorder="little").view(bool)
+        mask = bits[positions[0]]
+        for row in positions[1:]:
+            mask &= bits[row]
+        return mask
+
+    def false_positive_rate(self) -> float:
+        """Chance an unseen business is masked, after `count` distinct businesses."""
+        return expected_false_positive_rate(self.count, self.n_bits, self.n_hashes)
@@ -0,0 +1,96 @@
+"""
+Restaurants grouped by category signature
+
+A restaurant's category vector depends only on which vocabulary categories
+it lists, and many businesses list exactly the same ones. build_signatures()
+keeps one row per distinct signature (the sorted tuple of category indices)
+plus, for every business, the signature it belongs to, so scoring a query
+costs one dot product per signature instead of one per business.
+
+SignatureIndex.top_k() expands only the best signatures into business
+rows, and only as many members of each as top-k can use. Businesses with
+equal scores come back in business-index order, exactly like
+top_k_indices() over the per-business scores.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .quantize import QuantizedMatrix
+except ImportError:  # imported as a top-level module (tests, scripts run from this folder)
+    from quantize import QuantizedMatrix
+
+
+def build_signatures(business_index: dict, cat_to_index: Dict[str, int]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    (business ids, signature of each business, one unit float64 row per signature).
+
+    Row s of the matrix equals build_restaurant_vector() of every business
+    whose signature is s. Businesses without a known category share the
+    all-zero signature.
+    """
+    signature_to_row: Dict[Tuple[int, ...], int] = {}
+    signature_of = np.empty(len(business_index), dtype=np.int32)
+    for i, categories in enumerate(business_index.values()):
+        key = tuple(sorted({cat_to_index[cat] for cat in categories if cat in cat_to_index}))
+        signature_of[i] = signature_to_row.setdefault(key, len(signature_to_row))
+
+    matrix = np.zeros((len(signature_to_row), len(cat_to_index)))
+    for key, row in signature_to_row.items():
+        if key:
+            matrix[row, list(key)] = 1 / np.sqrt(len(key))
+    return list(business_index), signature_of, matrix
+
+
+class SignatureIndex:
+    def __init__(self, ids: Sequence[str], signature_of: np.ndarray, vectors: QuantizedMatrix):
+        self.ids = list(ids)
+        self.id_to_index = {bid: i for i, bid in enumerate(self.ids)}
+        self.signature_of = signature_of
+        self.vectors = vectors  # one row per signature
+        # Members of signature s are members[indptr[s]:indptr[s + 1]], in business order
+        self.members = np.argsort(signature_of, kind="stable").astype(np.int32)
+        self.indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(signature_of, minlength=len(vectors)), out=self.indptr[1:])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_signatures(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.signature_of.nbytes + self.members.nbytes + self.indptr.nbytes
+
+    def top_k(self, query: np.ndarray, k: int, exclude: Optional[np.ndarray] = None):
+        """(business rows, scores) of the `k` best businesses for `query`, skipping rows in `exclude`."""
+        scores = self.vectors.scores(query)
+        n_excluded = len(exclude) if exclude is not None else 0
+        needed = min(k + n_excluded, len(self.ids))  # businesses, not signatures
+        if k <= 0 or needed <= 0:
+            return np.zeros(0, dtype=np.int64), scores[:0]
+
+        # Every signature has a member, so the `needed` best signatures hold at
+        # least `needed` businesses. Of those, keep the best ones until their
+        # members cover `needed` (plus any tied with the last one); at most
+        # `needed` members of each can make it, so only that many are expanded.
+        best = min(needed, len(scores))
+        candidates = np.argpartition(-scores, best - 1)[:best]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        covered = np.cumsum(self.indptr[candidates + 1] - self.indptr[candidates])
+        threshold = scores[candidates[np.searchsorted(covered, needed)]]
+        signatures = np.flatnonzero(scores >= threshold)
+        starts = self.indptr[signatures]
+        sizes = np.minimum(self.indptr[signatures + 1] - starts, needed)
+        offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        rows = self.members[np.repeat(starts, sizes) + offsets].astype(np.int64)
+        row_scores = np.repeat(scores[signatures], sizes)
+
+        if n_excluded:
+            keep = ~np.isin(rows, exclude)
+            rows, row_scores = rows[keep], row_scores[keep]
+        order = np.lexsort((rows, -row_scores))[:k]
+        return rows[order], row_scores[order]
@@ -0,0 +1,48 @@
+import numpy as np
+
+from als import BusinessEmbeddings, train_als
+
+# ------------------------
+# Two taste groups: {b1, b2, b3} and {b4, b5, b6}
+# ------------------------
+
+user_items = (
+    [["b1", "b2", "b3"], ["b1", "b2"], ["b2", "b3"], ["b1", "b3"]] * 5
+    + [["b4", "b5", "b6"], ["b4", "b5"], ["b5", "b6"], ["b4", "b6"]] * 5
+)
+
+
+# ------------------------
+# TEST 1: Fold-in recovers the user's taste group
+# ------------------------
+
+def test_fold_in_recommends_same_group():
+    # One latent factor per taste group
+    embeddings = train_als(user_items, factors=2, iterations=10)
+
+    assert embeddings.item_factors.dtype == np.float32
+    assert embeddings.item_factors.shape == (6, 2)
+
+    ranked = embeddings.recommend([("b1", 1.0), ("b2", 1.0)], top_k=1, exclude={"b1", "b2"})
+    assert ranked[0][0] == "b3"
+
+    ranked = embeddings.recommend([("b4", 1.0)], top_k=2, exclude={"b4"})
+    assert {bid for bid, _ in ranked} == {"b5", "b6"}
+
+    assert embeddings.fold_in([("unknown", 1.0)]) is None
+
+
+# ------------------------
+# TEST 2: Save / load round trip
+# ------------------------
+
+def test_embeddings_round_trip(tmp_path):
+    embeddings = train_als(user_items, factors=4, iterations=3)
+    path = str(tmp_path / "als_embeddings.npz")
+    embeddings.save(path)
+
+    loaded = BusinessEmbeddings.load(path)
+
+    assert loaded.business_ids == embeddings.business_ids
+    assert np.array_equal(loaded.item_factors, embeddings.item_factors)
+    assert loaded.recommend([("b1", 1.0)], top_k=3) == embeddings.recommend([("b1", 1.0)], top_k=3)
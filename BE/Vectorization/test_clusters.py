@@ -0,0 +1,64 @@
+import numpy as np
+
+from clusters import TasteClusters, build_taste_clusters, spherical_kmeans
+
+# ------------------------
+# Two taste groups over 4 categories: [Mexican, Tacos, Sushi, Ramen]
+# ------------------------
+
+rng = np.random.default_rng(0)
+mexican = np.abs(rng.normal([1, 1, 0, 0], 0.1, size=(40, 4)))
+japanese = np.abs(rng.normal([0, 0, 1, 1], 0.1, size=(40, 4)))
+user_vectors = np.vstack([mexican, japanese])
+user_vectors /= np.linalg.norm(user_vectors, axis=1, keepdims=True)
+
+business_ids = ["taqueria", "cantina", "sushi", "ramen"]
+restaurant_vectors = np.array([
+    [1, 1, 0, 0],
+    [1, 0, 0, 0],
+    [0, 0, 1, 0],
+    [0, 0, 0.7071, 0.7071],
+])
+
+
+# ------------------------
+# TEST 1: k-means separates the groups
+# ------------------------
+
+def test_spherical_kmeans_finds_groups():
+    centroids, labels = spherical_kmeans(user_vectors, n_clusters=2, iterations=10)
+
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0)
+    assert len(set(labels[:40])) == 1 and len(set(labels[40:])) == 1
+    assert labels[0] != labels[40]
+
+
+# ------------------------
+# TEST 2: Nearest clusters' lists are merged
+# ------------------------
+
+def test_recommend_merges_nearest_lists():
+    clusters = build_taste_clusters(user_vectors, restaurant_vectors, business_ids, n_clusters=2, list_size=2)
+
+    ranked = clusters.recommend(np.array([0.0, 0.0, 1.0, 0.0]), top_k=2, n_probe=1)
+    assert {bid for bid, _ in ranked} == {"sushi", "ramen"}
+
+    ranked = clusters.recommend(np.array([1.0, 0.2, 0.0, 0.0]), top_k=3, exclude={"taqueria"}, n_probe=2)
+    assert ranked[0][0] == "cantina"
+    assert "taqueria" not in {bid for bid, _ in ranked}
+
+    assert clusters.recommend(np.zeros(4), top_k=3) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    clusters = build_taste_clusters(user_vectors, restaurant_vectors, business_ids, n_clusters=2, list_size=3,
+                                    meta={"vocabulary_version": "abc"})
+    path = str(tmp_path / "taste_clusters.npz")
+    clusters.save(path)
+
+    loaded = TasteClusters.load(path)
+
+    assert loaded.meta["vocabulary_version"] == "abc"
+    assert np.array_equal(loaded.centroids, clusters.centroids)
+    query = np.array([0.5, 0.5, 0.5, 0.0])
+    assert loaded.recommend(query, top_k=3, n_probe=2) == clusters.recommend(query, top_k=3, n_probe=2)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex, build_cooccurrence
+
+# ------------------------
+# Fake liked-business lists, one per Yelp user
+# b1/b2 are liked together often, b3 only once with b1
+# ------------------------
+
+user_items = [
+    ["b1", "b2"],
+    ["b1", "b2", "b3"],
+    ["b2", "b1"],
+    ["b4", "b5"],
+    ["b4", "b5"],
+]
+
+
+# ------------------------
+# TEST 1: Pruning and support
+# ------------------------
+
+def test_build_keeps_supported_top_neighbors():
+    index = build_cooccurrence(user_items, top_n=1, min_support=2)
+
+    assert index.neighbors_of("b1")[0][0] == "b2"
+    assert index.neighbors_of("b4")[0][0] == "b5"
+    # b1-b3 co-occurs once: below min_support
+    assert index.neighbors_of("b3") == []
+    # top_n=1 keeps a single neighbor per business
+    assert all(len(index.neighbors_of(bid)) <= 1 for bid in index.business_ids)
+
+
+# ------------------------
+# TEST 2: Scoring sums neighbor lists and skips history
+# ------------------------
+
+def test_recommend_sums_weighted_neighbors():
+    index = build_cooccurrence(user_items, top_n=5, min_support=1)
+
+    ranked = index.recommend([("b1", 1.0), ("b4", 3.0)], top_k=3, exclude={"b1", "b4"})
+    ids = [bid for bid, _ in ranked]
+
+    # b5 comes from the 3x-weighted b4, so it outranks b1's neighbors
+    assert ids[0] == "b5"
+    assert "b2" in ids
+    assert "b1" not in ids and "b4" not in ids
+    assert index.recommend([("unknown", 1.0)]) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = build_cooccurrence(user_items, top_n=5, min_support=1)
+    path = str(tmp_path / "cooccurrence_index.npz")
+    index.save(path)
+
+    loaded = CooccurrenceIndex.load(path)
+
+    assert loaded.business_ids == index.business_ids
+    assert np.array_equal(loaded.indptr, index.indptr)
+    assert loaded.recommend([("b1", 1.0)], top_k=2) == index.recommend([("b1", 1.0)], top_k=2)
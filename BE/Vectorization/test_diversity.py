@@ -0,0 +1,67 @@
+import numpy as np
+
+from diversity import category_columns, category_matrix, mmr_order, mmr_rerank
+from vectorize import cat_to_index
+
+# ------------------------
+# Candidates: three tied pizza places ahead of a slightly lower sushi bar
+# ------------------------
+
+business_index = {
+    "p1": ["Pizza"],
+    "p2": ["Pizza"],
+    "p3": ["Pizza"],
+    "s1": ["Sushi Bars"],
+    "m1": ["Mexican", "Pizza"],
+}
+
+ranked = [("p1", 0.90), ("p2", 0.90), ("p3", 0.90), ("m1", 0.85), ("s1", 0.80)]
+columns = category_columns(business_index, cat_to_index)
+
+
+# ------------------------
+# TEST 1: Category matrix rows are unit cosines
+# ------------------------
+
+def test_category_matrix_rows_are_normalized():
+    matrix = category_matrix(["p1", "m1", "unknown"], columns, len(cat_to_index))
+
+    assert matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1.0)
+    assert not matrix[2].any()
+    assert np.isclose(matrix[0] @ matrix[1], 1 / np.sqrt(2))
+
+
+# ------------------------
+# TEST 2: MMR spreads tied categories
+# ------------------------
+
+def test_mmr_promotes_other_categories():
+    diverse = [bid for bid, _ in mmr_rerank(ranked, columns, len(cat_to_index), top_k=3, diversity=0.5)]
+
+    assert diverse[0] == "p1"
+    assert diverse[1] == "s1"
+    assert len(set(diverse)) == 3
+
+    # Weight 0 keeps the score order, scores unchanged
+    assert mmr_rerank(ranked, columns, len(cat_to_index), top_k=3, diversity=0.0) == ranked[:3]
+
+
+def test_mmr_order_handles_ties_and_short_lists():
+    vectors = np.eye(3, dtype=np.float32)
+
+    assert mmr_order(np.array([1.0, 1.0, 1.0]), vectors, top_k=5, diversity=0.3) == [0, 1, 2]
+    assert mmr_order(np.array([]), np.zeros((0, 3)), top_k=5, diversity=0.3) == []
+
+
+def test_mmr_head_matches_shorter_candidate_list():
+    rng = np.random.default_rng(0)
+    vectors = rng.random((60, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = np.sort(rng.random(60))[::-1]
+
+    short = mmr_order(scores[:25], vectors[:25], top_k=10, diversity=0.4)
+    deep = mmr_order(scores, vectors, top_k=40, diversity=0.4, head=10, head_candidates=25)
+
+    assert deep[:10] == short
+    assert len(set(deep)) == 40 and max(deep[10:]) >= 25
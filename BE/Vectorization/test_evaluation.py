@@ -0,0 +1,59 @@
+import math
+
+from evaluation import catalog_coverage, ndcg_at_k, recall_at_k, sample_cases, split_recent_likes
+
+# ------------------------
+# Reviews: (user_id, business_id, stars, date)
+# ------------------------
+
+reviews = [
+    ("u1", "b3", 5, "2021-05-01"),
+    ("u1", "b1", 4, "2019-01-01"),
+    ("u1", "b2", 5, "2020-01-01"),
+    ("u1", "b9", 2, "2022-01-01"),   # not a like
+    ("u1", "b1", 5, "2021-06-01"),   # repeat like, b1 was already liked
+    ("u2", "b1", 5, None),
+    ("u2", "b2", 4, None),
+    ("u3", "b4", 5, "2020-01-01"),
+]
+
+
+# ------------------------
+# TEST 1: Most recent new likes are held out
+# ------------------------
+
+def test_split_holds_out_most_recent_likes():
+    train, cases = split_recent_likes(reviews, holdout=1, min_history=2)
+
+    assert cases == {"u1": (["b1", "b2"], ["b3"])}
+    assert train["u1"] == ["b1", "b2", "b1"]
+    # Too few likes to evaluate: kept whole for training
+    assert train["u2"] == ["b1", "b2"] and train["u3"] == ["b4"]
+
+
+def test_split_without_dates_keeps_input_order():
+    _, cases = split_recent_likes(reviews, holdout=1, min_history=1)
+
+    assert cases["u2"] == (["b1"], ["b2"])
+    assert sample_cases(cases, 1, seed=3) in ([cases["u1"]], [cases["u2"]])
+    assert len(sample_cases(cases, 0)) == 2
+
+
+# ------------------------
+# TEST 2: Metrics
+# ------------------------
+
+def test_recall_and_ndcg():
+    ranked = ["a", "b", "c", "d"]
+
+    assert recall_at_k(ranked, ["b", "z"], 4) == 0.5
+    assert recall_at_k(ranked, ["d"], 3) == 0.0
+    assert ndcg_at_k(ranked, ["a"], 4) == 1.0
+    assert math.isclose(ndcg_at_k(ranked, ["b"], 4), 1 / math.log2(3))
+    assert math.isclose(ndcg_at_k(ranked, ["b", "z"], 4), (1 / math.log2(3)) / (1 + 1 / math.log2(3)))
+    assert ndcg_at_k(ranked, [], 4) == 0.0
+
+
+def test_catalog_coverage():
+    assert catalog_coverage([["a", "b"], ["b", "c"]], 10) == 0.3
+    assert catalog_coverage([], 0) == 0.0
@@ -0,0 +1,58 @@
+from popularity import PopularityLists, build_popularity, popularity_score
+
+# ------------------------
+# Fake Yelp businesses: (business_id, city, categories, stars, review_count)
+# ------------------------
+
+businesses = [
+    ("b1", "Tampa", ["Pizza"], 4.5, 2000),
+    ("b2", "Tampa", ["Sushi Bars"], 5.0, 3),     # few reviews: shrunk toward the mean
+    ("b3", "Nashville", ["Pizza", "Italian"], 4.4, 800),
+    ("b4", "Nashville", ["Sushi Bars"], 3.0, 500),
+    ("b5", "Tampa", ["Italian"], None, 10),      # no stars: skipped
+]
+
+
+# ------------------------
+# TEST 1: Bayesian average ranks well-reviewed businesses first
+# ------------------------
+
+def test_prior_shrinks_small_review_counts():
+    assert popularity_score(5.0, 0, 3.5, 25) == 3.5
+    assert popularity_score(5.0, 3, 3.5, 25) < popularity_score(4.5, 2000, 3.5, 25)
+
+    lists = build_popularity(businesses, top_n=10)
+
+    assert [bid for bid, _ in lists.top_global] == ["b1", "b3", "b2", "b4"]
+    assert [bid for bid, _ in lists.by_city["tampa"]] == ["b1", "b2"]
+    assert [bid for bid, _ in lists.by_category["Pizza"]] == ["b1", "b3"]
+    assert "b5" not in {bid for bid, _ in lists.top_global}
+
+
+# ------------------------
+# TEST 2: Seeded lists fall back to city, then global
+# ------------------------
+
+def test_top_uses_category_then_city_then_global():
+    lists = build_popularity(businesses, top_n=10)
+
+    ranked = lists.top(3, city="TAMPA", category="sushi bars")
+    assert [bid for bid, _ in ranked] == ["b2", "b4", "b1"]
+
+    ranked = lists.top(2, category="Unknown Cuisine", exclude={"b1"})
+    assert [bid for bid, _ in ranked] == ["b3", "b2"]
+
+    assert lists.category_for(" italian ") == "Italian"
+    assert lists.category_for(None) is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    lists = build_popularity(businesses, top_n=2)
+    path = str(tmp_path / "popularity_lists.json")
+    lists.save(path)
+
+    loaded = PopularityLists.load(path)
+
+    assert loaded.top_global == lists.top_global
+    assert loaded.by_city == lists.by_city
+    assert loaded.top(4, city="Nashville") == lists.top(4, city="Nashville")
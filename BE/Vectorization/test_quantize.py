@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from quantize import QuantizedMatrix, quantization_report, top_k_indices
+
+# ------------------------
+# Random non-negative unit rows, like normalized category counts
+# ------------------------
+
+rng = np.random.default_rng(0)
+matrix = rng.random((300, 20)) * (rng.random((300, 20)) < 0.3)
+matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+queries = matrix[:25]
+
+
+# ------------------------
+# TEST 1: Quantized scores stay close to full precision
+# ------------------------
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-6), ("float16", 2e-3), ("int8", 2e-2)])
+def test_scores_close_to_float64(dtype, tolerance):
+    quantized = QuantizedMatrix.from_dense(matrix, dtype)
+
+    assert quantized.dtype == dtype
+    assert np.allclose(quantized.scores(queries[0]), matrix @ queries[0], atol=tolerance)
+    assert np.allclose(quantized.rows([1, 2]), matrix[[1, 2]], atol=tolerance)
+
+
+def test_int8_is_an_eighth_of_float64():
+    full = QuantizedMatrix.from_dense(matrix, "float64")
+    int8 = QuantizedMatrix.from_dense(matrix, "int8")
+
+    # one float32 scale per row on top of the int8 data
+    assert int8.nbytes == full.nbytes // 8 + 4 * len(matrix)
+
+    with pytest.raises(ValueError):
+        QuantizedMatrix.from_dense(matrix, "int4")
+
+
+# ------------------------
+# TEST 2: Top k keeps row order on ties and skips excluded rows
+# ------------------------
+
+def test_top_k_indices_is_a_stable_sort():
+    scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1])
+
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 0]
+    assert top_k_indices(scores, 3, exclude=np.array([1])).tolist() == [3, 0, 2]
+    assert top_k_indices(scores, 10, exclude=np.array([0, 0])).tolist() == [1, 3, 2, 4]
+
+
+# ------------------------
+# TEST 3: Report against full precision
+# ------------------------
+
+def test_quantization_report():
+    report = {row["dtype"]: row for row in quantization_report(matrix, queries, k=10)}
+
+    assert report["float64"]["topk_overlap"] == 1.0
+    assert report["float64"]["max_abs_error"] == 0.0
+    assert report["int8"]["bytes"] < report["float16"]["bytes"] < report["float32"]["bytes"]
+    assert report["float16"]["topk_overlap"] >= 0.9
+    assert report["int8"]["max_abs_error"] >= report["float16"]["max_abs_error"]
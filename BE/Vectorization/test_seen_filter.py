@@ -0,0 +1,82 @@
+import numpy as np
+
+from seen_filter import BloomPositions, SeenFilter, bits_for, bloom_positions
+
+# ------------------------
+# A catalog and a long history
+# ------------------------
+
+business_ids = [f"business-{i:05d}" for i in range(5000)]
+history = business_ids[:400]
+
+
+def _filter():
+    seen = SeenFilter(n_bits=8192, n_hashes=5)
+    seen.add(history)
+    return seen
+
+
+# ------------------------
+# TEST 1: Every seen business is masked, few others are
+# ------------------------
+
+def test_mask_has_no_false_negatives():
+    seen = _filter()
+    mask = seen.mask(bloom_positions(business_ids, seen.n_bits, seen.n_hashes))
+
+    assert mask.shape == (len(business_ids),)
+    assert mask[:len(history)].all()
+    assert all(bid in seen for bid in history)
+    # Expected rate with 400 of 8192 bits x 5 hashes is about 0.2%
+    assert mask[len(history):].mean() < 0.01
+    assert 0 < seen.false_positive_rate() < 0.01
+
+
+def test_count_ignores_repeats():
+    seen = _filter()
+    seen.add(history[:10] + history[:10])
+
+    assert seen.count == len(history)
+    assert "never-seen" not in SeenFilter()
+
+
+# ------------------------
+# TEST 2: Stored bytes round-trip
+# ------------------------
+
+def test_bytes_round_trip():
+    seen = _filter()
+    data = seen.to_bytes()
+    restored = SeenFilter.from_bytes(data, n_hashes=5, count=seen.count)
+
+    assert len(data) == 8192 // 8 == restored.nbytes
+    positions = bloom_positions(business_ids, restored.n_bits, restored.n_hashes)
+    assert np.array_equal(restored.mask(positions), seen.mask(positions))
+    # Positions depend only on the ids, not on where they sit in a list
+    reordered = bloom_positions(business_ids[::-1], 8192, 5)
+    assert np.array_equal(reordered[:, ::-1], positions)
+
+
+# ------------------------
+# TEST 3: Filters are sized for their history
+# ------------------------
+
+def test_bits_for_keeps_false_positives_bounded():
+    assert bits_for(100) == 16384
+    for count in (2000, 5000, 20000):
+        n_bits = bits_for(count, max_fp_rate=0.01)
+        seen = SeenFilter(n_bits, 5)
+        seen.add(f"seen-{i}" for i in range(count))
+        assert n_bits // 16384 & (n_bits // 16384 - 1) == 0
+        assert seen.false_positive_rate() <= 0.01
+        assert seen.mask(bloom_positions(business_ids, n_bits, 5)).mean() < 0.02
+    assert bits_for(10 ** 7, max_bits=1 << 20) == 1 << 20
+
+
+def test_positions_per_size_match_bloom_positions():
+    positions = BloomPositions(business_ids, n_hashes=5)
+
+    assert len(positions) == len(business_ids)
+    for n_bits in (8192, 65536):
+        assert np.array_equal(positions.for_bits(n_bits), bloom_positions(business_ids, n_bits, 5))
+    assert positions.for_bits(8192) is positions.for_bits(8192)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from quantize import QuantizedMatrix, top_k_indices
+from signatures import SignatureIndex, build_signatures
+from vectorize import build_restaurant_matrix
+
+# ------------------------
+# Businesses sharing category lists
+# ------------------------
+
+cat_to_index = {"Mexican": 0, "Tacos": 1, "Sushi": 2, "Ramen": 3}
+
+business_index = {
+    "b1": ["Mexican", "Tacos"],
+    "b2": ["Sushi"],
+    "b3": ["Tacos", "Mexican", "Restaurants"],   # same signature as b1
+    "b4": ["Sushi", "Ramen"],
+    "b5": ["Sushi"],                             # same as b2
+    "b6": ["Restaurants"],                       # no known category
+    "b7": ["Mexican", "Tacos"],                  # same as b1
+}
+
+
+def _index(dtype="float64"):
+    ids, signature_of, matrix = build_signatures(business_index, cat_to_index)
+    return SignatureIndex(ids, signature_of, QuantizedMatrix.from_dense(matrix, dtype))
+
+
+# ------------------------
+# TEST 1: One row per distinct signature
+# ------------------------
+
+def test_signatures_match_restaurant_matrix():
+    ids, signature_of, matrix = build_signatures(business_index, cat_to_index)
+    dense_ids, dense = build_restaurant_matrix(business_index, cat_to_index)
+
+    assert ids == dense_ids
+    assert len(matrix) == 4
+    assert signature_of[0] == signature_of[2] == signature_of[6]
+    assert signature_of[1] == signature_of[4]
+    assert np.allclose(matrix[signature_of], dense)
+
+
+# ------------------------
+# TEST 2: top_k matches per-business scoring, ties in business order
+# ------------------------
+
+def test_top_k_matches_per_business_ranking():
+    index = _index()
+    _, dense = build_restaurant_matrix(business_index, cat_to_index)
+    queries = [np.array([1.0, 0.0, 1.0, 0.0]), np.array([0.0, 0.0, 0.0, 0.0]), np.array([0.6, 0.8, 0.0, 0.0])]
+
+    for query in queries:
+        scores = dense @ query
+        for k in (1, 2, 4, 10):
+            for exclude in (np.zeros(0, dtype=np.int64), np.array([0, 4])):
+                top, top_scores = index.top_k(query, k, exclude=exclude)
+                expected = top_k_indices(scores, k, exclude=exclude)
+                assert top.tolist() == expected.tolist()
+                assert np.allclose(top_scores, scores[expected])
+
+
+def test_top_k_stops_inside_tie_group():
+    index = _index("int8")
+    top, scores = index.top_k(np.array([1.0, 1.0, 0.0, 0.0]), 2)
+
+    assert [index.ids[row] for row in top] == ["b1", "b3"]
+    assert scores[0] == scores[1]
+    assert index.n_signatures == 4 and len(index) == 7
+
+
+def test_top_k_expands_large_signature():
+    # One signature with more members than k, and more than there are signatures
+    large = {f"b{i:02d}": [["Mexican"], ["Sushi"], ["Ramen"]][i % 3] for i in range(30)}
+    ids, signature_of, matrix = build_signatures(large, cat_to_index)
+    index = SignatureIndex(ids, signature_of, QuantizedMatrix.from_dense(matrix, "float64"))
+    scores = build_restaurant_matrix(large, cat_to_index)[1] @ np.array([1.0, 0.0, 0.5, 0.0])
+
+    top, _ = index.top_k(np.array([1.0, 0.0, 0.5, 0.0]), 10)
+    assert top.tolist() == top_k_indices(scores, 10).tolist()
+    assert len(top) == 10 and all(large[index.ids[row]] == ["Mexican"] for row in top)
+
+    top, _ = index.top_k(np.array([1.0, 0.0, 0.5, 0.0]), 5, exclude=np.arange(0, 30, 3)[:8])
+    assert top.tolist() == top_k_indices(scores, 5, exclude=np.arange(0, 30, 3)[:8]).tolist()
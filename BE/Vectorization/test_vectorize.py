@@ -7,6 +7,8 @@ from vectorize import (
     build_click_vector,
     build_restaurant_vector,
     build_yelp_user_vectors,
+    build_yelp_user_matrix,
+    build_restaurant_matrix,
     find_neighbors,
     aggregate_neighbor_vector,
     rank_restaurants
@@ -135,3 +137,21 @@ def test_no_clicks_returns_zero_vector():
 
     # Should be zero vector
     assert np.all(my_vec == 0)
+
+
+# ------------------------
+# TEST 6: Matrix builders match the per-vector ones
+# ------------------------
+
+def test_matrix_builders_match_vectors():
+    yelp_vectors = build_yelp_user_vectors(category_review_index, cat_to_index)
+    uids, user_matrix = build_yelp_user_matrix(category_review_index, cat_to_index)
+
+    assert uids == list(yelp_vectors)
+    assert np.allclose(user_matrix, np.array([yelp_vectors[uid] for uid in uids]))
+
+    bids, restaurant_matrix = build_restaurant_matrix(business_index, cat_to_index)
+
+    assert bids == list(business_index)
+    for bid, row in zip(bids, restaurant_matrix):
+        assert np.allclose(row, build_restaurant_vector(bid, business_index, cat_to_index))
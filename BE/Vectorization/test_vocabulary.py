@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from vectorize import FOOD_CATEGORIES, cat_to_index, vocabulary
+from vocabulary import CategoryVocabulary, VocabularyMismatchError
+
+# ------------------------
+# TEST 1: Order does not depend on hash randomization
+# ------------------------
+
+def test_vocabulary_is_stable_across_processes():
+    script = "from vectorize import vocabulary; print(vocabulary.version, ','.join(vocabulary.categories))"
+    outputs = set()
+    for seed in ("1", "2", "3"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, check=True,
+        )
+        outputs.add(result.stdout)
+
+    assert len(outputs) == 1
+    assert list(cat_to_index) == sorted(FOOD_CATEGORIES)
+
+
+# ------------------------
+# TEST 2: Saved artifact round-trips and is validated
+# ------------------------
+
+def test_vocabulary_round_trip(tmp_path):
+    path = tmp_path / "category_vocabulary.json"
+    vocabulary.save(str(path))
+
+    loaded = CategoryVocabulary.load(str(path))
+
+    assert loaded == vocabulary
+    assert loaded.version == vocabulary.version
+    vocabulary.check_version(loaded.version)
+
+
+def test_vocabulary_mismatch_is_rejected():
+    other = CategoryVocabulary(list(FOOD_CATEGORIES) + ["Space Food"])
+
+    assert other.version != vocabulary.version
+    with pytest.raises(VocabularyMismatchError):
+        vocabulary.check_version(other.version)
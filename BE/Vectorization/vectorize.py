@@ -9,7 +9,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "d
 
 from buisiness_cleaning import FOOD_CATEGORIES
 
-cat_to_index = {cat: i for i, cat in enumerate(FOOD_CATEGORIES)}
+try:
+    from .vocabulary import CategoryVocabulary
+except ImportError:  # imported as a top-level module (tests, scripts run from this folder)
+    from vocabulary import CategoryVocabulary
+
+# Sorted, so dimension i is the same category in every process
+vocabulary = CategoryVocabulary(FOOD_CATEGORIES)
+cat_to_index = vocabulary.index
 
 def l2_normalize(vec):
     norm = np.linalg.norm(vec)
@@ -59,6 +66,50 @@ def build_yelp_user_vectors(category_review_index, cat_to_index):
 
     return user_vectors
 
+def build_yelp_user_matrix(category_review_index, cat_to_index):
+    """The vectors of build_yelp_user_vectors as (user ids, one float64 row per user), same order."""
+    uid_to_row = {}
+    rows, cols, counts = [], [], []
+
+    for category, users in category_review_index.items():
+        if category not in cat_to_index:
+            continue
+
+        cat_idx = cat_to_index[category]
+
+        for uid, count in users.items():
+            rows.append(uid_to_row.setdefault(uid, len(uid_to_row)))
+            cols.append(cat_idx)
+            counts.append(count)
+
+    matrix = np.zeros((len(uid_to_row), len(cat_to_index)))
+    matrix[rows, cols] = counts
+
+    # L2 normalize each user
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+    return list(uid_to_row), matrix
+
+
+def build_restaurant_matrix(business_index, cat_to_index):
+    """build_restaurant_vector for every business as (business ids, one float64 row each)."""
+    rows, cols = [], []
+
+    for row, categories in enumerate(business_index.values()):
+        for cat in categories:
+            if cat in cat_to_index:
+                rows.append(row)
+                cols.append(cat_to_index[cat])
+
+    matrix = np.zeros((len(business_index), len(cat_to_index)))
+    matrix[rows, cols] = 1
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+    return list(business_index), matrix
+
 def find_neighbors(my_vec, yelp_user_vectors, k=5):
     sims = []
 
@@ -84,11 +135,15 @@ def similarity(user_vec, restaurant_vec):
 
 def rank_restaurants(user_vec, business_index, cat_to_index):
     scores = []
+    # Businesses listing the same categories share a vector, so score each signature once
+    signature_scores = {}
 
     for bid in business_index:
-        rest_vec = build_restaurant_vector(bid, business_index, cat_to_index)
-        score = np.dot(user_vec, rest_vec)
-        scores.append((bid, score))
+        signature = frozenset(cat for cat in business_index[bid] if cat in cat_to_index)
+        if signature not in signature_scores:
+            rest_vec = build_restaurant_vector(bid, business_index, cat_to_index)
+            signature_scores[signature] = np.dot(user_vec, rest_vec)
+        scores.append((bid, signature_scores[signature]))
 
     scores.sort(key=lambda x: x[1], reverse=True)
     return scores
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Ordered, versioned category vocabulary
+
+Vector dimension i means `categories[i]`. The order is sorted, never set
+iteration order, so it is the same in every process regardless of hash
+randomization. The version is a hash of that order: any artifact built
+against one vocabulary records its version, and loaders refuse artifacts
+whose version differs from the running code.
+"""
+import hashlib
+import json
+from typing import Dict, Iterable, Tuple
+
+VOCABULARY_FILENAME = "category_vocabulary.json"
+VOCABULARY_FORMAT = 1
+
+
+class VocabularyMismatchError(ValueError):
+    """An artifact was built against a different category vocabulary."""
+
+
+class CategoryVocabulary:
+    def __init__(self, categories: Iterable[str]):
+        self.categories: Tuple[str, ...] = tuple(sorted(set(categories)))
+        self.index: Dict[str, int] = {cat: i for i, cat in enumerate(self.categories)}
+        digest = hashlib.sha256("\n".join(self.categories).encode("utf-8")).hexdigest()
+        self.version = digest[:16]
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CategoryVocabulary) and self.categories == other.categories
+
+    def to_dict(self) -> dict:
+        return {"format": VOCABULARY_FORMAT, "version": self.version, "categories": list(self.categories)}
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryVocabulary":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        vocabulary = cls(data["categories"])
+        if list(vocabulary.categories) != data["categories"] or vocabulary.version != data.get("version"):
+            raise VocabularyMismatchError(f"{path} is corrupt: categories do not match its version")
+        return vocabulary
+
+    def check_version(self, version: str, artifact: str = "artifact") -> None:
+        """Raise VocabularyMismatchError unless `version` is this vocabulary's version."""
+        if version != self.version:
+            raise VocabularyMismatchError(
+                f"{artifact} was built with category vocabulary {version}, "
+                f"but this code uses {self.version}; rebuild it"
+            )
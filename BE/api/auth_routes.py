@@ -13,10 +13,10 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from Login.auth import create_access_token, verify_password, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+from Login.auth import create_access_token, verify_password_async, get_password_hash_async, ACCESS_TOKEN_EXPIRE_MINUTES
 from . import schemas, models
 from .database import get_db_dependency
-from .dependencies import get_current_user
+from .dependencies import get_current_user, invalidate_cached_user
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -39,7 +39,7 @@ async def register_user(
     db_user = models.User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password)
+        hashed_password=await get_password_hash_async(user.password)
     )
     db.add(db_user)
     await db.commit()
@@ -55,7 +55,7 @@ async def login_for_access_token(
     result = await db.execute(select(models.User).where(models.User.username == form_data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -90,12 +90,13 @@ async def update_user_me(
 
     for field, value in user_update.dict(exclude_unset=True).items():
         if field == "password":
-            value = get_password_hash(value)
+            value = await get_password_hash_async(value)
             field = "hashed_password"
         setattr(db_user, field, value)
 
     await db.commit()
     await db.refresh(db_user)
+    invalidate_cached_user(db_user.id)
     return db_user
 
 
@@ -0,0 +1,91 @@
+"""
+Small in-process caches shared by the API modules
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a TTL.
+
+    Each entry may carry its own expiry (never later than the cache-wide TTL),
+    which lets callers cap an entry at something like a token's `exp`.
+    Not thread-safe — it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every entry whose value matches `predicate`; returns how many were removed."""
+        stale = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in stale:
+            del self._data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class VersionCounter:
+    """
+    Per-key counters bumped on every write, so cached results derived from
+    the key's data can tell they are out of date by comparing versions.
+    Unknown keys are at version 0. Not thread-safe, like TTLCache.
+    """
+
+    def __init__(self):
+        self._versions: dict = {}
+
+    def get(self, key: Hashable) -> int:
+        return self._versions.get(key, 0)
+
+    def bump(self, key: Hashable) -> int:
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+        return version
+
+
+# str(user_id) -> version of the user's clicks, swipes and locations; bumped once
+# the write is visible to reads, used to invalidate cached recommendation pages
+interaction_versions = VersionCounter()
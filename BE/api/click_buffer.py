@@ -0,0 +1,213 @@
+"""
+In-process write buffer for click events
+
+Single clicks are queued and written by a background task as multi-row
+INSERTs, flushed whenever a batch fills up or the flush interval elapses.
+The queue is bounded: when it is full, producers wait (backpressure) rather
+than letting memory grow without limit. A failed flush is retried with
+exponential backoff (the queue fills meanwhile, so producers wait), since
+the clicks were already acknowledged; a batch is only dropped once every
+retry has failed. A batch the database rejects for its contents (a
+constraint or data error) is not retried as a whole: it is split in halves
+and each half written on its own, down to the single bad row, which is
+dropped, so the rest of the batch still lands.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from . import metrics
+from .cache import interaction_versions
+from .database import get_async_db
+from .models import UserClick
+from .seen_filters import record_seen
+
+logger = logging.getLogger(__name__)
+
+CLICK_FLUSH_MAX_BATCH = int(os.getenv("CLICK_FLUSH_MAX_BATCH", "500"))
+CLICK_FLUSH_INTERVAL_MS = float(os.getenv("CLICK_FLUSH_INTERVAL_MS", "250"))
+CLICK_BUFFER_MAX_PENDING = int(os.getenv("CLICK_BUFFER_MAX_PENDING", "10000"))
+CLICK_FLUSH_MAX_RETRIES = int(os.getenv("CLICK_FLUSH_MAX_RETRIES", "5"))
+CLICK_FLUSH_RETRY_BACKOFF_MS = float(os.getenv("CLICK_FLUSH_RETRY_BACKOFF_MS", "200"))  # doubled per retry
+
+flush_size = metrics.Histogram(
+    "click_buffer_flush_size", "Rows written per click buffer flush",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+flush_latency = metrics.Histogram("click_buffer_flush_seconds", "Time spent writing one click buffer flush")
+flush_failures = metrics.Counter("click_buffer_flush_failures_total", "Click buffer flush attempts that failed")
+flush_dropped = metrics.Counter(
+    "click_buffer_dropped_clicks_total", "Buffered clicks lost after every retry failed, or rejected by the database"
+)
+
+
+def build_click_row(user_id, business_id: str, lat: Optional[float] = None, lng: Optional[float] = None) -> Dict:
+    """Build a complete user_clicks row; id and timestamp are assigned here instead of by the DB."""
+    return {
+        "id":          uuid.uuid4(),
+        "user_id":     user_id,
+        "business_id": business_id,
+        "lat":         lat,
+        "lng":         lng,
+        "clicked_at":  datetime.utcnow(),
+    }
+
+
+async def write_click_rows(rows: List[Dict], db=None) -> None:
+    """
+    Write rows with a single multi-row INSERT, in `db` if given, else in a fresh session.
+
+    Once committed, the clicking users' interaction versions are bumped and
+    the clicked businesses added to their seen filters.
+    """
+    if not rows:
+        return
+    if db is not None:
+        await db.execute(insert(UserClick).values(rows))
+        await db.commit()
+    else:
+        async with get_async_db() as session:
+            await session.execute(insert(UserClick).values(rows))
+            await session.commit()
+    seen: Dict[str, List[str]] = {}
+    for row in rows:
+        seen.setdefault(str(row["user_id"]), []).append(row["business_id"])
+    for user_id in seen:
+        interaction_versions.bump(user_id)
+    await record_seen(seen, db)
+
+
+class ClickWriteBuffer:
+    def __init__(self, max_batch: int = CLICK_FLUSH_MAX_BATCH,
+                 flush_interval: float = CLICK_FLUSH_INTERVAL_MS / 1000,
+                 max_pending: int = CLICK_BUFFER_MAX_PENDING, max_retries: int = CLICK_FLUSH_MAX_RETRIES,
+                 retry_backoff: float = CLICK_FLUSH_RETRY_BACKOFF_MS / 1000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def max_delay(self) -> float:
+        """
+        Worst-case seconds from build_click_row() to the row's commit, without the writes themselves.
+
+        A click can wait behind a full queue of batches, and each batch can
+        take two flush intervals to collect and every retry's backoff to write.
+        """
+        per_batch = 2 * self.flush_interval + self.retry_backoff * (2 ** self.max_retries - 1)
+        return per_batch * (-(-self.max_pending // self.max_batch) + 1)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run(), name="click-write-buffer")
+
+    async def stop(self) -> None:
+        """Stop accepting clicks and flush everything still queued."""
+        if not self.running:
+            return
+        self._closing = True
+        await self._task
+        self._task = None
+
+    async def put(self, row: Dict) -> None:
+        """Queue a row; waits while the buffer is full. Writes directly if the writer is not running."""
+        if not self.running or self._closing:
+            await write_click_rows([row])
+            return
+        await self._queue.put(row)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+            elif self._closing:
+                return
+
+    async def _next_batch(self) -> List[Dict]:
+        """Collect up to max_batch rows, waiting at most flush_interval after the first one."""
+        batch: List[Dict] = []
+        try:
+            batch.append(await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval))
+        except asyncio.TimeoutError:
+            return batch
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            if self._closing:
+                # Shutting down: drain without waiting
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: List[Dict]) -> None:
+        """Write a batch, retrying with exponential backoff; dropped (and counted) only after max_retries."""
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await write_click_rows(batch)
+            except (IntegrityError, DataError):
+                # Retrying the same rows fails the same way: find the bad ones instead
+                flush_failures.inc()
+                await self._flush_rejected(batch)
+                return
+            except Exception:
+                flush_failures.inc()
+                if attempt == self.max_retries:
+                    flush_dropped.inc(len(batch))
+                    logger.exception("Dropped %d buffered clicks after %d attempts", len(batch), attempt + 1)
+                    return
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning("Failed to write %d buffered clicks, retrying in %.2fs", len(batch), delay,
+                               exc_info=True)
+                await asyncio.sleep(delay)
+                continue
+            flush_latency.observe(time.perf_counter() - start)
+            flush_size.observe(len(batch))
+            return
+
+    async def _flush_rejected(self, batch: List[Dict]) -> None:
+        """Write the halves of a batch the database rejected; a single rejected row is dropped."""
+        if len(batch) == 1:
+            flush_dropped.inc()
+            logger.error("Dropped a buffered click the database rejected: %r", batch[0], exc_info=True)
+            return
+        middle = len(batch) // 2
+        await self._flush(batch[:middle])
+        await self._flush(batch[middle:])
+
+
+click_buffer = ClickWriteBuffer()
+# Registered once for the app's buffer; other instances (tests, scripts) would declare it twice
+metrics.Gauge("click_buffer_pending", "Clicks queued but not yet written", func=click_buffer.pending)
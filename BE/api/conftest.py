@@ -0,0 +1,32 @@
+"""
+API tests run against a throwaway SQLite database, set before any api module is imported.
+"""
+import os
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="food-rec-test-"), "test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from benchmarks.local_server import _create_tables  # noqa: E402
+
+_create_tables(os.environ["DATABASE_URL"])
+
+
+@pytest.fixture
+def synthetic_indexes():
+    """Install indexes over a small synthetic catalog, like the server loads them; returns the business index."""
+    from api import recommendation_routes as rec
+    from benchmarks.synthetic_data import category_review_index_from, generate_catalog_and_reviews, liked_businesses
+    from Vectorization.diversity import category_columns
+    from Vectorization.vectorize import cat_to_index
+
+    business_index, _, reviews = generate_catalog_and_reviews(n_businesses=1000, n_yelp_users=500)
+    category_review_index = category_review_index_from(liked_businesses(reviews), business_index)
+    rec._install_indexes(
+        business_index, [], rec._build_user_vectors(category_review_index), rec._build_restaurant_vectors(business_index),
+        rec.build_business_fragments(business_index, {}), None, None, None, None,
+        category_columns(business_index, cat_to_index), rec._build_seen_positions(business_index),
+    )
+    return business_index
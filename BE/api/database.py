@@ -5,9 +5,13 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
+import time
+
+from . import metrics
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
@@ -23,9 +27,61 @@ elif DATABASE_URL.startswith("sqlite:///"):
 else:
     ASYNC_DATABASE_URL = DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
+# Pool sizing — tune with the db_pool_* metrics exported on /metrics
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+pool_checkout_wait = metrics.Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection (includes opening new ones)"
+)
+pool_overflow_events = metrics.Counter(
+    "db_pool_overflow_events_total", "Connections opened beyond DB_POOL_SIZE"
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time and overflow connections."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+    def _create_connection(self):
+        # QueuePool bumps the overflow counter before opening a connection,
+        # so a positive value here means this one is past pool_size
+        if self._overflow > 0:
+            pool_overflow_events.inc()
+        return super()._create_connection()
 
-async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+_connect_args = {}
+if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg://"):
+    _connect_args["prepared_statement_cache_size"] = DB_STATEMENT_CACHE_SIZE
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    query_cache_size=DB_STATEMENT_CACHE_SIZE,
+    connect_args=_connect_args,
+)
+
+metrics.Gauge("db_pool_size", "Configured pool size", func=lambda: async_engine.pool.size())
+metrics.Gauge("db_pool_checked_out", "Connections currently checked out", func=lambda: async_engine.pool.checkedout())
+metrics.Gauge("db_pool_checked_in", "Idle connections in the pool", func=lambda: async_engine.pool.checkedin())
+metrics.Gauge("db_pool_overflow", "Connections currently open beyond pool_size",
+              func=lambda: max(async_engine.pool.overflow(), 0))
 
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
@@ -35,10 +91,23 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# Sync engine is only needed by scripts, so it is created on first use
+_engine = None
+_SessionLocal = None
+
+
+def get_sync_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, pool_pre_ping=DB_POOL_PRE_PING)
+    return _engine
+
 
 def get_db():
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
+    global _SessionLocal
+    if _SessionLocal is None:
+        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
+    db = _SessionLocal()
     try:
         yield db
     finally:
@@ -57,10 +126,15 @@ async def get_async_db():
 
 
 async def get_db_dependency():
-    """FastAPI Depends()-compatible version — use as: db: AsyncSession = Depends(get_db_dependency)"""
+    """FastAPI Depends()-compatible version — use as: db: AsyncSession = Depends(get_db_dependency)
+
+    FastAPI caches dependencies per request, so every Depends(get_db_dependency) in one
+    request shares this single session. (get_current_user doesn't use it: a cached
+    token needs no session at all.)
+    """
     async with AsyncSessionLocal() as db:
         try:
             yield db
         except Exception:
             await db.rollback()
-            raise
\ No newline at end of file
+            raise
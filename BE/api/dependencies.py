@@ -3,36 +3,63 @@ Shared dependencies for the API
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import sys, os
+import sys, os, time
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from Login.auth import verify_token
+from Login.auth import decode_token
 from . import schemas, models
-from .database import get_db_dependency
+from .cache import TTLCache
+from .database import get_async_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Verified token -> UserInDB. Entries never outlive the token's own `exp`.
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db_dependency)
-):
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_ENTRIES, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id) -> None:
+    """Forget every cached token for a user — call after the user row changes."""
+    _token_cache.discard_where(lambda user: user.id == user_id)
+
+
+async def user_for_token(token: str) -> schemas.UserInDB:
+    """
+    The user a bearer token belongs to, or 401.
+
+    Cached tokens are answered from memory; a session is only opened on a miss.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    username = verify_token(token, credentials_exception)
-    user_result = await db.execute(select(models.User).where(models.User.username == username))
-    user = user_result.scalar_one_or_none()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    payload = decode_token(token, credentials_exception)
+    username = payload["sub"]
+    async with get_async_db() as db:
+        user_result = await db.execute(select(models.User).where(models.User.username == username))
+        user = user_result.scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    return schemas.UserInDB.from_orm(user)
\ No newline at end of file
+    user_in_db = schemas.UserInDB.from_orm(user)
+    exp = payload.get("exp")
+    if exp is not None:
+        _token_cache.set(token, user_in_db, ttl=exp - time.time())
+    return user_in_db
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    return await user_for_token(token)
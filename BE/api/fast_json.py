@@ -0,0 +1,42 @@
+"""
+JSON responses assembled from pre-encoded fragments
+
+Values wrapped in RawJSON are already valid JSON and are copied into the
+output as-is; everything else goes through json.dumps once. Returning a
+FastJSONResponse from a route also skips FastAPI's jsonable_encoder pass.
+"""
+import json
+from typing import Any, Iterable
+
+from fastapi.responses import Response
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class RawJSON(str):
+    """A string that already holds encoded JSON."""
+
+    __slots__ = ()
+
+
+def raw_array(items: Iterable[str]) -> RawJSON:
+    """JSON array from already-encoded items."""
+    return RawJSON("[" + ",".join(items) + "]")
+
+
+def encode_value(value: Any) -> str:
+    """Encode `value`, splicing in RawJSON fragments found at any depth of dicts and lists."""
+    if isinstance(value, RawJSON):
+        return value
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{_encode(str(k))}:{encode_value(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(encode_value(v) for v in value) + "]"
+    return _encode(value)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_value(content).encode("utf-8")
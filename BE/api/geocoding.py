@@ -0,0 +1,173 @@
+"""
+Reverse geocoding for location pings
+
+Lookups are answered locally from the Yelp business coordinates (nearest
+business -> its city/state) through a grid spatial index, and cached per
+quantized lat/lng cell. Nominatim is only called when the local lookup
+has no business nearby, through one pooled client.
+"""
+import logging
+import math
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REVERSE_GEOCODE_CELL_DEGREES = float(os.getenv("REVERSE_GEOCODE_CELL_DEGREES", "0.01"))  # ~1 km cache cells
+REVERSE_GEOCODE_MAX_KM = float(os.getenv("REVERSE_GEOCODE_MAX_KM", "25"))
+REVERSE_GEOCODE_CACHE_TTL_SECONDS = float(os.getenv("REVERSE_GEOCODE_CACHE_TTL_SECONDS", "86400"))
+REVERSE_GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv("REVERSE_GEOCODE_CACHE_MAX_ENTRIES", "50000"))
+REVERSE_GEOCODE_REMOTE_FALLBACK = os.getenv("REVERSE_GEOCODE_REMOTE_FALLBACK", "true").lower() == "true"
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse")
+
+CANADIAN_PROVINCES = {"AB", "BC", "MB", "NB", "NL", "NS", "NT", "NU", "ON", "PE", "QC", "SK", "YT"}
+EARTH_RADIUS_KM = 6371.0
+
+EMPTY_RESULT = {"city": None, "state": None, "country": None}
+
+
+class LocalReverseGeocoder:
+    """Nearest-business lookup over a uniform lat/lng grid."""
+
+    def __init__(self, grid_degrees: float = 0.1):
+        self.grid_degrees = grid_degrees
+        self._lats = np.empty(0)
+        self._lngs = np.empty(0)
+        self._places: list = []  # (city, state) per point
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.grid_degrees)), int(math.floor(lng / self.grid_degrees))
+
+    def build(self, points: Iterable[Tuple[float, float, str, str]]) -> None:
+        """Index (lat, lng, city, state) tuples; rows without a city or coordinates are skipped."""
+        lats, lngs, places = [], [], []
+        for lat, lng, city, state in points:
+            if lat is None or lng is None or not city:
+                continue
+            lats.append(float(lat))
+            lngs.append(float(lng))
+            places.append((city.strip(), (state or "").strip() or None))
+
+        buckets: Dict[Tuple[int, int], list] = {}
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            buckets.setdefault(self._cell(lat, lng), []).append(i)
+
+        # May run in a worker thread while the loop serves lookups: `_places` is
+        # assigned last, and lookup() returns None until it is non-empty
+        self._lats = np.asarray(lats)
+        self._lngs = np.asarray(lngs)
+        self._grid = {cell: np.asarray(ids, dtype=np.int64) for cell, ids in buckets.items()}
+        self._places = places
+
+    def lookup(self, lat: float, lng: float, max_km: float = REVERSE_GEOCODE_MAX_KM) -> Optional[dict]:
+        """City/state/country of the nearest indexed business within max_km, or None."""
+        if not self._places:
+            return None
+
+        # Grid rings to scan so that every point within max_km is covered
+        lat_rings = int(math.ceil(max_km / (111.0 * self.grid_degrees)))
+        lng_scale = max(math.cos(math.radians(lat)), 0.01)
+        lng_rings = int(math.ceil(max_km / (111.0 * self.grid_degrees * lng_scale)))
+
+        row, col = self._cell(lat, lng)
+        candidates = [
+            self._grid[cell]
+            for dr in range(-lat_rings, lat_rings + 1)
+            for dc in range(-lng_rings, lng_rings + 1)
+            if (cell := (row + dr, col + dc)) in self._grid
+        ]
+        if not candidates:
+            return None
+        ids = np.concatenate(candidates)
+
+        # Equirectangular approximation — accurate enough at city scale
+        dlat = np.radians(self._lats[ids] - lat)
+        dlng = np.radians(self._lngs[ids] - lng) * lng_scale
+        dist_km = EARTH_RADIUS_KM * np.sqrt(dlat * dlat + dlng * dlng)
+        nearest = int(np.argmin(dist_km))
+        if dist_km[nearest] > max_km:
+            return None
+
+        city, state = self._places[ids[nearest]]
+        return {
+            "city":    city,
+            "state":   state,
+            "country": "Canada" if state in CANADIAN_PROVINCES else "United States",
+        }
+
+
+local_geocoder = LocalReverseGeocoder()
+_cell_cache = TTLCache(maxsize=REVERSE_GEOCODE_CACHE_MAX_ENTRIES, ttl=REVERSE_GEOCODE_CACHE_TTL_SECONDS)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _quantize(lat: float, lng: float) -> Tuple[int, int]:
+    return round(lat / REVERSE_GEOCODE_CELL_DEGREES), round(lng / REVERSE_GEOCODE_CELL_DEGREES)
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=5.0,
+            headers={"User-Agent": "your-app-name"},
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _remote_reverse_geocode(lat: float, lng: float) -> Optional[dict]:
+    """Resolve lat/lng to city, state, country via Nominatim; None on errors and empty answers."""
+    try:
+        response = await _get_client().get(NOMINATIM_URL, params={"lat": lat, "lon": lng, "format": "json"})
+        response.raise_for_status()  # 429 rate limits and 5xx must not be cached as "nowhere"
+        address = response.json().get("address")
+        if not address:
+            return None
+        return {
+            "city": (
+                address.get("city")
+                or address.get("town")
+                or address.get("village")
+            ),
+            "state":   address.get("state"),
+            "country": address.get("country"),
+        }
+    except Exception as e:
+        logger.debug("Nominatim reverse geocode failed: %s", e)
+        return None
+
+
+async def reverse_geocode(lat: float, lng: float) -> dict:
+    """Resolve lat/lng to city, state, country — local index first, Nominatim as a fallback."""
+    key = _quantize(lat, lng)
+    cached = _cell_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = local_geocoder.lookup(lat, lng)
+    if result is None and REVERSE_GEOCODE_REMOTE_FALLBACK:
+        result = await _remote_reverse_geocode(lat, lng)
+
+    if result is None:
+        # Nothing found — don't cache, a later remote attempt may succeed
+        return dict(EMPTY_RESULT)
+
+    _cell_cache.set(key, result)
+    return result
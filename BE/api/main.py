@@ -1,28 +1,38 @@
 """
 Main FastAPI application
 """
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+from Login.auth import shutdown_password_hashing
+from . import metrics
+from .click_buffer import click_buffer
+from .profiling import ADMIN_USER_IDS, ProfilingMiddleware
+from .geocoding import close_client as close_geocoding_client
 from .auth_routes import router as auth_router
-from .places_routes import router as places_router
+from .places_routes import router as places_router, close_client as close_places_client
 from .tracking_routes import router as tracking_router
-from .recommendation_routes import router as recommendation_router, load_indexes
+from .recommendation_routes import router as recommendation_router, index_progress, load_indexes_in_background
 
 load_dotenv()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load recommendation indexes once when the server starts
-    try:
-        load_indexes()
-    except Exception as e:
-        print(f"Warning: Could not load recommendation indexes: {e}")
+    # Indexes load in the background: auth and tracking serve right away,
+    # recommendation routes answer 503 until /ready reports them loaded
+    index_task = asyncio.create_task(load_indexes_in_background(), name="load-indexes")
+    await click_buffer.start()
     yield
-    # Nothing to clean up
+    if not index_task.done():
+        index_task.cancel()
+    await click_buffer.stop()
+    await close_geocoding_client()
+    await close_places_client()
+    shutdown_password_hashing()
 
 
 app = FastAPI(
@@ -32,6 +42,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# ?profile=1 for admins only; not installed at all unless ADMIN_USER_IDS is set
+if ADMIN_USER_IDS:
+    app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -72,6 +88,20 @@ def health_check():
     return {"status": "healthy", "message": "API is running successfully"}
 
 
+@app.get("/ready")
+def readiness_check(response: Response):
+    """503 until the recommendation indexes are loaded; the body carries per-phase progress."""
+    if not index_progress.ready:
+        response.status_code = 503
+    return {"ready": index_progress.ready, "indexes": index_progress.as_dict()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    # As a header, not media_type: Starlette would append a second charset to text/*
+    return Response(content=metrics.render_latest(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
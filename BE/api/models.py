@@ -1,8 +1,7 @@
 """
 Database models
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Index, LargeBinary, Uuid
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
@@ -12,7 +11,7 @@ from .database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=True)
     hashed_password = Column(String(255), nullable=False)
@@ -24,8 +23,8 @@ class User(Base):
 class Session(Base):
     __tablename__ = "sessions"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     token = Column(Text, nullable=False)
     expires_at = Column(DateTime(timezone=False), nullable=False)
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
@@ -36,7 +35,7 @@ class UserPreference(Base):
     __tablename__ = "user_preferences"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     cuisine_type = Column(String(100), nullable=True)
     price_level = Column(Integer, nullable=True)  # 0-4 for Google Places
     dietary_restrictions = Column(Text, nullable=True)  # JSON string for flexibility
@@ -48,7 +47,7 @@ class FavoriteRestaurant(Base):
     __tablename__ = "favorite_restaurants"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     place_id = Column(String(100), nullable=False)  # Google Places place_id
     name = Column(String(200), nullable=False)
     address = Column(Text, nullable=True)
@@ -63,7 +62,7 @@ class SearchHistory(Base):
     __tablename__ = "search_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Nullable for anonymous searches
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Nullable for anonymous searches
     query = Column(String(500), nullable=False)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
@@ -76,18 +75,23 @@ class SearchHistory(Base):
 class UserClick(Base):
     __tablename__ = "user_clicks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # user_id lookups are served by the (user_id, clicked_at DESC) index below
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     business_id = Column(String(100), nullable=False)  # Google Places place_id or business identifier
     lat = Column(Float, nullable=True)
     lng = Column(Float, nullable=True)
     clicked_at = Column(DateTime(timezone=False), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_user_clicks_user_id_clicked_at", "user_id", clicked_at.desc()),
+    )
+
 class UserLocation(Base):
     __tablename__ = "user_location"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
     city = Column(String(100), nullable=True)  # Primary focus - city name
@@ -95,10 +99,45 @@ class UserLocation(Base):
     country = Column(String(50), nullable=True)  # Country
     recorded_at = Column(DateTime(timezone=False), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_user_location_user_id_recorded_at", "user_id", recorded_at.desc()),
+    )
+
 class UserSwipe(Base):
     __tablename__ = "user_swipes"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     business_id = Column(String(100), nullable=False)
     swiped_at = Column(DateTime(timezone=False), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_user_swipes_user_id_swiped_at", "user_id", swiped_at.desc()),
+    )
+
+
+class PrecomputedRecommendation(Base):
+    __tablename__ = "precomputed_recommendations"
+
+    # One row per user, replaced by each run of the batch job (python -m api.precompute)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    engine = Column(String(32), nullable=False)  # engine that ranked the list
+    diversity = Column(Float, nullable=False)
+    top_k = Column(Integer, nullable=False)
+    recommendations = Column(Text, nullable=False)  # JSON [[business_id, score], ...], best first
+    click_count = Column(Integer, nullable=False)
+    swipe_count = Column(Integer, nullable=False)
+    # History snapshot time: interactions after it mean the list is out of date
+    generated_at = Column(DateTime(timezone=False), nullable=False)
+
+
+class UserSeenFilter(Base):
+    __tablename__ = "user_seen_filters"
+
+    # Bloom filter of every business the user ever clicked or swiped (Vectorization/seen_filter.py),
+    # updated after each click flush and swipe; ranking excludes whatever it contains
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    bits = Column(LargeBinary, nullable=False)  # packed bit array, its length fixes the size
+    hashes = Column(Integer, nullable=False)
+    item_count = Column(Integer, nullable=False)  # distinct businesses added, for the false-positive rate
+    updated_at = Column(DateTime(timezone=False), nullable=False)
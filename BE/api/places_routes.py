@@ -3,12 +3,15 @@ Google Places API routes
 """
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional
-import requests
+import asyncio
+import httpx
 import os
+import time
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from . import schemas, models
+from . import schemas, models, metrics
+from .cache import TTLCache
 from .database import get_db_dependency
 from .dependencies import get_current_user
 
@@ -19,44 +22,108 @@ if not KEY:
     print("⚠️  WARNING: Google API Key not set - Places search will not work")
     KEY = None
 
+GOOGLE_PLACES_BASE_URL = os.getenv("GOOGLE_PLACES_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+PLACES_DETAILS_CONCURRENCY = int(os.getenv("PLACES_DETAILS_CONCURRENCY", "20"))
+PLACES_DETAILS_CACHE_TTL_SECONDS = float(os.getenv("PLACES_DETAILS_CACHE_TTL_SECONDS", "3600"))
+PLACES_DETAILS_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_DETAILS_CACHE_MAX_ENTRIES", "5000"))
+
+# Search results are cached per normalized query and lat/lng grid cell
+PLACES_SEARCH_CELL_DEGREES = float(os.getenv("PLACES_SEARCH_CELL_DEGREES", "0.005"))  # ~500 m
+PLACES_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("PLACES_SEARCH_CACHE_TTL_SECONDS", "300"))
+PLACES_SEARCH_CACHE_STALE_SECONDS = float(os.getenv("PLACES_SEARCH_CACHE_STALE_SECONDS", "1800"))
+PLACES_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_SEARCH_CACHE_MAX_ENTRIES", "2000"))
+# Google's next_page_token expires within minutes: responses carrying one are fresh for at
+# most this long and never served stale, nor are the pages fetched with a page token
+PLACES_SEARCH_PAGE_TOKEN_TTL_SECONDS = float(os.getenv("PLACES_SEARCH_PAGE_TOKEN_TTL_SECONDS", "60"))
+
+DETAILS_FIELDS = "website,formatted_phone_number,international_phone_number,reviews,opening_hours,url,price_level,editorial_summary"
+
 router = APIRouter(prefix="/places", tags=["places"])
 
+# Shared across requests: one keep-alive connection pool and a place_id -> details cache
+_client: Optional[httpx.AsyncClient] = None
+_details_semaphore = asyncio.Semaphore(PLACES_DETAILS_CONCURRENCY)
+_details_cache = TTLCache(maxsize=PLACES_DETAILS_CACHE_MAX_ENTRIES, ttl=PLACES_DETAILS_CACHE_TTL_SECONDS)
 
-@router.get("/search")
-def search_places(
-    query: str = "restaurants",
-    place_type: Optional[str] = None,
-    keyword: Optional[str] = None,
-    lat: Optional[float] = None,
-    lng: Optional[float] = None,
-    radius: int = 16000,
-    minprice: Optional[int] = None,
-    maxprice: Optional[int] = None,
-    opennow: bool = True,
-    limit: int = 20,
-    page_token: Optional[str] = None
-):
-    if not KEY:
-        raise HTTPException(status_code=503, detail="Google Places API is not configured.")
+# key -> (fetched_at, response). Entries live for TTL + stale window; past the TTL they are
+# still served while a background task refreshes them (unless page tokens are involved).
+_search_cache = TTLCache(
+    maxsize=PLACES_SEARCH_CACHE_MAX_ENTRIES,
+    ttl=PLACES_SEARCH_CACHE_TTL_SECONDS + PLACES_SEARCH_CACHE_STALE_SECONDS,
+)
+_refreshing: set = set()
+_background_tasks: set = set()
+
+search_cache_requests = metrics.Counter(
+    "places_search_cache_requests_total", "Place search cache lookups by result (hit, stale, miss)", ["result"]
+)
+details_cache_requests = metrics.Counter(
+    "places_details_cache_requests_total", "Place details cache lookups by result (hit, miss)", ["result"]
+)
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=GOOGLE_PLACES_BASE_URL,
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=PLACES_DETAILS_CONCURRENCY + 2,
+                max_keepalive_connections=PLACES_DETAILS_CONCURRENCY + 2,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_place_details(place_id: str) -> Optional[dict]:
+    """Details for one place, served from the cache when possible. Failures return None and are not cached."""
+    cached = _details_cache.get(place_id)
+    if cached is not None:
+        details_cache_requests.inc(result="hit")
+        return cached
+    details_cache_requests.inc(result="miss")
+
+    try:
+        async with _details_semaphore:
+            details_res = await _get_client().get(
+                "/details/json",
+                params={"place_id": place_id, "fields": DETAILS_FIELDS, "key": KEY},
+            )
+        payload = details_res.json()
+    except Exception:
+        return None
+    # Quota and key errors come back as 200 with an error status and no result
+    if details_res.status_code != 200 or payload.get("status") != "OK":
+        return None
+
+    details_data = payload.get("result", {})
+    _details_cache.set(place_id, details_data)
+    return details_data
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    return " ".join(value.lower().split()) if value else None
+
+
+def _snap(value: Optional[float]) -> Optional[float]:
+    """Snap a coordinate to the centre of its cache cell."""
+    if value is None:
+        return None
+    return round(round(value / PLACES_SEARCH_CELL_DEGREES) * PLACES_SEARCH_CELL_DEGREES, 6)
 
+
+async def _fetch_search(params: dict, limit: int) -> dict:
+    """Text search plus details for each result, straight from Google."""
     try:
-        url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-        params = {
-            "query": query,
-            "key": KEY,
-            "pagetoken": page_token,
-            "location": f"{lat},{lng}" if lat and lng else None,
-            "type": place_type,
-            "keyword": keyword,
-            "minprice": minprice,
-            "maxprice": maxprice,
-            "opennow": opennow,
-        }
-        if lat and lng:
-            params["radius"] = min(radius, 50000)
-        params = {k: v for k, v in params.items() if v is not None}
-
-        res = requests.get(url, params=params, timeout=5)
+        res = await _get_client().get("/textsearch/json", params=params)
         data = res.json()
     except Exception as e:
         raise HTTPException(500, detail=str(e))
@@ -65,21 +132,13 @@ def search_places(
         raise HTTPException(400, detail=data.get("error_message"))
 
     results = data.get("results", [])[:limit]
-    full_results = []
 
-    for place in results:
-        place_id = place.get("place_id")
-        try:
-            details_res = requests.get(
-                "https://maps.googleapis.com/maps/api/place/details/json",
-                params={
-                    "place_id": place_id,
-                    "fields": "website,formatted_phone_number,international_phone_number,reviews,opening_hours,url,price_level,editorial_summary",
-                    "key": KEY,
-                },
-                timeout=5,
-            )
-            details_data = details_res.json().get("result", {})
+    # Details for every result at once, capped by the shared semaphore
+    all_details = await asyncio.gather(*(fetch_place_details(place.get("place_id")) for place in results))
+
+    full_results = []
+    for place, details_data in zip(results, all_details):
+        if details_data is not None:
             place["website"]                    = details_data.get("website")
             place["phone_number"]               = details_data.get("formatted_phone_number")
             place["international_phone_number"] = details_data.get("international_phone_number")
@@ -88,8 +147,6 @@ def search_places(
             place["google_maps_url"]            = details_data.get("url")
             place["price_level"]                = details_data.get("price_level")
             place["editorial_summary"]          = details_data.get("editorial_summary")
-        except Exception:
-            pass
         full_results.append(place)
 
     return {
@@ -99,6 +156,87 @@ def search_places(
     }
 
 
+def _fresh_for(response: dict) -> float:
+    if response.get("next_page_token"):
+        return min(PLACES_SEARCH_CACHE_TTL_SECONDS, PLACES_SEARCH_PAGE_TOKEN_TTL_SECONDS)
+    return PLACES_SEARCH_CACHE_TTL_SECONDS
+
+
+def _may_serve_stale(params: dict, response: dict) -> bool:
+    """A stale page token is dead: don't hand one out, and don't refresh with one."""
+    return "pagetoken" not in params and not response.get("next_page_token")
+
+
+async def _refresh_search(key: tuple, params: dict, limit: int) -> None:
+    try:
+        response = await _fetch_search(params, limit)
+        _search_cache.set(key, (time.monotonic(), response))
+    except Exception:
+        pass  # keep serving the stale entry until it ages out
+    finally:
+        _refreshing.discard(key)
+
+
+@router.get("/search")
+async def search_places(
+    query: str = "restaurants",
+    place_type: Optional[str] = None,
+    keyword: Optional[str] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius: int = 16000,
+    minprice: Optional[int] = None,
+    maxprice: Optional[int] = None,
+    opennow: bool = True,
+    limit: int = 20,
+    page_token: Optional[str] = None
+):
+    if not KEY:
+        raise HTTPException(status_code=503, detail="Google Places API is not configured.")
+
+    # Nearby users share results: coordinates are snapped to the cache cell before querying
+    lat, lng = (_snap(lat), _snap(lng)) if lat and lng else (None, None)
+    params = {
+        "query": query,
+        "key": KEY,
+        "pagetoken": page_token,
+        "location": f"{lat},{lng}" if lat and lng else None,
+        "type": place_type,
+        "keyword": keyword,
+        "minprice": minprice,
+        "maxprice": maxprice,
+        "opennow": opennow,
+    }
+    if lat and lng:
+        params["radius"] = min(radius, 50000)
+    params = {k: v for k, v in params.items() if v is not None}
+
+    # Google gets the text as typed; only the cache key ignores case and spacing
+    key_params = {k: _normalize_text(v) if k in ("query", "type", "keyword") else v
+                  for k, v in params.items() if k != "key"}
+    key = tuple(sorted(key_params.items())) + (("limit", limit),)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        fetched_at, response = cached
+        if time.monotonic() - fetched_at <= _fresh_for(response):
+            search_cache_requests.inc(result="hit")
+            return response
+
+        if _may_serve_stale(params, response):
+            search_cache_requests.inc(result="stale")
+            if key not in _refreshing:
+                _refreshing.add(key)
+                task = asyncio.create_task(_refresh_search(key, params, limit))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            return response
+
+    search_cache_requests.inc(result="miss")
+    response = await _fetch_search(params, limit)
+    _search_cache.set(key, (time.monotonic(), response))
+    return response
+
+
 @router.post("/favorites")
 async def add_favorite(
     favorite: schemas.FavoriteRestaurantCreate,
@@ -0,0 +1,186 @@
+"""
+Nightly batch job: precomputed recommendations for every user with click history
+
+Loads the recommendation indexes once, then walks the users in batches:
+each batch's recent clicks and swipes come back in one query and their seen
+filters in another, are ranked in parallel across a process pool (workers
+are forked with the indexes already loaded) through the same rank_history()
+the API uses, and the top-k lists replace the users' precomputed_recommendations rows. Every row carries the
+generation timestamp; the API serves it (RECOMMENDATION_PRECOMPUTED=true)
+until the user clicks or swipes again.
+
+    python -m api.precompute [--top-k 50] [--workers 4] [--batch-size 2000]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select, union_all
+
+from Vectorization.seen_filter import SeenFilter
+
+from . import recommendation_routes as rec
+from .click_buffer import click_buffer
+from .database import get_async_db
+from .models import PrecomputedRecommendation, UserClick, UserSwipe
+from .seen_filters import get_seen_filters
+
+PRECOMPUTE_TOP_K = 50        # the largest top_k the API accepts
+PRECOMPUTE_BATCH_SIZE = 2000  # users per history query / write transaction
+HISTORY_LIMIT = 100          # same window as the online history query
+# Buffered clicks are stamped when queued but committed later, after any flush retries and
+# the batches queued ahead of them; stamping the snapshot that much earlier makes such a
+# click count as "newer" (a couple of minutes with the default CLICK_* settings)
+SNAPSHOT_MARGIN = timedelta(seconds=click_buffer.max_delay())
+
+# (user_id, recent clicks, recent swipes, seen filter)
+History = Tuple[str, List[str], List[str], Optional[SeenFilter]]
+
+
+async def get_all_users_with_clicks() -> List[str]:
+    """Get all user IDs that have click history."""
+    async with get_async_db() as db:
+        result = await db.execute(select(UserClick.user_id).distinct())
+        return [str(uid) for uid in result.scalars().all()]
+
+
+def build_bulk_history_query(user_ids: Sequence[str], limit: int = HISTORY_LIMIT):
+    """
+    The `limit` most recent clicks and swipes of every user in `user_ids`, as
+    (user_id, business_id, kind) rows: build_history_query() for many users at once.
+    """
+    user_ids = [uuid.UUID(str(uid)) for uid in user_ids]
+    clicks = (
+        select(UserClick.user_id, UserClick.business_id, literal("click").label("kind"),
+               func.row_number().over(partition_by=UserClick.user_id,
+                                      order_by=UserClick.clicked_at.desc()).label("n"))
+        .where(UserClick.user_id.in_(user_ids))
+        .subquery()
+    )
+    swipes = (
+        select(UserSwipe.user_id, UserSwipe.business_id, literal("swipe").label("kind"),
+               func.row_number().over(partition_by=UserSwipe.user_id,
+                                      order_by=UserSwipe.swiped_at.desc()).label("n"))
+        .where(UserSwipe.user_id.in_(user_ids))
+        .subquery()
+    )
+    return union_all(
+        select(clicks.c.user_id, clicks.c.business_id, clicks.c.kind).where(clicks.c.n <= limit),
+        select(swipes.c.user_id, swipes.c.business_id, swipes.c.kind).where(swipes.c.n <= limit),
+    )
+
+
+async def load_histories(user_ids: Sequence[str]) -> List[History]:
+    histories: Dict[str, Tuple[List[str], List[str]]] = {str(uid): ([], []) for uid in user_ids}
+    async with get_async_db() as db:
+        result = await db.execute(build_bulk_history_query(user_ids))
+        for user_id, business_id, kind in result.all():
+            clicks, swipes = histories[str(user_id)]
+            (clicks if kind == "click" else swipes).append(str(business_id))
+        seen_filters = await get_seen_filters(user_ids, db)
+    return [(uid, clicks, swipes, seen_filters.get(uid))
+            for uid, (clicks, swipes) in histories.items() if clicks or swipes]
+
+
+def _init_worker() -> None:
+    # Forked workers inherit the parent's indexes; spawned ones load their own
+    if not rec._business_index:
+        rec.load_indexes()
+
+
+def rank_histories(histories: List[History], top_k: int) -> List[Tuple]:
+    """Rank a chunk of histories in a worker, with the deployment's default engine and diversity."""
+    ranked = []
+    for user_id, clicks, swipes, seen_filter in histories:
+        engine, top = rec.rank_history(clicks, swipes, top_k, seen_filter=seen_filter)
+        if top:
+            ranked.append((user_id, engine, [(bid, round(float(score), 4)) for bid, score in top],
+                           len(clicks), len(swipes)))
+    return ranked
+
+
+async def write_precomputed(rows: List[Tuple], user_ids: Sequence[str], top_k: int, generated_at: datetime) -> None:
+    """Replace the batch's rows in one transaction; users that ranked nothing lose theirs."""
+    async with get_async_db() as db:
+        await db.execute(delete(PrecomputedRecommendation)
+                         .where(PrecomputedRecommendation.user_id.in_([uuid.UUID(uid) for uid in user_ids])))
+        if rows:
+            await db.execute(insert(PrecomputedRecommendation).values([
+                {
+                    "user_id":         uuid.UUID(user_id),
+                    "engine":          engine,
+                    "diversity":       rec.RECOMMENDATION_DIVERSITY,
+                    "top_k":           top_k,
+                    "recommendations": json.dumps(ranked, separators=(",", ":")),
+                    "click_count":     click_count,
+                    "swipe_count":     swipe_count,
+                    "generated_at":    generated_at,
+                }
+                for user_id, engine, ranked, click_count, swipe_count in rows
+            ]))
+        await db.commit()
+
+
+def _chunks(items: list, n: int) -> List[list]:
+    size = max(1, -(-len(items) // n))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+async def precompute_all(top_k: int = PRECOMPUTE_TOP_K, workers: int = None,
+                         batch_size: int = PRECOMPUTE_BATCH_SIZE) -> Dict:
+    """Rank every user with click history and store the lists; returns counts and timings."""
+    workers = workers or os.cpu_count() or 1
+    generated_at = datetime.utcnow() - SNAPSHOT_MARGIN
+    stats = {"users": 0, "written": 0, "fetch_s": 0.0, "rank_s": 0.0, "write_s": 0.0}
+
+    user_ids = await get_all_users_with_clicks()
+    stats["users"] = len(user_ids)
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+
+            t = time.perf_counter()
+            histories = await load_histories(batch)
+            stats["fetch_s"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(pool, rank_histories, chunk, top_k) for chunk in _chunks(histories, workers)
+            ))
+            rows = [row for chunk in chunks for row in chunk]
+            stats["rank_s"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            await write_precomputed(rows, batch, top_k, generated_at)
+            stats["write_s"] += time.perf_counter() - t
+            stats["written"] += len(rows)
+            print(f"  {min(start + batch_size, len(user_ids))}/{len(user_ids)} users")
+    return {**stats, "generated_at": generated_at.isoformat()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=PRECOMPUTE_TOP_K)
+    parser.add_argument("--workers", type=int, default=None, help="ranking processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=PRECOMPUTE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    rec.load_indexes()
+    start = time.perf_counter()
+    stats = asyncio.run(precompute_all(args.top_k, args.workers, args.batch_size))
+    print(f"Precomputed {stats['written']} of {stats['users']} users in {time.perf_counter() - start:.1f}s "
+          f"(fetch {stats['fetch_s']:.1f}s, rank {stats['rank_s']:.1f}s, write {stats['write_s']:.1f}s), "
+          f"generated_at {stats['generated_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Opt-in per-request profiling for admin users
+
+Add `?profile=1` to any API request (with an admin's bearer token) to run it
+under cProfile and get the hot functions back instead of the normal body:
+
+    {"status_code": 200, "response": <original body>, "profile": {...}}
+
+`?profile=file` returns the raw profile as a downloadable .prof file
+(open it with `python -m pstats` or snakeviz); the original status is in the
+X-Original-Status header.
+
+The middleware is only installed when ADMIN_USER_IDS is set, and requests
+without `profile=` in the query string are passed straight through. Admins
+are identified by user id (as returned by /auth/me), after the token is
+resolved to an existing user exactly like get_current_user does: usernames
+can be registered or changed by anyone, ids cannot.
+"""
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import time
+from typing import List
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+
+from .dependencies import user_for_token
+
+logger = logging.getLogger(__name__)
+
+ADMIN_USER_IDS = {user_id.strip().lower() for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+if os.getenv("ADMIN_USERNAMES"):
+    logger.warning("ADMIN_USERNAMES is no longer supported: list the admins' user ids in ADMIN_USER_IDS")
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "25"))
+PROFILE_SORT = os.getenv("PROFILE_SORT", "cumulative")
+
+_SUMMARY_MODES = {"1", "true", "summary"}
+_FILE_MODES = {"file", "prof", "pstats"}
+
+
+async def _bearer_user(scope):
+    """The existing user the request's bearer token belongs to, or None."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                return await user_for_token(token)
+            except HTTPException:
+                return None
+    return None
+
+
+def summarize(profiler: cProfile.Profile, limit: int = PROFILE_TOP_FUNCTIONS, sort: str = PROFILE_SORT) -> List[dict]:
+    """Top `limit` functions of a finished profile, as JSON-friendly dicts."""
+    stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        primitive_calls, calls, total_time, cumulative_time, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function":        name,
+            "file":            filename,
+            "line":            line,
+            "calls":           calls,
+            "primitive_calls": primitive_calls,
+            "total_time":      round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+        })
+    return rows
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles admin requests carrying `?profile=`.
+
+    cProfile follows the thread, not the task, so anything else the event loop
+    runs while the request awaits shows up too. Profiled requests are
+    serialized (only one profiler can be active at a time), which keeps the
+    output attributable on a quiet worker.
+    """
+
+    def __init__(self, app, admin_user_ids=None):
+        self.app = app
+        self.admin_user_ids = {str(user_id).lower() for user_id in (ADMIN_USER_IDS if admin_user_ids is None
+                                                                     else admin_user_ids)}
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        # Cheap byte check first so normal requests pay nothing beyond it
+        if scope["type"] != "http" or b"profile=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+
+        mode = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0].lower()
+        if mode not in _SUMMARY_MODES and mode not in _FILE_MODES:
+            await self.app(scope, receive, send)
+            return
+
+        user = await _bearer_user(scope)
+        if user is None or str(user.id).lower() not in self.admin_user_ids:
+            # Not an admin: serve the request normally, without revealing the feature
+            await self.app(scope, receive, send)
+            return
+
+        start_message = {}
+        body = bytearray()
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        async with self._lock:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+
+        status_code = start_message.get("status", 500)
+        logger.info("Profiled %s %s for %s (%s) in %.3fs", scope["method"], scope["path"], user.username, user.id,
+                    elapsed)
+
+        if mode in _FILE_MODES:
+            profiler.create_stats()
+            payload = marshal.dumps(profiler.stats)
+            filename = scope["path"].strip("/").replace("/", "_") or "root"
+            headers = [
+                (b"content-type", b"application/octet-stream"),
+                (b"content-disposition", f'attachment; filename="{filename}.prof"'.encode()),
+                (b"x-original-status", str(status_code).encode()),
+            ]
+        else:
+            original_type = dict(start_message.get("headers", ())).get(b"content-type", b"")
+            if original_type.startswith(b"application/json") and body:
+                original = json.loads(body)
+            else:
+                original = body.decode("utf-8", errors="replace")
+            payload = json.dumps({
+                "status_code": status_code,
+                "response":    original,
+                "profile": {
+                    "wall_seconds": round(elapsed, 6),
+                    "sort":         PROFILE_SORT,
+                    "functions":    summarize(profiler),
+                },
+            }).encode()
+            headers = [(b"content-type", b"application/json")]
+
+        headers.append((b"content-length", str(len(payload)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
@@ -2,21 +2,43 @@
 Recommendation API Routes
 Uses your existing algorithm with real database data
 """
-import sys
 import os
 import json
+import array
+import base64
 import random
+import secrets
 import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from itertools import chain
 from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
-from Vectorization.vectorize import build_yelp_user_vectors, cat_to_index, build_click_vector, find_neighbors, aggregate_neighbor_vector, rank_restaurants
+from Vectorization.vocabulary import CategoryVocabulary, VOCABULARY_FILENAME
+from Vectorization.cooccurrence import CooccurrenceIndex, COOCCURRENCE_FILENAME
+from Vectorization.als import BusinessEmbeddings, ALS_FILENAME
+from Vectorization.popularity import PopularityLists, POPULARITY_FILENAME
+from Vectorization.diversity import category_columns, mmr_rerank
+from Vectorization.clusters import TasteClusters, TASTE_CLUSTERS_FILENAME
+from Vectorization.signatures import SignatureIndex, build_signatures
+from Vectorization.seen_filter import BloomPositions, SeenFilter
+from Vectorization.quantize import QuantizedMatrix, VECTOR_DTYPES, quantization_report
+from Vectorization.vectorize import vocabulary, build_yelp_user_matrix, cat_to_index, build_click_vector, l2_normalize
 from sqlalchemy.ext.asyncio import AsyncSession
-from . import schemas
+from . import schemas, metrics
+from .fast_json import FastJSONResponse, RawJSON, raw_array
 from .dependencies import get_current_user
-from .database import get_async_db
-from .models import UserClick, UserLocation, UserSwipe
-from sqlalchemy import select
+from .database import get_async_db, get_db_dependency
+from .models import PrecomputedRecommendation, UserClick, UserLocation, UserPreference, UserSwipe
+from .geocoding import local_geocoder
+from .cache import TTLCache, interaction_versions
+from .seen_filters import (
+    RECOMMENDATION_SEEN_FILTER_BITS, RECOMMENDATION_SEEN_FILTER_HASHES, get_seen_filter, record_seen,
+)
+from sqlalchemy import func, select, literal, or_, union_all
+from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
@@ -25,78 +47,486 @@ router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 # ---------------------------------------------------------------------------
 _business_index: dict = {}
 _business_names: dict = {}
-_yelp_user_vectors = None
+# business_id -> (JSON text up to the score, JSON text after it) of a recommendation item
+_business_fragments: Dict[str, Tuple[str, str]] = {}
+_yelp_user_vectors: Optional[QuantizedMatrix] = None   # one row per Yelp user, ids = user ids
+_restaurant_vectors: Optional[SignatureIndex] = None    # one row per category signature, ids = business ids
 _cat_to_index = None
+_cooccurrence: Optional[CooccurrenceIndex] = None  # optional, only if the data dir has one
+_embeddings: Optional[BusinessEmbeddings] = None   # optional ALS business factors
+_popularity: Optional[PopularityLists] = None      # optional cold-start lists
+_taste_clusters: Optional[TasteClusters] = None    # optional k-means clusters with precomputed rankings
+# business_id -> category vector columns, for the diversity re-ranking
+_category_columns: Dict[str, Tuple[int, ...]] = {}
+# Business ids in business index order (the rows engines exclude by), and their seen filter bit positions
+_business_ids = None
+_seen_positions = None
 
+# Where the Yelp-derived index files live; point elsewhere to run on other (e.g. synthetic) data
+RECOMMENDATION_DATA_DIR = os.getenv(
+    "RECOMMENDATION_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data_extraction")
+)
 
-def load_indexes():
-    """
-    Load all heavy data files and precompute Yelp user vectors once at startup.
-    Called from main.py lifespan / startup event.
-    """
-    global _business_index, _business_names, _yelp_user_vectors, _cat_to_index
+# Engine used when a request doesn't pick one: "category", "clusters", "cooccurrence" or "als"
+RECOMMENDATION_ENGINE = os.getenv("RECOMMENDATION_ENGINE", "category")
+# Taste clusters whose precomputed lists the "clusters" engine merges per request
+RECOMMENDATION_CLUSTER_PROBES = int(os.getenv("RECOMMENDATION_CLUSTER_PROBES", "3"))
+SWIPE_WEIGHT = 3.0  # a right swipe counts as much as three clicks
 
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    business_index_path  = os.path.join(base_dir, "data_extraction", "complete_business_index.json")
-    category_review_path = os.path.join(base_dir, "data_extraction", "category_review_index.json")
-    business_names_path  = os.path.join(base_dir, "data_extraction", "yelp_business_food_only.jsonl")
+# MMR re-ranking of the engine's top top_k + RECOMMENDATION_DIVERSITY_CANDIDATES candidates:
+# 0 keeps the score order, 1 only spreads categories
+RECOMMENDATION_DIVERSITY = float(os.getenv("RECOMMENDATION_DIVERSITY", "0.3"))
+RECOMMENDATION_DIVERSITY_CANDIDATES = int(os.getenv("RECOMMENDATION_DIVERSITY_CANDIDATES", "100"))
 
-    print("Loading recommendation indexes...")
+# Storage of the user/restaurant category vectors: float64, float32, float16 or int8.
+# A smaller dtype is only kept if its top-k overlap with float64 on a sample of
+# rows is at least RECOMMENDATION_VECTOR_MIN_OVERLAP; otherwise the next more precise one is.
+RECOMMENDATION_VECTOR_DTYPE = os.getenv("RECOMMENDATION_VECTOR_DTYPE", "float64")
+RECOMMENDATION_VECTOR_MIN_OVERLAP = float(os.getenv("RECOMMENDATION_VECTOR_MIN_OVERLAP", "0.95"))
+VECTOR_CHECK_QUERIES = 32
+VECTOR_CHECK_TOP_K = 10
 
-    with open(business_index_path, "r", encoding="utf-8") as f:
-        _business_index = json.load(f)
+# Serve the lists written by the batch job (python -m api.precompute) to users whose
+# history hasn't changed since, when they are at most this old; everyone else is ranked online
+RECOMMENDATION_PRECOMPUTED = os.getenv("RECOMMENDATION_PRECOMPUTED", "false").lower() == "true"
+RECOMMENDATION_PRECOMPUTED_MAX_AGE_HOURS = float(os.getenv("RECOMMENDATION_PRECOMPUTED_MAX_AGE_HOURS", "36"))
 
-    with open(category_review_path, "r", encoding="utf-8") as f:
-        category_review_index = json.load(f)
+# /recommendations/page ranks this many businesses once per scroll session and serves
+# later pages from the cached list until the user's interaction version changes
+RECOMMENDATION_PAGE_DEPTH = int(os.getenv("RECOMMENDATION_PAGE_DEPTH", "200"))
+RECOMMENDATION_PAGE_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_PAGE_CACHE_TTL_SECONDS", "1800"))
+RECOMMENDATION_PAGE_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMENDATION_PAGE_CACHE_MAX_ENTRIES", "5000"))
+
+# session -> (user_id, interaction version, requested engine, requested diversity,
+#             ranked business ids, their scores, response fields from rank_user)
+_page_sessions = TTLCache(maxsize=RECOMMENDATION_PAGE_CACHE_MAX_ENTRIES, ttl=RECOMMENDATION_PAGE_CACHE_TTL_SECONDS)
+
+stage_latency = metrics.Histogram(
+    "recommendation_stage_seconds", "Time spent in each recommendation pipeline stage", ["stage"]
+)
+page_requests = metrics.Counter(
+    "recommendation_page_requests_total",
+    "Recommendation pages by how their ranked list was obtained (ranked, cached, reranked)", ["result"]
+)
+precomputed_lookups = metrics.Counter(
+    "recommendation_precomputed_total",
+    "Precomputed list lookups by result (hit, stale, mismatch, miss)", ["result"]
+)
+metrics.Gauge("recommendation_index_businesses", "Businesses in the loaded index",
+              func=lambda: len(_business_index))
+metrics.Gauge("recommendation_index_yelp_users", "Yelp user vectors available for neighbor search",
+              func=lambda: len(_yelp_user_vectors) if _yelp_user_vectors is not None else 0)
+metrics.Gauge("recommendation_index_restaurant_signatures", "Distinct category signatures scored per request",
+              func=lambda: _restaurant_vectors.n_signatures if _restaurant_vectors is not None else 0)
+vector_bytes = metrics.Gauge("recommendation_vector_bytes", "Memory held by each category vector matrix",
+                             ["matrix"])
+metrics.Gauge("recommendation_index_categories", "Dimensions of the category vectors",
+              func=lambda: len(_cat_to_index) if _cat_to_index is not None else 0)
+metrics.Gauge("recommendation_index_cooccurrence_businesses", "Businesses in the co-occurrence index",
+              func=lambda: len(_cooccurrence) if _cooccurrence is not None else 0)
+metrics.Gauge("recommendation_index_als_businesses", "Businesses with ALS embeddings",
+              func=lambda: len(_embeddings) if _embeddings is not None else 0)
+metrics.Gauge("recommendation_index_taste_clusters", "Taste clusters with a precomputed ranking",
+              func=lambda: len(_taste_clusters) if _taste_clusters is not None else 0)
+metrics.Gauge("recommendation_index_popularity_cities", "Cities with a precomputed popularity list",
+              func=lambda: len(_popularity.by_city) if _popularity is not None else 0)
 
-    _cat_to_index = cat_to_index
-    _yelp_user_vectors = build_yelp_user_vectors(category_review_index, cat_to_index)
 
+class IndexLoadProgress:
+    """Per-phase state and timings of the index load, reported by /ready."""
+
+    PHASES = ("business_index", "category_review_index", "business_names", "cooccurrence",
+              "als_embeddings", "popularity", "taste_clusters", "yelp_user_vectors", "restaurant_vectors",
+              "response_fragments", "category_columns", "seen_positions", "geocoder")
+
+    def __init__(self):
+        self.state = "pending"  # pending -> loading -> ready | failed
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.phases = {name: {"state": "pending", "seconds": None} for name in self.PHASES}
+        self.vectors: Dict[str, Any] = {}  # matrix -> dtype, bytes and quantization check
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    @contextmanager
+    def phase(self, name: str):
+        entry = self.phases[name]
+        entry["state"] = "running"
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            entry["state"] = "failed"
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+        entry["state"] = "done"
+
+    def skip(self, name: str) -> None:
+        """Mark an optional phase whose input is absent."""
+        self.phases[name]["state"] = "skipped"
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "state":              self.state,
+            "error":              self.error,
+            "elapsed_seconds":    elapsed,
+            "vocabulary_version": vocabulary.version,
+            "phases":             self.phases,
+            "vectors":            self.vectors,
+        }
+
+
+index_progress = IndexLoadProgress()
+
+metrics.Gauge("recommendation_index_ready", "1 once the recommendation indexes are loaded",
+              func=lambda: int(index_progress.ready))
+
+
+def _read_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_business_rows(path: str) -> List[Tuple]:
+    """(business_id, name, lat, lng, city, state) per line of the Yelp business file."""
+    rows = []
     try:
-        with open(business_names_path, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             for line in f:
                 business = json.loads(line.strip())
-                bid  = business.get("business_id")
-                name = business.get("name")
-                if bid and name and bid in _business_index:
-                    _business_names[bid] = name
+                rows.append((
+                    business.get("business_id"),
+                    business.get("name"),
+                    business.get("latitude"),
+                    business.get("longitude"),
+                    business.get("city"),
+                    business.get("state"),
+                ))
     except FileNotFoundError:
         print("Warning: business names file not found — will use IDs as fallback names")
+    return rows
+
+
+def _load_taste_clusters(path: str) -> TasteClusters:
+    clusters = TasteClusters.load(path)
+    # Centroids live in category space: refuse clusters built against another vocabulary
+    vocabulary.check_version(clusters.meta.get("vocabulary_version"), artifact=path)
+    return clusters
+
+
+def _timed(phase: str, func, *args):
+    with index_progress.phase(phase):
+        return func(*args)
+
+
+def _load_optional(phase: str, loader, path: str):
+    if not os.path.exists(path):
+        index_progress.skip(phase)
+        return None
+    return _timed(phase, loader, path)
+
+
+def display_name(business_id: str) -> str:
+    return _business_names.get(business_id, f"Restaurant {business_id[:8]}...")
+
+
+def business_names_for(business_index: dict, business_rows: List[Tuple]) -> Dict[str, str]:
+    return {bid: name for bid, name, *_ in business_rows if bid and name and bid in business_index}
+
+
+def build_business_fragments(business_index: dict, business_names: dict) -> Dict[str, Tuple[str, str]]:
+    """
+    Pre-encode everything in a recommendation item except its score.
+
+    An item is then `prefix + score + suffix`, with the same keys and order
+    the routes have always returned.
+    """
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    fragments = {}
+    for bid, categories in business_index.items():
+        name = business_names.get(bid, f"Restaurant {bid[:8]}...")
+        reason = f"Based on your preferences for {', '.join(categories[:2])}"
+        fragments[bid] = (
+            f'{{"business_id":{dumps(bid)},"name":{dumps(name)},"score":',
+            f',"categories":{dumps(categories)},"reason":{dumps(reason)}}}',
+        )
+    return fragments
+
+
+def format_recommendations(ranked: List[Tuple[str, float]]) -> RawJSON:
+    """Encode (business_id, score) pairs as the JSON array of recommendation items."""
+    items = []
+    for business_id, score in ranked:
+        prefix, suffix = _business_fragments[business_id]
+        # repr of the rounded float is exactly what json.dumps would emit
+        items.append(prefix + repr(round(float(score), 4)) + suffix)
+    return raw_array(items)
+
+
+def quantize_vectors(name: str, ids: Optional[List[str]], matrix, dtype: str = None) -> QuantizedMatrix:
+    """
+    Store `matrix` as `dtype` (default RECOMMENDATION_VECTOR_DTYPE), guarded by a top-k check.
+
+    A sample of the matrix's own rows is scored at full precision and at
+    every dtype from the requested one up to float32; the smallest one whose
+    mean top-k overlap reaches RECOMMENDATION_VECTOR_MIN_OVERLAP is kept. The
+    report is recorded in index_progress.vectors[name] (shown by /ready).
+    """
+    import numpy as np
+
+    dtype = dtype or RECOMMENDATION_VECTOR_DTYPE
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"RECOMMENDATION_VECTOR_DTYPE must be one of: {', '.join(VECTOR_DTYPES)}")
+
+    report = []
+    if dtype != "float64" and len(matrix):
+        sample = np.random.default_rng(0).choice(len(matrix), min(VECTOR_CHECK_QUERIES, len(matrix)), replace=False)
+        tried = VECTOR_DTYPES[VECTOR_DTYPES.index(dtype):0:-1]  # e.g. int8, float16, float32
+        report = quantization_report(matrix, matrix[sample], k=VECTOR_CHECK_TOP_K, dtypes=tried)
+        passing = [row["dtype"] for row in report if row["topk_overlap"] >= RECOMMENDATION_VECTOR_MIN_OVERLAP]
+        chosen = passing[0] if passing else "float64"
+        if chosen != dtype:
+            print(f"Warning: {name} top-{VECTOR_CHECK_TOP_K} overlap as {dtype} is below "
+                  f"{RECOMMENDATION_VECTOR_MIN_OVERLAP}; storing as {chosen}")
+        dtype = chosen
+
+    vectors = QuantizedMatrix.from_dense(matrix, dtype, ids)
+    index_progress.vectors[name] = {"dtype": dtype, "bytes": vectors.nbytes, "check": report}
+    return vectors
+
+
+def _build_user_vectors(category_review_index: dict, dtype: str = None) -> QuantizedMatrix:
+    return quantize_vectors("yelp_users", *build_yelp_user_matrix(category_review_index, cat_to_index), dtype)
+
+
+def _build_restaurant_vectors(business_index: dict, dtype: str = None) -> SignatureIndex:
+    ids, signature_of, matrix = build_signatures(business_index, cat_to_index)
+    return SignatureIndex(ids, signature_of, quantize_vectors("restaurants", None, matrix, dtype))
+
+
+def _build_fragments(business_index: dict, business_rows: List[Tuple]):
+    return build_business_fragments(business_index, business_names_for(business_index, business_rows))
 
-    print(f"Indexes loaded: {len(_business_index)} businesses, {len(_business_names)} names")
+
+def _build_seen_positions(business_index: dict) -> BloomPositions:
+    positions = BloomPositions(list(business_index), RECOMMENDATION_SEEN_FILTER_HASHES)
+    positions.for_bits(RECOMMENDATION_SEEN_FILTER_BITS)  # every filter starts at this size; larger ones on first use
+    return positions
+
+
+def _install_indexes(business_index: dict, business_rows: List[Tuple], yelp_user_vectors: QuantizedMatrix,
+                     restaurant_vectors: SignatureIndex, fragments: Dict[str, Tuple[str, str]],
+                     cooccurrence: Optional[CooccurrenceIndex], embeddings: Optional[BusinessEmbeddings],
+                     popularity: Optional[PopularityLists], taste_clusters: Optional[TasteClusters],
+                     columns: Dict[str, Tuple[int, ...]], seen_positions) -> None:
+    global _business_index, _business_names, _yelp_user_vectors, _restaurant_vectors, _cat_to_index
+    global _business_fragments, _cooccurrence, _embeddings, _popularity, _taste_clusters, _category_columns
+    global _business_ids, _seen_positions
+    import numpy as np
+
+    _business_names = business_names_for(business_index, business_rows)
+    _cooccurrence = cooccurrence
+    _embeddings = embeddings
+    _popularity = popularity
+    _taste_clusters = taste_clusters
+    _category_columns = columns
+    _business_fragments = fragments
+    _cat_to_index = cat_to_index
+    _restaurant_vectors = restaurant_vectors
+    _business_ids = np.array(restaurant_vectors.ids, dtype=object)
+    _seen_positions = seen_positions
+    _yelp_user_vectors = yelp_user_vectors
+    vector_bytes.set(yelp_user_vectors.nbytes, matrix="yelp_users")
+    vector_bytes.set(restaurant_vectors.nbytes, matrix="restaurants")
+    # Assigned last: routes treat a non-empty business index as "loaded"
+    _business_index = business_index
+
+
+def check_vocabulary(data_dir: str = None) -> None:
+    """
+    Refuse data built against a different category vocabulary.
+
+    Older data directories without the vocabulary file are accepted with a warning.
+    """
+    path = os.path.join(data_dir or RECOMMENDATION_DATA_DIR, VOCABULARY_FILENAME)
+    if not os.path.exists(path):
+        print(f"Warning: {path} not found — cannot verify the data matches category vocabulary {vocabulary.version}")
+        return
+    vocabulary.check_version(CategoryVocabulary.load(path).version, artifact=path)
+
+
+def _data_paths() -> Tuple[str, ...]:
+    return (
+        os.path.join(RECOMMENDATION_DATA_DIR, "complete_business_index.json"),
+        os.path.join(RECOMMENDATION_DATA_DIR, "category_review_index.json"),
+        os.path.join(RECOMMENDATION_DATA_DIR, "yelp_business_food_only.jsonl"),
+        os.path.join(RECOMMENDATION_DATA_DIR, COOCCURRENCE_FILENAME),
+        os.path.join(RECOMMENDATION_DATA_DIR, ALS_FILENAME),
+        os.path.join(RECOMMENDATION_DATA_DIR, POPULARITY_FILENAME),
+        os.path.join(RECOMMENDATION_DATA_DIR, TASTE_CLUSTERS_FILENAME),
+    )
+
+
+def _build_geocoder(business_rows: List[Tuple]) -> None:
+    # Same file also feeds the offline reverse geocoder with every business location
+    local_geocoder.build((lat, lng, city, state) for _, _, lat, lng, city, state in business_rows)
+
+
+def _finish_loading() -> None:
+    index_progress.state = "ready"
+    index_progress.finished_at = time.time()
+    print(f"Indexes loaded in {index_progress.as_dict()['elapsed_seconds']}s: {len(_business_index)} businesses, "
+          f"{len(_business_names)} names, {len(local_geocoder)} geocoder points")
+
+
+def load_indexes():
+    """
+    Load all heavy data files and precompute Yelp user vectors, blocking until done.
+    The server uses load_indexes_in_background() instead; this is for scripts.
+    """
+    (business_index_path, category_review_path, business_names_path,
+     cooccurrence_path, als_path, popularity_path, clusters_path) = _data_paths()
+
+    print("Loading recommendation indexes...")
+    index_progress.state, index_progress.started_at = "loading", time.time()
+    check_vocabulary()
+
+    business_index        = _timed("business_index", _read_json, business_index_path)
+    category_review_index = _timed("category_review_index", _read_json, category_review_path)
+    business_rows         = _timed("business_names", _read_business_rows, business_names_path)
+    cooccurrence          = _load_optional("cooccurrence", CooccurrenceIndex.load, cooccurrence_path)
+    embeddings            = _load_optional("als_embeddings", BusinessEmbeddings.load, als_path)
+    popularity            = _load_optional("popularity", PopularityLists.load, popularity_path)
+    taste_clusters        = _load_optional("taste_clusters", _load_taste_clusters, clusters_path)
+    yelp_user_vectors     = _timed("yelp_user_vectors", _build_user_vectors, category_review_index)
+    restaurant_vectors    = _timed("restaurant_vectors", _build_restaurant_vectors, business_index)
+    fragments             = _timed("response_fragments", _build_fragments, business_index, business_rows)
+    columns               = _timed("category_columns", category_columns, business_index, cat_to_index)
+    seen_positions        = _timed("seen_positions", _build_seen_positions, business_index)
+
+    _install_indexes(business_index, business_rows, yelp_user_vectors, restaurant_vectors, fragments,
+                     cooccurrence, embeddings, popularity, taste_clusters, columns, seen_positions)
+    _timed("geocoder", _build_geocoder, business_rows)
+    _finish_loading()
+
+
+async def load_indexes_in_background():
+    """
+    Load the indexes off the event loop so the server can take traffic meanwhile.
+
+    The input files (and the co-occurrence index, ALS embeddings, popularity
+    lists and taste clusters, if present) are read concurrently in worker
+    threads, then the Yelp user and restaurant vector matrices, the
+    pre-encoded response fragments, the category columns used for
+    diversity, the seen filter bit positions and the geocoder are built.
+    Progress is tracked in `index_progress`; failures are recorded there
+    instead of raised.
+    """
+    (business_index_path, category_review_path, business_names_path,
+     cooccurrence_path, als_path, popularity_path, clusters_path) = _data_paths()
+
+    print("Loading recommendation indexes in the background...")
+    index_progress.state, index_progress.started_at = "loading", time.time()
+    try:
+        check_vocabulary()
+        (business_index, category_review_index, business_rows,
+         cooccurrence, embeddings, popularity, taste_clusters) = await asyncio.gather(
+            asyncio.to_thread(_timed, "business_index", _read_json, business_index_path),
+            asyncio.to_thread(_timed, "category_review_index", _read_json, category_review_path),
+            asyncio.to_thread(_timed, "business_names", _read_business_rows, business_names_path),
+            asyncio.to_thread(_load_optional, "cooccurrence", CooccurrenceIndex.load, cooccurrence_path),
+            asyncio.to_thread(_load_optional, "als_embeddings", BusinessEmbeddings.load, als_path),
+            asyncio.to_thread(_load_optional, "popularity", PopularityLists.load, popularity_path),
+            asyncio.to_thread(_load_optional, "taste_clusters", _load_taste_clusters, clusters_path),
+        )
+        yelp_user_vectors, restaurant_vectors, fragments, columns, seen_positions = await asyncio.gather(
+            asyncio.to_thread(_timed, "yelp_user_vectors", _build_user_vectors, category_review_index),
+            asyncio.to_thread(_timed, "restaurant_vectors", _build_restaurant_vectors, business_index),
+            asyncio.to_thread(_timed, "response_fragments", _build_fragments, business_index, business_rows),
+            asyncio.to_thread(_timed, "category_columns", category_columns, business_index, cat_to_index),
+            asyncio.to_thread(_timed, "seen_positions", _build_seen_positions, business_index),
+        )
+        del category_review_index
+
+        _install_indexes(business_index, business_rows, yelp_user_vectors, restaurant_vectors, fragments,
+                         cooccurrence, embeddings, popularity, taste_clusters, columns, seen_positions)
+        await asyncio.to_thread(_timed, "geocoder", _build_geocoder, business_rows)
+        _finish_loading()
+    except Exception as e:
+        index_progress.state = "failed"
+        index_progress.error = str(e)
+        index_progress.finished_at = time.time()
+        print(f"Warning: Could not load recommendation indexes: {e}")
+
+
+def require_indexes():
+    """Dependency for routes that need the indexes: 503 with Retry-After while they load."""
+    if not _business_index:
+        detail = ("Recommendation indexes failed to load" if index_progress.state == "failed"
+                  else "Recommendation indexes are still loading")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "5"},
+        )
 
 
 # ---------------------------------------------------------------------------
 # DB helpers
 # ---------------------------------------------------------------------------
 
-async def get_user_clicks_from_database(user_id: str, limit: int = 100) -> List[str]:
-    """Get real user clicks from the database."""
-    async with get_async_db() as db:
-        result = await db.execute(
-            select(UserClick.business_id)
-            .where(UserClick.user_id == user_id)
-            .order_by(UserClick.clicked_at.desc())
-            .limit(limit)
-        )
-        return [str(click) for click in result.scalars().all()]
+@asynccontextmanager
+async def _session(db: Optional[AsyncSession]):
+    """Use the caller's session when given, otherwise open a short-lived one."""
+    if db is not None:
+        yield db
+    else:
+        async with get_async_db() as new_db:
+            yield new_db
 
 
-async def get_user_swipes_from_database(user_id: str, limit: int = 100) -> List[str]:
-    """Get right-swiped restaurants from the database."""
-    async with get_async_db() as db:
-        result = await db.execute(
-            select(UserSwipe.business_id)
-            .where(UserSwipe.user_id == user_id)
-            .order_by(UserSwipe.swiped_at.desc())
-            .limit(limit)
-        )
-        return [str(swipe) for swipe in result.scalars().all()]
+def build_history_query(user_id, limit: int = 100):
+    """UNION ALL of the user's `limit` most recent clicks and swipes, as (business_id, kind) rows."""
+    user_id = uuid.UUID(str(user_id))
+    clicks = (
+        select(UserClick.business_id.label("business_id"), literal("click").label("kind"))
+        .where(UserClick.user_id == user_id)
+        .order_by(UserClick.clicked_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    swipes = (
+        select(UserSwipe.business_id.label("business_id"), literal("swipe").label("kind"))
+        .where(UserSwipe.user_id == user_id)
+        .order_by(UserSwipe.swiped_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return union_all(select(clicks), select(swipes))
+
 
+async def get_user_history_from_database(
+    user_id: str, limit: int = 100, db: Optional[AsyncSession] = None
+) -> Tuple[List[str], List[str]]:
+    """Recent clicks and swipes in one round trip."""
+    async with _session(db) as db:
+        result = await db.execute(build_history_query(user_id, limit))
+        user_clicks, user_swipes = [], []
+        for business_id, kind in result.all():
+            (user_clicks if kind == "click" else user_swipes).append(str(business_id))
+        return user_clicks, user_swipes
 
-async def get_user_city(user_id) -> Optional[str]:
+
+async def get_user_city(user_id, db: Optional[AsyncSession] = None) -> Optional[str]:
     """Get the user's most recently recorded city."""
-    async with get_async_db() as db:
+    async with _session(db) as db:
         result = await db.execute(
             select(UserLocation.city)
             .where(UserLocation.user_id == user_id)
@@ -107,12 +537,398 @@ async def get_user_city(user_id) -> Optional[str]:
         return row[0] if row else None
 
 
+async def get_precomputed_row(user_id, db: Optional[AsyncSession] = None) -> Optional[Tuple]:
+    """
+    The user's precomputed_recommendations row, plus whether any click or swipe is newer than it.
+
+    One round trip; each EXISTS is a probe of the (user_id, time DESC) index.
+    """
+    user_id = uuid.UUID(str(user_id))
+    row = PrecomputedRecommendation
+    changed = or_(
+        select(UserClick.id)
+        .where(UserClick.user_id == user_id, UserClick.clicked_at > row.generated_at)
+        .exists(),
+        select(UserSwipe.id)
+        .where(UserSwipe.user_id == user_id, UserSwipe.swiped_at > row.generated_at)
+        .exists(),
+    )
+    async with _session(db) as db:
+        result = await db.execute(
+            select(row.engine, row.diversity, row.top_k, row.recommendations, row.click_count,
+                   row.swipe_count, row.generated_at, changed)
+            .where(row.user_id == user_id)
+        )
+        return result.one_or_none()
+
+
+async def get_cold_start_seed(user_id, db: Optional[AsyncSession] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(most recently saved cuisine preference, most recent city) in one round trip; both may be None."""
+    user_id = uuid.UUID(str(user_id))
+    cuisine = (
+        select(UserPreference.cuisine_type)
+        .where(UserPreference.user_id == user_id, UserPreference.cuisine_type.isnot(None))
+        .order_by(func.coalesce(UserPreference.updated_at, UserPreference.created_at).desc(),
+                  UserPreference.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    city = (
+        select(UserLocation.city)
+        .where(UserLocation.user_id == user_id)
+        .order_by(UserLocation.recorded_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    async with _session(db) as db:
+        result = await db.execute(select(cuisine, city))
+        return tuple(result.one())
+
+
 # ---------------------------------------------------------------------------
 # Algorithm helper
 # ---------------------------------------------------------------------------
 
-async def generate_recommendations_with_algorithm(user_id: str, top_k: int = 10) -> Dict:
-    """Generate recommendations using the preloaded indexes."""
+def profile_vector(user_clicks: List[str], user_swipes: List[str]):
+    """Unit category vector of the user's history."""
+    import numpy as np
+
+    # Build separate vectors — swipes weighted 3x clicks
+    click_vector = build_click_vector(user_clicks, _business_index, _cat_to_index) if user_clicks else np.zeros(len(_cat_to_index))
+    swipe_vector = build_click_vector(user_swipes, _business_index, _cat_to_index) if user_swipes else np.zeros(len(_cat_to_index))
+
+    # Combine: swipes dominate when present
+    raw_vector = click_vector + SWIPE_WEIGHT * swipe_vector
+    norm = np.linalg.norm(raw_vector)
+    return raw_vector / norm if norm > 0 else raw_vector
+
+
+def seen_rows(user_clicks: List[str], user_swipes: List[str], seen_filter: Optional[SeenFilter] = None):
+    """
+    Business index rows ranking must skip: the recent history, plus everything
+    in the user's seen filter (their full history) when there is one.
+    """
+    import numpy as np
+
+    with stage_latency.time(stage="seen_mask"):
+        if seen_filter is not None:
+            mask = seen_filter.mask(_seen_positions.for_bits(seen_filter.n_bits))
+        else:
+            mask = np.zeros(len(_business_ids), dtype=bool)
+        recent = [row for row in map(_restaurant_vectors.id_to_index.get, chain(user_clicks, user_swipes))
+                  if row is not None]
+        mask[recent] = True
+        return np.flatnonzero(mask)
+
+
+def rank_by_category(user_clicks: List[str], user_swipes: List[str], top_k: int,
+                     seen) -> List[Tuple[str, float]]:
+    """
+    User category profile -> nearest Yelp users -> their aggregate taste -> score every business.
+
+    Neighbor search and business scoring are one pass each over the (possibly
+    quantized) user and restaurant matrices. Restaurants are scored once per
+    distinct category signature and only the best ones expanded into businesses.
+    """
+    import numpy as np
+
+    with stage_latency.time(stage="profile_vector"):
+        user_vector = profile_vector(user_clicks, user_swipes)
+
+    with stage_latency.time(stage="neighbor_search"):
+        neighbor_rows, similarities = _yelp_user_vectors.top_k(user_vector, 5)
+    with stage_latency.time(stage="aggregation"):
+        aggregated_vector = (
+            l2_normalize(similarities.astype(np.float64) @ _yelp_user_vectors.rows(neighbor_rows))
+            if len(neighbor_rows) else user_vector
+        )
+    with stage_latency.time(stage="ranking"):
+        top, scores = _restaurant_vectors.top_k(aggregated_vector, top_k, exclude=seen)
+        return [(_restaurant_vectors.ids[row], float(score)) for row, score in zip(top, scores)]
+
+
+def rank_by_clusters(user_clicks: List[str], user_swipes: List[str], top_k: int,
+                     seen) -> List[Tuple[str, float]]:
+    """Merge the precomputed rankings of the taste clusters nearest to the user's profile."""
+    with stage_latency.time(stage="profile_vector"):
+        user_vector = profile_vector(user_clicks, user_swipes)
+    with stage_latency.time(stage="cluster_merge"):
+        ranked = _taste_clusters.recommend(
+            user_vector, top_k=top_k * 2, exclude=_business_ids[seen], n_probe=RECOMMENDATION_CLUSTER_PROBES
+        )
+        return [(bid, score) for bid, score in ranked if bid in _business_fragments][:top_k]
+
+
+def rank_by_cooccurrence(user_clicks: List[str], user_swipes: List[str], top_k: int,
+                         seen) -> List[Tuple[str, float]]:
+    """Sum the precomputed neighbor lists of everything the user clicked or swiped."""
+    with stage_latency.time(stage="cooccurrence_scoring"):
+        history = [(bid, 1.0) for bid in user_clicks] + [(bid, SWIPE_WEIGHT) for bid in user_swipes]
+        # A few spare candidates in case some aren't in the loaded business index
+        ranked = _cooccurrence.recommend(history, top_k=top_k * 2, exclude=_business_ids[seen])
+        return [(bid, score) for bid, score in ranked if bid in _business_fragments][:top_k]
+
+
+def rank_by_als(user_clicks: List[str], user_swipes: List[str], top_k: int,
+                seen) -> List[Tuple[str, float]]:
+    """Fold the history into the ALS latent space, then one matvec over all business embeddings."""
+    with stage_latency.time(stage="als_scoring"):
+        history = [(bid, 1.0) for bid in user_clicks] + [(bid, SWIPE_WEIGHT) for bid in user_swipes]
+        ranked = _embeddings.recommend(history, top_k=top_k * 2, exclude=_business_ids[seen])
+        return [(bid, score) for bid, score in ranked if bid in _business_fragments][:top_k]
+
+
+def rank_by_popularity(top_k: int, seen, city: Optional[str] = None,
+                       cuisine: Optional[str] = None) -> List[Tuple[str, float]]:
+    """Slice the precomputed lists: cuisine category first, then the user's city, then global."""
+    with stage_latency.time(stage="popularity"):
+        ranked = _popularity.top(top_k * 2, city=city, category=cuisine, exclude=_business_ids[seen])
+        return [(bid, score) for bid, score in ranked if bid in _business_fragments][:top_k]
+
+
+# name -> (ranker, is it usable with what's loaded?); rankers take (clicks, swipes, top_k,
+# seen_rows()) and return up to top_k (business_id, score) pairs, best first
+ENGINES = {
+    "category":     (rank_by_category, lambda: _yelp_user_vectors is not None),
+    "clusters":     (rank_by_clusters, lambda: _taste_clusters is not None),
+    "cooccurrence": (rank_by_cooccurrence, lambda: _cooccurrence is not None),
+    "als":          (rank_by_als, lambda: _embeddings is not None),
+}
+
+
+def validate_engine(engine: Optional[str]) -> None:
+    if engine is not None and engine not in ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"engine must be one of: {', '.join(ENGINES)}",
+        )
+
+
+def validate_diversity(diversity: Optional[float]) -> None:
+    if diversity is not None and not 0.0 <= diversity <= 1.0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="diversity must be between 0 and 1")
+
+
+def diversify(ranked: List[Tuple[str, float]], top_k: int, diversity: float,
+              head: int = 0) -> List[Tuple[str, float]]:
+    """
+    MMR over the engine's candidates so the top k don't all share one category set.
+
+    The first `head` picks are the ones a top-`head` request makes from its
+    own, shorter candidate list (see diversity_candidates()).
+    """
+    if diversity <= 0:
+        return ranked[:top_k]
+    with stage_latency.time(stage="diversity"):
+        return mmr_rerank(ranked, _category_columns, len(_cat_to_index), top_k, diversity,
+                          head, diversity_candidates(head, diversity))
+
+
+def diversity_candidates(top_k: int, diversity: float, extra: Optional[int] = None) -> int:
+    """How many businesses the engine ranks before diversify() keeps `top_k`: `extra` more with MMR on."""
+    if diversity <= 0:
+        return top_k
+    return top_k + (RECOMMENDATION_DIVERSITY_CANDIDATES if extra is None else extra)
+
+
+def rank_history(user_clicks: List[str], user_swipes: List[str], top_k: int, engine: Optional[str] = None,
+                 diversity: Optional[float] = None, seen_filter: Optional[SeenFilter] = None,
+                 first_page: int = 0) -> Tuple[str, List[Tuple[str, float]]]:
+    """
+    (engine used, top_k ranked businesses) for a non-empty history; online requests and the batch job share it.
+
+    `engine` defaults to RECOMMENDATION_ENGINE. An engine whose index isn't
+    loaded, or that finds nothing for this history, falls back to "category".
+    Its top diversity_candidates() are then MMR re-ranked with weight
+    `diversity` (default RECOMMENDATION_DIVERSITY); the first `first_page`
+    of a deep list are the same as a top_k=first_page request's. Businesses
+    in the history or in `seen_filter` are never recommended.
+    """
+    seen = seen_rows(user_clicks, user_swipes, seen_filter)
+    diversity = RECOMMENDATION_DIVERSITY if diversity is None else diversity
+    candidates = diversity_candidates(top_k, diversity)
+    engine = engine or RECOMMENDATION_ENGINE
+    rank, available = ENGINES.get(engine, ENGINES["category"])
+    top = rank(user_clicks, user_swipes, candidates, seen) if available() else []
+    if not top and engine != "category":
+        engine = "category"
+        top = rank_by_category(user_clicks, user_swipes, candidates, seen)
+    return engine, diversify(top, top_k, diversity, min(first_page, top_k))
+
+
+async def precomputed_recommendations(user_id: str, top_k: int, engine: Optional[str], diversity: Optional[float],
+                                      db: Optional[AsyncSession] = None) -> Optional[Dict]:
+    """
+    The batch job's list for this user as a response, or None to rank online.
+
+    Only served while no click or swipe is newer than the list, it is at most
+    RECOMMENDATION_PRECOMPUTED_MAX_AGE_HOURS old, it was ranked with the
+    requested engine and diversity (None = the defaults the job ran with) and
+    for at least `top_k` items. Lookups are counted by result on /metrics.
+    """
+    row = await get_precomputed_row(user_id, db=db)
+    if row is None:
+        precomputed_lookups.inc(result="miss")
+        return None
+    row_engine, row_diversity, row_top_k, ranked, click_count, swipe_count, generated_at, changed = row
+    if engine not in (None, row_engine) or diversity not in (None, row_diversity) or top_k > row_top_k:
+        precomputed_lookups.inc(result="mismatch")
+        return None
+    top = [(bid, score) for bid, score in json.loads(ranked)[:top_k]]
+    too_old = datetime.utcnow() - generated_at > timedelta(hours=RECOMMENDATION_PRECOMPUTED_MAX_AGE_HOURS)
+    # A business missing from the loaded index means the list was ranked against other data
+    if changed or too_old or not all(bid in _business_fragments for bid, _ in top):
+        precomputed_lookups.inc(result="stale")
+        return None
+
+    precomputed_lookups.inc(result="hit")
+    with stage_latency.time(stage="response_formatting"):
+        recommendations = format_recommendations(top)
+    return {
+        "success":               True,
+        "user_id":               user_id,
+        "engine":                row_engine,
+        "total_recommendations": len(top),
+        "recommendations":       recommendations,
+        "user_click_count":      click_count,
+        "user_swipe_count":      swipe_count,
+        "cold_start":            False,
+        "precomputed_at":        generated_at.isoformat(),
+    }
+
+
+async def rank_user(user_id: str, top_k: int, db: Optional[AsyncSession] = None, engine: Optional[str] = None,
+                    diversity: Optional[float] = None,
+                    first_page: int = 0) -> Optional[Tuple[List[Tuple[str, float]], Dict]]:
+    """
+    (top_k ranked businesses, response fields about how) for the user's current history.
+
+    Histories are ranked by rank_history(), with `first_page`, minus
+    everything in the user's seen filter (their whole history). Users with
+    no history, or for whom nothing is found at all, get the precomputed
+    popularity lists seeded by their saved cuisine and city. None when the
+    user has no history and those lists aren't loaded.
+    """
+    # Clicks and swipes in a single query on a single connection
+    with stage_latency.time(stage="history_fetch"):
+        user_clicks, user_swipes = await get_user_history_from_database(user_id, db=db)
+
+    cold_start = not user_clicks and not user_swipes
+    if cold_start and _popularity is None:
+        return None
+
+    seen_filter, top = None, []
+    if not cold_start:
+        with stage_latency.time(stage="seen_filter_fetch"):
+            async with _session(db) as session:
+                seen_filter = await get_seen_filter(user_id, session)
+        engine, top = rank_history(user_clicks, user_swipes, top_k, engine, diversity, seen_filter, first_page)
+
+    seed = {}
+    if not top and _popularity is not None:
+        engine = "popularity"
+        cuisine, city = await get_cold_start_seed(user_id, db=db)
+        seed = {"seed_cuisine": _popularity.category_for(cuisine), "seed_city": city}
+        top = rank_by_popularity(top_k, seen_rows(user_clicks, user_swipes, seen_filter), city=city, cuisine=cuisine)
+
+    return top, {
+        "engine":           engine,
+        "user_click_count": len(user_clicks),
+        "user_swipe_count": len(user_swipes),
+        "cold_start":       cold_start,
+        **seed,
+    }
+
+
+def encode_cursor(session: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{session}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(session, offset) of a cursor from encode_cursor(); 400 for anything else."""
+    try:
+        session, offset = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().rsplit(":", 1)
+        if not offset.isdigit():
+            raise ValueError(offset)
+        return session, int(offset)
+    except ValueError:  # includes binascii.Error and UnicodeDecodeError
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+
+
+async def recommendation_page(user_id: str, page_size: int, cursor: Optional[str] = None,
+                              db: Optional[AsyncSession] = None, engine: Optional[str] = None,
+                              diversity: Optional[float] = None) -> Optional[Dict]:
+    """
+    One page of the user's ranking, with the cursor of the next one (None after the last).
+
+    Without a cursor, RECOMMENDATION_PAGE_DEPTH businesses are ranked and
+    cached under a new session. A cursor's page is sliced from its session's
+    list while the user's interaction version is unchanged. After a click,
+    swipe or location update the user is ranked again, minus the businesses
+    the session already returned, under a new session. An expired session
+    is ranked again and continues at the cursor's offset. The first page's
+    engine and diversity hold for the whole session. None when the user has
+    nothing to rank (see rank_user).
+    """
+    version = interaction_versions.get(user_id)  # read before ranking: a write meanwhile invalidates the list
+    session, offset, served = None, 0, set()
+    if cursor is not None:
+        session, offset = decode_cursor(cursor)
+        entry = _page_sessions.get(session)
+        if entry is not None:
+            entry_user, entry_version, engine, diversity, ids, scores, info = entry
+            if entry_user != user_id:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+            if entry_version == version:
+                page_requests.inc(result="cached")
+                return _page_response(user_id, session, offset, page_size, ids, scores, info)
+            served = set(ids[:offset])
+            _page_sessions.pop(session)
+            offset = 0
+        page_requests.inc(result="reranked")
+    else:
+        page_requests.inc(result="ranked")
+
+    # The first page is what ?top_k=page_size returns; only later pages use the deeper candidates
+    ranked = await rank_user(user_id, RECOMMENDATION_PAGE_DEPTH + len(served), db=db, engine=engine,
+                             diversity=diversity, first_page=page_size)
+    if ranked is None:
+        return None
+    top, info = ranked
+    top = [(bid, score) for bid, score in top if bid not in served][:RECOMMENDATION_PAGE_DEPTH]
+    ids = tuple(bid for bid, _ in top)
+    scores = array.array("d", (score for _, score in top))
+    session = secrets.token_urlsafe(12)
+    _page_sessions.set(session, (user_id, version, engine, diversity, ids, scores, info))
+    return _page_response(user_id, session, offset, page_size, ids, scores, info)
+
+
+def _page_response(user_id: str, session: str, offset: int, page_size: int, ids: Tuple[str, ...],
+                   scores: "array.array", info: Dict) -> Dict:
+    end = offset + page_size
+    with stage_latency.time(stage="response_formatting"):
+        recommendations = format_recommendations(zip(ids[offset:end], scores[offset:end]))
+    return {
+        "success":               True,
+        "user_id":               user_id,
+        "engine":                info["engine"],
+        "total_recommendations": len(ids[offset:end]),
+        "recommendations":       recommendations,
+        "next_cursor":           encode_cursor(session, end) if end < len(ids) else None,
+        **{key: value for key, value in info.items() if key != "engine"},
+    }
+
+
+async def generate_recommendations_with_algorithm(
+    user_id: str, top_k: int = 10, db: Optional[AsyncSession] = None, engine: Optional[str] = None,
+    diversity: Optional[float] = None,
+) -> Dict:
+    """
+    Generate recommendations using the preloaded indexes. Pass the request's `db` to reuse its session.
+
+    Users are ranked by rank_user(). With RECOMMENDATION_PRECOMPUTED, the
+    batch job's list is served instead while it is still current.
+    """
     try:
 
         if not _business_index or _yelp_user_vectors is None:
@@ -122,59 +938,31 @@ async def generate_recommendations_with_algorithm(user_id: str, top_k: int = 10)
                 "recommendations": [],
             }
 
-        # Fetch both clicks and swipes in parallel
-        user_clicks, user_swipes = await asyncio.gather(
-            get_user_clicks_from_database(user_id),
-            get_user_swipes_from_database(user_id),
-        )
+        if RECOMMENDATION_PRECOMPUTED:
+            with stage_latency.time(stage="precomputed_lookup"):
+                result = await precomputed_recommendations(user_id, top_k, engine, diversity, db=db)
+            if result is not None:
+                return result
 
-        if not user_clicks and not user_swipes:
+        ranked = await rank_user(user_id, top_k, db=db, engine=engine, diversity=diversity)
+        if ranked is None:
             return {
                 "success": False,
                 "message": "No click history found for user",
                 "recommendations": [],
             }
+        top, info = ranked
 
-        import numpy as np
-
-        # Build separate vectors — swipes weighted 3x clicks
-        SWIPE_WEIGHT = 3.0
-        click_vector = build_click_vector(user_clicks, _business_index, _cat_to_index) if user_clicks else np.zeros(len(_cat_to_index))
-        swipe_vector = build_click_vector(user_swipes, _business_index, _cat_to_index) if user_swipes else np.zeros(len(_cat_to_index))
-
-        # Combine: swipes dominate when present
-        raw_vector = click_vector + SWIPE_WEIGHT * swipe_vector
-        norm = np.linalg.norm(raw_vector)
-        user_vector = raw_vector / norm if norm > 0 else raw_vector
-
-        neighbors        = find_neighbors(user_vector, _yelp_user_vectors, k=5)
-        aggregated_vector = (
-            aggregate_neighbor_vector(neighbors, _yelp_user_vectors) if neighbors else user_vector
-        )
-        ranked_restaurants = rank_restaurants(aggregated_vector, _business_index, _cat_to_index)
-
-        # Exclude anything the user has already seen (clicks + swipes)
-        seen = set(user_clicks) | set(user_swipes)
-        recommendations = []
-        for business_id, score in ranked_restaurants:
-            if business_id not in seen and len(recommendations) < top_k:
-                categories    = _business_index[business_id]
-                business_name = _business_names.get(business_id, f"Restaurant {business_id[:8]}...")
-                recommendations.append({
-                    "business_id": business_id,
-                    "name":        business_name,
-                    "score":       round(float(score), 4),
-                    "categories":  categories,
-                    "reason":      f"Based on your preferences for {', '.join(categories[:2])}",
-                })
+        with stage_latency.time(stage="response_formatting"):
+            recommendations = format_recommendations(top)
 
         return {
             "success":               True,
             "user_id":               user_id,
-            "total_recommendations": len(recommendations),
+            "engine":                info.pop("engine"),
+            "total_recommendations": len(top),
             "recommendations":       recommendations,
-            "user_click_count":      len(user_clicks),
-            "user_swipe_count":      len(user_swipes),
+            **info,
         }
 
     except Exception as e:
@@ -191,18 +979,26 @@ async def health_check():
         "status":  "healthy",
         "message": "Recommendations API is working",
         "indexes_loaded": len(_business_index) > 0,
+        "index_load":     index_progress.state,
     }
 
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(require_indexes)], response_class=FastJSONResponse)
 async def get_my_recommendations(
     top_k: int = 10,
+    engine: Optional[str] = None,
+    diversity: Optional[float] = None,
     current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
 ):
     if top_k < 1 or top_k > 50:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="top_k must be between 1 and 50")
+    validate_engine(engine)
+    validate_diversity(diversity)
 
-    result = await generate_recommendations_with_algorithm(str(current_user.id), top_k)
+    result = await generate_recommendations_with_algorithm(
+        str(current_user.id), top_k, db=db, engine=engine, diversity=diversity
+    )
 
     if not result["success"]:
         if "No click history" in result.get("message", ""):
@@ -214,14 +1010,21 @@ async def get_my_recommendations(
             }
         raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
 
-    return result
+    return FastJSONResponse(result)
 
 
-@router.get("/top20")
+@router.get("/top20", dependencies=[Depends(require_indexes)], response_class=FastJSONResponse)
 async def get_top_20_recommendations(
+    engine: Optional[str] = None,
+    diversity: Optional[float] = None,
     current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
 ):
-    result = await generate_recommendations_with_algorithm(str(current_user.id), 20)
+    validate_engine(engine)
+    validate_diversity(diversity)
+    result = await generate_recommendations_with_algorithm(
+        str(current_user.id), 20, db=db, engine=engine, diversity=diversity
+    )
 
     if not result["success"]:
         if "No click history" in result.get("message", ""):
@@ -234,21 +1037,53 @@ async def get_top_20_recommendations(
             }
         raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
 
-    return {**result, "message": "Top 20 recommendations based on your food preferences"}
+    return FastJSONResponse({**result, "message": "Top 20 recommendations based on your food preferences"})
+
+
+@router.get("/page", dependencies=[Depends(require_indexes)], response_class=FastJSONResponse)
+async def get_recommendation_page(
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    engine: Optional[str] = None,
+    diversity: Optional[float] = None,
+    current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
+):
+    """Infinite scroll: pass the response's `next_cursor` back as `cursor` for the next page."""
+    if page_size < 1 or page_size > 50:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="page_size must be between 1 and 50")
+    validate_engine(engine)
+    validate_diversity(diversity)
+
+    try:
+        result = await recommendation_page(str(current_user.id), page_size, cursor, db=db, engine=engine,
+                                           diversity=diversity)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+    if result is None:
+        return {
+            "success": True,
+            "message": "No click history yet. Start clicking on restaurants to get personalized recommendations!",
+            "recommendations": [],
+            "user_id": str(current_user.id),
+            "next_cursor": None,
+        }
+    return FastJSONResponse(result)
 
-@router.get("/random")
+
+@router.get("/random", dependencies=[Depends(require_indexes)])
 async def get_random_restaurants_from_city(
     count: int = 10,
     current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
 ):
     if count < 1 or count > 50:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="count must be between 1 and 50")
 
-    if not _business_index:
-        raise HTTPException(status_code=500, detail="Business index not loaded")
-
-    user_city = await get_user_city(current_user.id)
+    user_city = await get_user_city(current_user.id, db=db)
 
     all_businesses = list(_business_index.items())
     random.shuffle(all_businesses)
@@ -257,7 +1092,7 @@ async def get_random_restaurants_from_city(
     formatted = [
         {
             "business_id": bid,
-            "name":        _business_names.get(bid, f"Restaurant {bid[:8]}..."),
+            "name":        display_name(bid),
             "categories":  cats,
             "reason":      "Random selection from available restaurants",
         }
@@ -274,32 +1109,51 @@ async def get_random_restaurants_from_city(
     }
 
 
-@router.get("/user/{user_id}")
+@router.get("/user/{user_id}", dependencies=[Depends(require_indexes)], response_class=FastJSONResponse)
 async def get_user_recommendations(
     user_id: str,
     top_k: int = 10,
+    engine: Optional[str] = None,
+    diversity: Optional[float] = None,
     current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
 ):
     if str(current_user.id) != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Can only view your own recommendations")
 
-    result = await generate_recommendations_with_algorithm(user_id, top_k)
+    validate_engine(engine)
+    validate_diversity(diversity)
+    result = await generate_recommendations_with_algorithm(user_id, top_k, db=db, engine=engine, diversity=diversity)
 
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
 
-    return result
+    return FastJSONResponse(result)
 
-@router.get("/next")
-async def get_next_restaurant(
+@router.post("/swipe", response_model=schemas.UserSwipeResponse)
+async def record_swipe(
+    swipe_data: schemas.UserSwipeCreate,
     current_user: schemas.UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_dependency),
 ):
-    if not _business_index:
-        raise HTTPException(status_code=500, detail="Business index not loaded")
+    """Record a right swipe; swipes feed the next recommendations alongside clicks."""
+    db_swipe = UserSwipe(user_id=current_user.id, business_id=swipe_data.business_id)
+    db.add(db_swipe)
+    await db.commit()
+    await db.refresh(db_swipe)
+    interaction_versions.bump(str(current_user.id))
+    # In its own session: a failed update rolls back, which would expire db_swipe
+    await record_seen({current_user.id: [db_swipe.business_id]})
+    return db_swipe
+
 
+@router.get("/next", dependencies=[Depends(require_indexes)])
+async def get_next_restaurant(
+    current_user: schemas.UserInDB = Depends(get_current_user),
+):
     bid, cats = random.choice(list(_business_index.items()))
     return {
         "business_id": bid,
-        "name": _business_names.get(bid, f"Restaurant {bid[:8]}..."),
+        "name": display_name(bid),
         "categories": cats,
     }
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -111,6 +111,10 @@ class UserClickResponse(UserClickCreate):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserClickBatchCreate(BaseModel):
+    clicks: List[UserClickCreate] = Field(..., min_length=1, max_length=500)
+
+
 class UserLocationCreate(BaseModel):
     lat: float
     lng: float
@@ -0,0 +1,178 @@
+"""
+Per-user seen filters: every business a user clicked or swiped, in one small row
+
+Ranking only fetches the user's most recent clicks and swipes, so on its
+own it would keep recommending places seen months ago. The user's
+user_seen_filters row (a Bloom filter, see Vectorization/seen_filter.py)
+covers the rest of the history at the cost of one primary-key lookup.
+
+Filters are updated after the interactions are committed: after each click
+buffer flush (one transaction for every user in the batch) and after each
+swipe. A user without a row, or whose row was built with other
+RECOMMENDATION_SEEN_FILTER_* settings, gets it rebuilt from their full
+history on their next interaction. So does a user whose filter has grown
+too full for RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE, into a filter sized
+for twice their history (up to RECOMMENDATION_SEEN_FILTER_MAX_BITS). Update
+failures are logged and counted, never raised: the interactions themselves
+are already stored, and the recent history is always excluded exactly.
+"""
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import insert, select, union, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Vectorization.seen_filter import SeenFilter, bits_for
+
+from . import metrics
+from .database import get_async_db
+from .models import UserClick, UserSeenFilter, UserSwipe
+
+logger = logging.getLogger(__name__)
+
+# Exclude every business the user ever clicked or swiped, not just the recent history
+RECOMMENDATION_SEEN_FILTER = os.getenv("RECOMMENDATION_SEEN_FILTER", "true").lower() == "true"
+# Initial filter size in bits (a multiple of 8) and hashes per business. A filter is rebuilt
+# larger (doubling, up to MAX_BITS) once more than MAX_FP_RATE of unseen businesses would be
+# excluded by mistake: 16384 bits x 5 hashes holds about 1600 businesses at 1%
+RECOMMENDATION_SEEN_FILTER_BITS = int(os.getenv("RECOMMENDATION_SEEN_FILTER_BITS", "16384"))
+RECOMMENDATION_SEEN_FILTER_HASHES = int(os.getenv("RECOMMENDATION_SEEN_FILTER_HASHES", "5"))
+RECOMMENDATION_SEEN_FILTER_MAX_BITS = int(os.getenv("RECOMMENDATION_SEEN_FILTER_MAX_BITS", "1048576"))
+RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE = float(os.getenv("RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE", "0.01"))
+
+filter_updates = metrics.Counter(
+    "recommendation_seen_filter_updates_total",
+    "Seen filter writes by result (updated, rebuilt from the full history, grown, failed)", ["result"]
+)
+
+
+def _current_settings(bits: bytes, hashes: int) -> bool:
+    # Sizes are RECOMMENDATION_SEEN_FILTER_BITS * 2**j, so ranking derives positions for a handful of them
+    growth, remainder = divmod(len(bits) * 8, RECOMMENDATION_SEEN_FILTER_BITS)
+    return (hashes == RECOMMENDATION_SEEN_FILTER_HASHES and not remainder and growth & (growth - 1) == 0
+            and 0 < len(bits) * 8 <= RECOMMENDATION_SEEN_FILTER_MAX_BITS)
+
+
+def _too_full(seen_filter: SeenFilter) -> bool:
+    return (seen_filter.false_positive_rate() > RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE
+            and seen_filter.n_bits < RECOMMENDATION_SEEN_FILTER_MAX_BITS)
+
+
+def _sized_filter(count: int) -> SeenFilter:
+    """An empty filter with room for `count` businesses at RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE."""
+    n_bits = bits_for(count, RECOMMENDATION_SEEN_FILTER_HASHES, RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE,
+                      RECOMMENDATION_SEEN_FILTER_BITS, RECOMMENDATION_SEEN_FILTER_MAX_BITS)
+    return SeenFilter(n_bits, RECOMMENDATION_SEEN_FILTER_HASHES)
+
+
+async def get_seen_filters(user_ids: Iterable, db: AsyncSession) -> Dict[str, SeenFilter]:
+    """str(user_id) -> filter, for the users whose filter is built with the current settings; {} when disabled."""
+    if not RECOMMENDATION_SEEN_FILTER:
+        return {}
+    result = await db.execute(
+        select(UserSeenFilter.user_id, UserSeenFilter.bits, UserSeenFilter.hashes, UserSeenFilter.item_count)
+        .where(UserSeenFilter.user_id.in_([uuid.UUID(str(user_id)) for user_id in user_ids]))
+    )
+    return {
+        str(row.user_id): SeenFilter.from_bytes(row.bits, row.hashes, row.item_count)
+        for row in result.all() if _current_settings(row.bits, row.hashes)
+    }
+
+
+async def get_seen_filter(user_id, db: AsyncSession) -> Optional[SeenFilter]:
+    """The user's filter; None when disabled, not built yet, or built with other settings."""
+    return (await get_seen_filters([user_id], db)).get(str(user_id))
+
+
+def build_full_history_query(user_ids: Iterable[uuid.UUID]):
+    """Distinct (user_id, business_id) over all of the users' clicks and swipes."""
+    user_ids = list(user_ids)
+    return union(
+        select(UserClick.user_id, UserClick.business_id).where(UserClick.user_id.in_(user_ids)),
+        select(UserSwipe.user_id, UserSwipe.business_id).where(UserSwipe.user_id.in_(user_ids)),
+    )
+
+
+async def _add_to_filters(seen: Dict[uuid.UUID, list], db: AsyncSession) -> None:
+    # Row locks (PostgreSQL) keep concurrent writers from losing each other's bits
+    result = await db.execute(
+        select(UserSeenFilter.user_id, UserSeenFilter.bits, UserSeenFilter.hashes, UserSeenFilter.item_count)
+        .where(UserSeenFilter.user_id.in_(list(seen)))
+        .with_for_update()
+    )
+    stored = {row.user_id: row for row in result.all()}
+    filters: Dict[uuid.UUID, SeenFilter] = {}
+    grown = 0
+    for user_id, row in stored.items():
+        if _current_settings(row.bits, row.hashes):
+            seen_filter = SeenFilter.from_bytes(row.bits, row.hashes, row.item_count)
+            seen_filter.add(seen[user_id])
+            if _too_full(seen_filter):
+                grown += 1
+            else:
+                filters[user_id] = seen_filter
+
+    # Everyone else starts over from the full history, which includes the new interactions
+    rebuilt = [user_id for user_id in seen if user_id not in filters]
+    if rebuilt:
+        history: Dict[uuid.UUID, list] = {}
+        for user_id, business_id in (await db.execute(build_full_history_query(rebuilt))).all():
+            history.setdefault(user_id, []).append(business_id)
+        for user_id in rebuilt:
+            business_ids = history.get(user_id, seen[user_id])
+            # Twice the history, so a grown filter isn't rebuilt again on the next interaction
+            filters[user_id] = _sized_filter(2 * len(business_ids))
+            filters[user_id].add(business_ids)
+
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "bits": seen_filter.to_bytes(), "hashes": seen_filter.n_hashes,
+         "item_count": seen_filter.count, "updated_at": now}
+        for user_id, seen_filter in filters.items()
+    ]
+    updates = [row for row in rows if row["user_id"] in stored]
+    inserts = [row for row in rows if row["user_id"] not in stored]
+    if updates:
+        await db.execute(update(UserSeenFilter), updates)  # executemany by primary key
+    if inserts:
+        await db.execute(insert(UserSeenFilter), inserts)
+    await db.commit()
+    filter_updates.inc(len(filters) - len(rebuilt), result="updated")
+    filter_updates.inc(len(rebuilt) - grown, result="rebuilt")
+    filter_updates.inc(grown, result="grown")
+
+
+async def _add_to_filters_retrying(seen: Dict[uuid.UUID, list], db: AsyncSession) -> None:
+    try:
+        await _add_to_filters(seen, db)
+    except IntegrityError:
+        # A concurrent first write created one of the rows (SQLite has no row lock to wait on).
+        # Run again: it now reads that row and adds to it.
+        await db.rollback()
+        await _add_to_filters(seen, db)
+
+
+async def record_seen(seen: Dict[str, Iterable[str]], db: Optional[AsyncSession] = None) -> None:
+    """
+    Add {user_id: business ids} to the users' filters in one transaction, in `db` if given.
+
+    Call once the interactions are committed. Never raises.
+    """
+    if not RECOMMENDATION_SEEN_FILTER or not seen:
+        return
+    seen = {uuid.UUID(str(user_id)): list(business_ids) for user_id, business_ids in seen.items()}
+    try:
+        if db is not None:
+            await _add_to_filters_retrying(seen, db)
+        else:
+            async with get_async_db() as session:
+                await _add_to_filters_retrying(seen, session)
+    except Exception:
+        if db is not None:
+            await db.rollback()
+        filter_updates.inc(len(seen), result="failed")
+        logger.exception("Failed to update the seen filters of %d users", len(seen))
@@ -0,0 +1,81 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import insert
+
+from Login.auth import create_access_token
+from api import dependencies, main
+from api.database import get_async_db
+from api.dependencies import user_for_token
+from api.models import User
+
+
+async def _new_user() -> str:
+    username = f"user-{uuid.uuid4().hex[:8]}"
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=uuid.uuid4(), username=username, hashed_password="x"))
+        await db.commit()
+    return username
+
+
+def _no_db():
+    @asynccontextmanager
+    async def unavailable():
+        raise AssertionError("opened a DB session")
+        yield
+    return unavailable
+
+
+async def _request(method: str, path: str, token: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+
+# ------------------------
+# TEST 1: A cached token is answered without a DB session
+# ------------------------
+
+def test_cache_hit_opens_no_session(monkeypatch):
+    token = create_access_token({"sub": asyncio.run(_new_user())})
+    first = asyncio.run(_request("GET", "/auth/me", token))
+
+    monkeypatch.setattr(dependencies, "get_async_db", _no_db())
+    second = asyncio.run(_request("GET", "/auth/me", token))
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+
+
+# ------------------------
+# TEST 2: Cache entries never outlive the token
+# ------------------------
+
+def test_entry_expires_with_token():
+    username = asyncio.run(_new_user())
+    short = create_access_token({"sub": username}, expires_delta=timedelta(seconds=30))
+    long = create_access_token({"sub": username}, expires_delta=timedelta(days=1))
+
+    asyncio.run(user_for_token(short))
+    asyncio.run(user_for_token(long))
+
+    expires_in = {token: dependencies._token_cache._data[token][0] - time.monotonic() for token in (short, long)}
+    assert 0 < expires_in[short] <= 30
+    assert 30 < expires_in[long] <= dependencies.TOKEN_CACHE_TTL_SECONDS
+
+
+# ------------------------
+# TEST 3: Updating the user drops their cached tokens
+# ------------------------
+
+def test_update_invalidates_cached_user():
+    token = create_access_token({"sub": asyncio.run(_new_user())})
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+
+    assert asyncio.run(_request("GET", "/auth/me", token)).json()["email"] is None
+    assert asyncio.run(_request("PUT", "/auth/me", token, json={"email": email})).status_code == 200
+    assert asyncio.run(_request("GET", "/auth/me", token)).json()["email"] == email
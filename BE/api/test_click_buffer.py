@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from api import click_buffer as buffer_module
+from api.click_buffer import ClickWriteBuffer, build_click_row
+from api.database import get_async_db
+from api.models import User, UserClick
+
+
+async def _new_user() -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=user_id, username=f"user-{user_id.hex[:8]}", hashed_password="x"))
+        await db.commit()
+    return user_id
+
+
+async def _stored_clicks(user_id) -> list:
+    async with get_async_db() as db:
+        result = await db.execute(select(UserClick.business_id).where(UserClick.user_id == user_id))
+        return sorted(result.scalars().all())
+
+
+# ------------------------
+# TEST 1: A failed flush is retried, and the clicks still land
+# ------------------------
+
+def test_failed_flush_is_retried(monkeypatch):
+    calls = []
+
+    async def flaky_write(rows, db=None):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+        await write(rows, db)
+
+    write = buffer_module.write_click_rows
+    monkeypatch.setattr(buffer_module, "write_click_rows", flaky_write)
+
+    async def scenario():
+        user_id = await _new_user()
+        buffer = ClickWriteBuffer(flush_interval=0.01, max_retries=3, retry_backoff=0.01)
+        await buffer.start()
+        for business_id in ("b1", "b2", "b3"):
+            await buffer.put(build_click_row(user_id, business_id))
+        await buffer.stop()
+        return await _stored_clicks(user_id)
+
+    assert asyncio.run(scenario()) == ["b1", "b2", "b3"]
+    assert calls == [3, 3]
+
+
+# ------------------------
+# TEST 2: A batch is only dropped once every retry failed
+# ------------------------
+
+def test_batch_dropped_after_max_retries(monkeypatch):
+    calls = []
+
+    async def failing_write(rows, db=None):
+        calls.append(len(rows))
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(buffer_module, "write_click_rows", failing_write)
+    dropped = buffer_module.flush_dropped.value()
+
+    async def scenario():
+        buffer = ClickWriteBuffer(flush_interval=0.01, max_retries=2, retry_backoff=0.001)
+        await buffer.start()
+        await buffer.put(build_click_row(uuid.uuid4(), "b1"))
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert calls == [1, 1, 1]
+    assert buffer_module.flush_dropped.value() == dropped + 1
+
+
+# ------------------------
+# TEST 3: A row the database rejects is dropped alone, the rest of the batch lands
+# ------------------------
+
+def test_rejected_row_does_not_drop_batch():
+    dropped = buffer_module.flush_dropped.value()
+
+    async def scenario():
+        user_id = await _new_user()
+        buffer = ClickWriteBuffer(flush_interval=0.05, max_retries=3, retry_backoff=0.01)
+        await buffer.start()
+        for business_id in ("b1", "b2", None, "b3", "b4"):  # business_id is NOT NULL
+            await buffer.put(build_click_row(user_id, business_id))
+        await buffer.stop()
+        return await _stored_clicks(user_id)
+
+    assert asyncio.run(scenario()) == ["b1", "b2", "b3", "b4"]
+    assert buffer_module.flush_dropped.value() == dropped + 1
+
+
+# ------------------------
+# TEST 4: max_delay() covers a click whose flush needed every retry
+# ------------------------
+
+def test_max_delay_covers_retried_flush(monkeypatch):
+    calls = []
+
+    async def flaky_write(rows, db=None):
+        calls.append(len(rows))
+        if len(calls) <= 2:
+            raise ConnectionError("database unavailable")
+        await write(rows, db)
+
+    write = buffer_module.write_click_rows
+    monkeypatch.setattr(buffer_module, "write_click_rows", flaky_write)
+
+    async def scenario():
+        user_id = await _new_user()
+        buffer = ClickWriteBuffer(flush_interval=0.02, max_retries=2, retry_backoff=0.05)
+        await buffer.start()
+        row = build_click_row(user_id, "b1")
+        await buffer.put(row)
+        while await _stored_clicks(user_id) != ["b1"]:
+            await asyncio.sleep(0.005)
+        committed = datetime.utcnow()
+        await buffer.stop()
+        return (committed - row["clicked_at"]).total_seconds(), buffer.max_delay()
+
+    waited, max_delay = asyncio.run(scenario())
+    assert calls == [1, 1, 1]
+    assert 0.15 <= waited <= max_delay
@@ -0,0 +1,37 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from api import recommendation_routes as rec
+from api.database import get_async_db
+from api.models import User, UserPreference
+
+
+async def _user_with_preferences(preferences) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=user_id, username=f"user-{user_id.hex[:8]}", hashed_password="x"))
+        await db.execute(insert(UserPreference), [{"user_id": user_id, **row} for row in preferences])
+        await db.commit()
+    return user_id
+
+
+# ------------------------
+# TEST 1: The seed cuisine is the most recently saved one, not an arbitrary row
+# ------------------------
+
+def test_seed_uses_latest_cuisine_preference():
+    now = datetime.utcnow()
+
+    async def scenario():
+        user_id = await _user_with_preferences([
+            {"cuisine_type": "Pizza", "created_at": now - timedelta(days=3)},
+            {"cuisine_type": "Sushi", "created_at": now - timedelta(days=2), "updated_at": now - timedelta(hours=1)},
+            {"cuisine_type": "Tacos", "created_at": now - timedelta(days=1)},
+            {"cuisine_type": None, "created_at": now},
+        ])
+        return await rec.get_cold_start_seed(user_id)
+
+    assert asyncio.run(scenario()) == ("Sushi", None)
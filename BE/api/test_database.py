@@ -0,0 +1,66 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api import database, metrics
+from api.database import InstrumentedAsyncPool, async_engine
+
+
+POOL_GAUGES = {"db_pool_size", "db_pool_checked_out", "db_pool_checked_in", "db_pool_overflow"}
+
+
+def _gauges() -> dict:
+    """Current db_pool_* gauge values, as scraped from /metrics."""
+    samples = (line.split(" ") for line in metrics.render_latest().splitlines() if not line.startswith("#"))
+    return {name: float(value) for name, value in samples if name in POOL_GAUGES}
+
+
+# ------------------------
+# TEST 1: The engine uses the configured, instrumented pool and its gauges follow checkouts
+# ------------------------
+
+def test_pool_settings_and_gauges_after_checkout():
+    pool = async_engine.pool
+    assert isinstance(pool, InstrumentedAsyncPool)
+    assert pool.size() == database.DB_POOL_SIZE
+    assert pool._max_overflow == database.DB_MAX_OVERFLOW
+    assert pool._timeout == database.DB_POOL_TIMEOUT
+    assert pool._recycle == database.DB_POOL_RECYCLE and pool._pre_ping == database.DB_POOL_PRE_PING
+
+    async def scenario():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            during = _gauges()
+        return during, _gauges()
+
+    waits = database.pool_checkout_wait.count()
+    during, after = asyncio.run(scenario())
+
+    assert during["db_pool_size"] == database.DB_POOL_SIZE
+    assert during["db_pool_checked_out"] == 1
+    assert after["db_pool_checked_out"] == 0 and after["db_pool_checked_in"] >= 1
+    assert after["db_pool_overflow"] == 0
+    assert database.pool_checkout_wait.count() > waits
+
+
+# ------------------------
+# TEST 2: Connections past pool_size are counted as overflow
+# ------------------------
+
+def test_overflow_connections_are_counted():
+    engine = create_async_engine(database.ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncPool,
+                                 pool_size=1, max_overflow=2)
+
+    async def scenario():
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            overflow = engine.pool.overflow()
+        await engine.dispose()
+        return overflow
+
+    events = database.pool_overflow_events.value()
+
+    assert asyncio.run(scenario()) == 1
+    assert database.pool_overflow_events.value() == events + 1
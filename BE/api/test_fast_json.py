@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from api import recommendation_routes as rec
+from api.fast_json import FastJSONResponse, RawJSON, encode_value
+
+business_index = {
+    "b1": ["Cafes", "Desserts"],
+    "b2": ["Sushi Bars", "Japanese"],
+    "b3": ["Mexican"],
+    "b4": [],
+}
+business_names = {
+    "b1": "Café Olé",
+    "b2": "寿司 あ Bar 🍣",
+    "b3": 'Tacos "El Güero" \\ Co.\n',
+}
+ranked = [("b1", 0.1 + 0.2), ("b2", np.float32(0.87654321)), ("b3", 1e-5), ("b4", 1.0)]
+
+
+def _old_item(business_id, score):
+    """A recommendation item as the routes built it before fragments."""
+    categories = business_index[business_id]
+    return {
+        "business_id": business_id,
+        "name":        business_names.get(business_id, f"Restaurant {business_id[:8]}..."),
+        "score":       round(float(score), 4),
+        "categories":  categories,
+        "reason":      f"Based on your preferences for {', '.join(categories[:2])}",
+    }
+
+
+# ------------------------
+# TEST 1: Fragment-assembled bodies parse to what JSONResponse produced
+# ------------------------
+
+def test_fragments_match_json_response(monkeypatch):
+    monkeypatch.setattr(rec, "_business_fragments", rec.build_business_fragments(business_index, business_names))
+    fields = {"success": True, "user_id": "u-ü", "total_recommendations": len(ranked), "cold_start": False}
+
+    fast = FastJSONResponse({**fields, "recommendations": rec.format_recommendations(ranked)})
+    old = JSONResponse({**fields, "recommendations": [_old_item(bid, score) for bid, score in ranked]})
+
+    assert json.loads(fast.body) == json.loads(old.body)
+    assert list(json.loads(fast.body)["recommendations"][1]) == ["business_id", "name", "score", "categories", "reason"]
+    # Names stay UTF-8, not \u escapes
+    assert "寿司".encode() in fast.body and fast.headers["content-type"] == "application/json"
+
+
+def test_encode_value_splices_raw_fragments():
+    value = {"a": [1, RawJSON('{"x":"é"}')], "b": "ü", "c": None}
+
+    assert json.loads(encode_value(value)) == {"a": [1, {"x": "é"}], "b": "ü", "c": None}
@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+
+from api import geocoding
+from api.geocoding import EMPTY_RESULT, LocalReverseGeocoder, reverse_geocode
+
+
+def _nominatim(monkeypatch, responses):
+    """Serve `responses` (status, JSON) in order as Nominatim; returns the list of requests made."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses[len(requests) - 1]
+        return httpx.Response(status, json=body)
+
+    monkeypatch.setattr(geocoding, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(geocoding, "REVERSE_GEOCODE_REMOTE_FALLBACK", True)
+    geocoding._cell_cache.clear()
+    return requests
+
+
+# ------------------------
+# TEST 1: Errors and empty answers are not cached for the cell
+# ------------------------
+
+def test_rate_limited_answer_is_retried(monkeypatch):
+    requests = _nominatim(monkeypatch, [
+        (429, {"error": "Too many requests"}),
+        (200, {"address": {"town": "Springfield", "state": "Illinois", "country": "United States"}}),
+    ])
+
+    first = asyncio.run(reverse_geocode(10.0, 20.0))
+    second = asyncio.run(reverse_geocode(10.0, 20.0))
+
+    assert first == EMPTY_RESULT
+    assert second == {"city": "Springfield", "state": "Illinois", "country": "United States"}
+    assert len(requests) == 2
+    # Now cached
+    assert asyncio.run(reverse_geocode(10.0, 20.0)) == second and len(requests) == 2
+
+
+def test_error_json_is_not_cached(monkeypatch):
+    requests = _nominatim(monkeypatch, [(200, {"error": "Unable to geocode"}), (200, {"error": "Unable to geocode"})])
+
+    assert asyncio.run(reverse_geocode(-10.0, -20.0)) == EMPTY_RESULT
+    assert asyncio.run(reverse_geocode(-10.0, -20.0)) == EMPTY_RESULT
+    assert len(requests) == 2
+
+
+# ------------------------
+# TEST 2: Local lookups find the nearest business within range
+# ------------------------
+
+def _local_geocoder() -> LocalReverseGeocoder:
+    geocoder = LocalReverseGeocoder(grid_degrees=0.1)
+    geocoder.build([
+        (39.9526, -75.1652, "Philadelphia", "PA"),
+        (40.0379, -75.1000, "Cheltenham", " PA "),
+        (43.6532, -79.3832, "Toronto", "ON"),
+        (None, -75.0, "Nowhere", "PA"),  # skipped: no coordinates
+        (39.9500, -75.1600, "", "PA"),    # skipped: no city
+    ])
+    return geocoder
+
+
+def test_local_lookup_nearest_and_range():
+    geocoder = _local_geocoder()
+
+    assert len(geocoder) == 3
+    assert geocoder.lookup(39.96, -75.16) == {"city": "Philadelphia", "state": "PA", "country": "United States"}
+    # Nearest point sits in a neighbouring grid cell
+    assert geocoder.lookup(39.99, -75.11)["city"] == "Cheltenham"
+    assert geocoder.lookup(43.70, -79.40) == {"city": "Toronto", "state": "ON", "country": "Canada"}
+    # ~11 km from Philadelphia
+    assert geocoder.lookup(39.85, -75.1652, max_km=5) is None
+    assert geocoder.lookup(39.85, -75.1652, max_km=15)["city"] == "Philadelphia"
+    # Far from everything, and an empty index
+    assert geocoder.lookup(34.05, -118.24) is None
+    assert LocalReverseGeocoder().lookup(39.96, -75.16) is None
+
+
+def test_local_hit_skips_nominatim(monkeypatch):
+    requests = _nominatim(monkeypatch, [])
+    monkeypatch.setattr(geocoding, "local_geocoder", _local_geocoder())
+
+    assert asyncio.run(reverse_geocode(39.96, -75.16))["city"] == "Philadelphia"
+    assert not requests
@@ -0,0 +1,85 @@
+import asyncio
+import re
+
+import httpx
+from fastapi import FastAPI
+
+from api import main, metrics
+
+# Prometheus text exposition format 0.0.4
+HELP = re.compile(r"^# HELP ([a-zA-Z_:][a-zA-Z0-9_:]*) .*$")
+TYPE = re.compile(r"^# TYPE ([a-zA-Z_:][a-zA-Z0-9_:]*) (counter|gauge|histogram|summary|untyped)$")
+SAMPLE = re.compile(
+    r'^([a-zA-Z_:][a-zA-Z0-9_:]*)'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*")*\})?'
+    r' (-?[0-9.eE+-]+|\+Inf|-Inf|NaN)$'
+)
+
+
+def _get(app, *paths):
+    async def requests():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for path in paths]
+    return asyncio.run(requests())
+
+
+# ------------------------
+# TEST 1: Requests are counted per route template, not per raw path
+# ------------------------
+
+def test_requests_counted_by_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"item_id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+    before = metrics.http_requests.value(route="/items/{item_id}", method="GET", status=200)
+    unmatched = metrics.http_requests.value(route="unmatched", method="GET", status=404)
+
+    _get(app, "/items/1", "/items/2", "/items/3", "/nowhere")
+
+    assert metrics.http_requests.value(route="/items/{item_id}", method="GET", status=200) == before + 3
+    assert metrics.http_requests.value(route="/items/1", method="GET", status=200) == 0
+    assert metrics.http_requests.value(route="unmatched", method="GET", status=404) == unmatched + 1
+    assert metrics.http_request_latency.count(route="/items/{item_id}", method="GET") >= 3
+
+
+# ------------------------
+# TEST 2: /metrics is valid Prometheus text
+# ------------------------
+
+def test_metrics_endpoint_is_prometheus_text():
+    escaped = metrics.Counter("test_escaping_total", "Label values needing escapes", ["value"])
+    escaped.inc(value='a "quoted"\\ \nvalue')
+    try:
+        response, = _get(main.app, "/metrics")
+    finally:
+        metrics._registry.remove(escaped)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert response.text.endswith("\n")
+
+    families, samples = {}, 0
+    for line in response.text.splitlines():
+        if line.startswith("# HELP"):
+            assert HELP.match(line), line
+        elif line.startswith("# TYPE"):
+            name, kind = TYPE.match(line).groups()
+            assert name not in families, f"{name} declared twice"
+            families[name] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name = match.group(1)
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in families else name
+            assert family in families, f"{name} has no TYPE line"
+            samples += 1
+
+    assert families["http_requests_total"] == "counter"
+    assert families["http_request_duration_seconds"] == "histogram"
+    assert families["process_resident_memory_bytes"] == "gauge"
+    assert samples > 0
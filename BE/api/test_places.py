@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+
+from api import places_routes
+from api.places_routes import fetch_place_details
+
+
+def _google(monkeypatch, responses):
+    """Serve `responses` (status, JSON) in order as the Places API; returns the list of requests made."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses[len(requests) - 1]
+        return httpx.Response(status, json=body)
+
+    monkeypatch.setattr(places_routes, "_client", httpx.AsyncClient(
+        base_url=places_routes.GOOGLE_PLACES_BASE_URL, transport=httpx.MockTransport(handler)))
+    places_routes._details_cache.clear()
+    return requests
+
+
+# ------------------------
+# TEST 1: Details errors are not cached
+# ------------------------
+
+def test_details_error_status_is_not_cached(monkeypatch):
+    requests = _google(monkeypatch, [
+        (200, {"status": "OVER_QUERY_LIMIT", "error_message": "quota"}),
+        (500, {}),
+        (200, {"status": "OK", "result": {"website": "https://example.com"}}),
+    ])
+
+    assert asyncio.run(fetch_place_details("p1")) is None
+    assert asyncio.run(fetch_place_details("p1")) is None
+    assert asyncio.run(fetch_place_details("p1")) == {"website": "https://example.com"}
+    assert asyncio.run(fetch_place_details("p1")) == {"website": "https://example.com"}
+    assert len(requests) == 3
+
+
+# ------------------------
+# TEST 2: Results carrying page tokens are never served stale
+# ------------------------
+
+def _search_responses(monkeypatch, pages):
+    """Text search answers from `pages` in order (details always fail); returns the requests made."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path.endswith("/details/json"):
+            return httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"})
+        return httpx.Response(200, json=pages[sum("textsearch" in r.url.path for r in requests) - 1])
+
+    monkeypatch.setattr(places_routes, "_client", httpx.AsyncClient(
+        base_url=places_routes.GOOGLE_PLACES_BASE_URL, transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(places_routes, "KEY", "test-key")
+    places_routes._search_cache.clear()
+    places_routes._details_cache.clear()
+    return requests
+
+
+def _age_cache(seconds):
+    for key, (expires_at, (fetched_at, response)) in list(places_routes._search_cache._data.items()):
+        places_routes._search_cache._data[key] = (expires_at, (fetched_at - seconds, response))
+
+
+def test_page_token_results_expire_early(monkeypatch):
+    page = {"status": "OK", "results": [{"place_id": "p1"}], "next_page_token": "token-1"}
+    refreshed = {**page, "next_page_token": "token-2"}
+    requests = _search_responses(monkeypatch, [page, refreshed])
+
+    assert asyncio.run(places_routes.search_places(query="pizza"))["next_page_token"] == "token-1"
+    _age_cache(places_routes.PLACES_SEARCH_PAGE_TOKEN_TTL_SECONDS + 1)
+    # Past the page token TTL (though well within the search TTL): fetched again, not served stale
+    assert asyncio.run(places_routes.search_places(query="pizza"))["next_page_token"] == "token-2"
+    assert sum("textsearch" in r.url.path for r in requests) == 2
+
+
+def test_last_page_is_served_stale(monkeypatch):
+    last = {"status": "OK", "results": [{"place_id": "p1"}]}
+    requests = _search_responses(monkeypatch, [last, last])
+
+    stale = places_routes.search_cache_requests.value(result="stale")
+    first = asyncio.run(places_routes.search_places(query="sushi"))
+    _age_cache(places_routes.PLACES_SEARCH_CACHE_TTL_SECONDS + 1)
+    assert asyncio.run(places_routes.search_places(query="sushi")) is first
+    assert places_routes.search_cache_requests.value(result="stale") == stale + 1
+
+
+# ------------------------
+# TEST 3: The cache key is normalized, the text sent to Google is not
+# ------------------------
+
+def test_search_sends_original_text(monkeypatch):
+    requests = _search_responses(monkeypatch, [{"status": "OK", "results": [{"place_id": "p1"}]}])
+
+    first = asyncio.run(places_routes.search_places(query="Café  Olé", keyword="Tapas", lat=40.0012, lng=-3.7021))
+    second = asyncio.run(places_routes.search_places(query="café olé", keyword=" tapas", lat=40.0013, lng=-3.7022))
+
+    searches = [r for r in requests if "textsearch" in r.url.path]
+    assert second is first and len(searches) == 1
+    assert searches[0].url.params["query"] == "Café  Olé"
+    assert searches[0].url.params["keyword"] == "Tapas"
+    assert searches[0].url.params["location"] == "40.0,-3.7"
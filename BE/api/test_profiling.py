@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+import httpx
+from sqlalchemy import insert
+
+from Login.auth import create_access_token
+from api.database import get_async_db
+from api.models import User
+from api.profiling import ProfilingMiddleware
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+
+async def _new_user(username: str) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=user_id, username=username, hashed_password="x"))
+        await db.commit()
+    return user_id
+
+
+def _profiled(app, username: str) -> bool:
+    """Whether a ?profile=1 request with a token for `username` comes back profiled."""
+    async def request():
+        token = create_access_token({"sub": username})
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/?profile=1", headers={"Authorization": f"Bearer {token}"})
+        return "profile" in response.json()
+    return asyncio.run(request())
+
+
+# ------------------------
+# TEST 1: Admins are identified by user id, not by the username in the token
+# ------------------------
+
+def test_only_admin_ids_are_profiled():
+    admin_name, other_name = f"admin-{uuid.uuid4().hex[:8]}", f"other-{uuid.uuid4().hex[:8]}"
+    admin_id = asyncio.run(_new_user(admin_name))
+    asyncio.run(_new_user(other_name))
+    app = ProfilingMiddleware(_app, admin_user_ids=[admin_id])
+
+    assert _profiled(app, admin_name)
+    assert not _profiled(app, other_name)
+    # A validly signed token for a name nobody has registered grants nothing
+    assert not _profiled(app, f"ghost-{uuid.uuid4().hex[:8]}")
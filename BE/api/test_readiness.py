@@ -0,0 +1,42 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from api import main
+from api import recommendation_routes as rec
+from benchmarks.synthetic_data import write_synthetic_indexes
+
+
+async def _ready_status() -> int:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return (await client.get("/ready")).status_code
+
+
+# ------------------------
+# TEST 1: 503 until the background load finishes, then ready
+# ------------------------
+
+def test_ready_after_background_load(tmp_path, monkeypatch):
+    data_dir = write_synthetic_indexes(str(tmp_path), n_businesses=300, n_yelp_users=200,
+                                       als_iterations=2, taste_clusters=8)
+    progress = rec.IndexLoadProgress()
+    monkeypatch.setattr(rec, "RECOMMENDATION_DATA_DIR", data_dir)
+    monkeypatch.setattr(rec, "index_progress", progress)
+    monkeypatch.setattr(main, "index_progress", progress)
+    monkeypatch.setattr(rec, "_business_index", {})
+
+    assert asyncio.run(_ready_status()) == 503
+    with pytest.raises(HTTPException) as rejected:
+        rec.require_indexes()
+    assert rejected.value.status_code == 503 and rejected.value.headers["Retry-After"] == "5"
+
+    asyncio.run(rec.load_indexes_in_background())
+
+    assert progress.state == "ready", progress.error
+    assert all(phase["state"] == "done" for phase in progress.phases.values())
+    assert asyncio.run(_ready_status()) == 200
+    rec.require_indexes()
+    assert len(rec._business_index) == 300
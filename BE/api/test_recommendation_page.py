@@ -0,0 +1,46 @@
+import asyncio
+import json
+import uuid
+
+from sqlalchemy import insert
+
+from api import recommendation_routes as rec
+from api.database import get_async_db
+from api.models import User, UserClick
+
+
+async def _user_with_clicks(business_ids) -> str:
+    user_id = uuid.uuid4()
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=user_id, username=f"user-{user_id.hex[:8]}", hashed_password="x"))
+        await db.execute(insert(UserClick), [{"user_id": user_id, "business_id": bid} for bid in business_ids])
+        await db.commit()
+    return str(user_id)
+
+
+def _ids(response) -> list:
+    return [item["business_id"] for item in json.loads(response["recommendations"])]
+
+
+# ------------------------
+# TEST 1: With MMR on, ?top_k=N is the first N of /page
+# ------------------------
+
+def test_page_matches_top_k_with_diversity(synthetic_indexes):
+    business_index = synthetic_indexes
+    user_id = asyncio.run(_user_with_clicks(list(business_index)[:5]))
+
+    async def scenario():
+        page = await rec.recommendation_page(user_id, 20, diversity=0.3)
+        top = await rec.generate_recommendations_with_algorithm(user_id, 20, diversity=0.3)
+        plain = await rec.generate_recommendations_with_algorithm(user_id, 20, diversity=0)
+        return _ids(page), _ids(top), _ids(plain)
+
+    page, top, plain = asyncio.run(scenario())
+
+    assert len(page) == len(top) == 20
+    assert page == top
+    # MMR had candidates beyond the top 20 to pick from
+    assert page != plain
+    # A plain request only ranks its own candidates, not the page's
+    assert rec.diversity_candidates(20, 0.3) == 20 + rec.RECOMMENDATION_DIVERSITY_CANDIDATES
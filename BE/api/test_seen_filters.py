@@ -0,0 +1,132 @@
+import asyncio
+import json
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import Insert, insert
+
+from api import recommendation_routes as rec
+from api import seen_filters
+from api.database import get_async_db
+from api.models import User, UserClick
+from api.seen_filters import get_seen_filter, record_seen
+
+
+async def _new_user() -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with get_async_db() as db:
+        await db.execute(insert(User).values(id=user_id, username=f"user-{user_id.hex[:8]}", hashed_password="x"))
+        await db.commit()
+    return user_id
+
+
+async def _click(user_id, business_ids) -> None:
+    # One second apart, in order, so the history's "most recent" is well defined
+    start = datetime.utcnow() - timedelta(seconds=len(business_ids))
+    async with get_async_db() as db:
+        await db.execute(insert(UserClick), [
+            {"user_id": user_id, "business_id": bid, "clicked_at": start + timedelta(seconds=i)}
+            for i, bid in enumerate(business_ids)
+        ])
+        await db.commit()
+
+
+async def _stored_filter(user_id):
+    async with get_async_db() as db:
+        return await get_seen_filter(user_id, db)
+
+
+# ------------------------
+# TEST 1: A filter that gets too full is rebuilt larger from the full history
+# ------------------------
+
+def test_full_filter_grows(monkeypatch):
+    monkeypatch.setattr(seen_filters, "RECOMMENDATION_SEEN_FILTER_BITS", 1024)
+    monkeypatch.setattr(seen_filters, "RECOMMENDATION_SEEN_FILTER_MAX_BITS", 1 << 16)
+    first, later = [f"early-{i}" for i in range(10)], [f"later-{i}" for i in range(300)]
+
+    async def scenario():
+        user_id = await _new_user()
+        await _click(user_id, first)
+        await record_seen({user_id: first})
+        small = await _stored_filter(user_id)
+        await _click(user_id, later)
+        await record_seen({user_id: later})
+        return small, await _stored_filter(user_id)
+
+    grown = seen_filters.filter_updates.value(result="grown")
+    small, large = asyncio.run(scenario())
+
+    assert small.n_bits == 1024
+    assert large.n_bits > 1024 and large.count == 310
+    assert large.false_positive_rate() <= seen_filters.RECOMMENDATION_SEEN_FILTER_MAX_FP_RATE
+    assert all(bid in large for bid in first + later)
+    assert seen_filters.filter_updates.value(result="grown") == grown + 1
+
+
+# ------------------------
+# TEST 2: A concurrent first write for the same user is merged, not lost
+# ------------------------
+
+def test_concurrent_first_insert_is_merged(monkeypatch):
+    raced = []
+    add_to_filters = seen_filters._add_to_filters
+
+    class RacingSession:
+        """Lets another writer create the user's row between our read and our insert."""
+
+        def __init__(self, db, user_id):
+            self.db, self.user_id = db, user_id
+
+        def __getattr__(self, name):
+            return getattr(self.db, name)
+
+        async def execute(self, statement, *args):
+            if isinstance(statement, Insert) and not raced:
+                raced.append(True)
+                await record_seen({self.user_id: ["theirs"]})
+            return await self.db.execute(statement, *args)
+
+    async def scenario():
+        user_id = await _new_user()
+        await _click(user_id, ["ours", "theirs"])
+        monkeypatch.setattr(seen_filters, "_add_to_filters",
+                            lambda seen, db: add_to_filters(seen, RacingSession(db, user_id)))
+        await record_seen({user_id: ["ours"]})
+        return await _stored_filter(user_id)
+
+    failed = seen_filters.filter_updates.value(result="failed")
+    stored = asyncio.run(scenario())
+
+    assert "ours" in stored and "theirs" in stored
+    assert seen_filters.filter_updates.value(result="failed") == failed
+
+
+# ------------------------
+# TEST 3: Everything recorded is excluded from recommendations, beyond the recent history
+# ------------------------
+
+def test_recorded_history_is_never_recommended(synthetic_indexes, monkeypatch):
+    # Only the 5 most recent clicks are read exactly; the rest of the history is up to the filter
+    fetch_history = rec.get_user_history_from_database
+    monkeypatch.setattr(rec, "get_user_history_from_database",
+                        lambda user_id, limit=100, db=None: fetch_history(user_id, 5, db))
+    signature, _ = Counter(tuple(categories) for categories in synthetic_indexes.values()).most_common(1)[0]
+    clicked = [bid for bid, categories in synthetic_indexes.items() if tuple(categories) == signature][:20]
+
+    async def recommended(user_id) -> set:
+        response = await rec.generate_recommendations_with_algorithm(str(user_id), 20, diversity=0)
+        return {item["business_id"] for item in json.loads(response["recommendations"])}
+
+    async def scenario():
+        without_filter, with_filter = await _new_user(), await _new_user()
+        await _click(without_filter, clicked)
+        await _click(with_filter, clicked)
+        await record_seen({with_filter: clicked})
+        return await recommended(without_filter), await recommended(with_filter)
+
+    unfiltered, filtered = asyncio.run(scenario())
+
+    assert unfiltered & set(clicked[:-5])  # older clicks come back without a filter
+    assert len(filtered) == 20 and not filtered & set(clicked)
@@ -1,58 +1,43 @@
 """
 User tracking routes for clicks and location data
 """
-import httpx
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 from . import schemas, models
+from .cache import interaction_versions
+from .click_buffer import click_buffer, build_click_row, write_click_rows
 from .database import get_db_dependency
 from .dependencies import get_current_user
+from .geocoding import reverse_geocode
 
 router = APIRouter(prefix="/tracking", tags=["tracking"])
 
 
-async def reverse_geocode(lat: float, lng: float) -> dict:
-    """Resolve lat/lng to city, state, country via Nominatim."""
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                "https://nominatim.openstreetmap.org/reverse",
-                params={"lat": lat, "lon": lng, "format": "json"},
-                headers={"User-Agent": "your-app-name"},
-            )
-            data = response.json()
-            address = data.get("address", {})
-            return {
-                "city": (
-                    address.get("city")
-                    or address.get("town")
-                    or address.get("village")
-                ),
-                "state":   address.get("state"),
-                "country": address.get("country"),
-            }
-    except Exception:
-        return {"city": None, "state": None, "country": None}
-
-
 @router.post("/click", response_model=schemas.UserClickResponse)
 async def record_user_click(
     click_data: schemas.UserClickCreate,
+    current_user: schemas.UserInDB = Depends(get_current_user)
+):
+    # Queued for the background writer — visible to reads after the next flush
+    row = build_click_row(current_user.id, click_data.business_id, click_data.lat, click_data.lng)
+    await click_buffer.put(row)
+    return row
+
+
+@router.post("/clicks/batch", response_model=List[schemas.UserClickResponse])
+async def record_user_clicks_batch(
+    batch: schemas.UserClickBatchCreate,
     db: AsyncSession = Depends(get_db_dependency),
     current_user: schemas.UserInDB = Depends(get_current_user)
 ):
-    db_click = models.UserClick(
-        user_id=current_user.id,
-        business_id=click_data.business_id,
-        lat=click_data.lat,
-        lng=click_data.lng
-    )
-    db.add(db_click)
-    await db.commit()
-    await db.refresh(db_click)
-    return db_click
+    rows = [
+        build_click_row(current_user.id, click.business_id, click.lat, click.lng)
+        for click in batch.clicks
+    ]
+    await write_click_rows(rows, db)
+    return rows
 
 
 @router.post("/location", response_model=schemas.UserLocationResponse)
@@ -75,6 +60,8 @@ async def record_user_location(
     db.add(db_location)
     await db.commit()
     await db.refresh(db_location)
+    # The city seeds cold-start recommendations
+    interaction_versions.bump(str(current_user.id))
     return db_location
 
 
@@ -0,0 +1,138 @@
+"""
+Offline evaluation: recommendation quality and latency per engine
+
+Holds out every Yelp user's most recent liked reviews (4+ stars, ordered by
+review date), builds each engine's index from the remaining reviews only,
+then asks every registered engine for top-k recommendations from the rest
+of a sample of those users' likes (as clicks). Reports recall@k, NDCG@k,
+catalog coverage and per-query latency (the engine's ranking call plus the
+diversity re-ranking; no DB, no formatting) in one table, so a performance
+change can be checked for a quality regression before it ships.
+
+Runs on synthetic reviews by default, or on the real Yelp files:
+
+    python -m benchmarks.engines --businesses 5000 --yelp-users 20000 --test-users 200 --top-k 10
+    python -m benchmarks.engines --data-dir data_extraction --reviews Yelp-JSON/yelp_academic_dataset_review.json
+    python -m benchmarks.engines --diversity 0 0.3 0.6          # quality / latency cost of MMR
+    python -m benchmarks.engines --vector-dtypes float64 int8   # quantized category vectors
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from .local_server import BE_DIR, percentile  # noqa: F401 — puts BE/ on sys.path
+from .synthetic_data import (
+    REVIEWS_FILENAME, build_synthetic_taste_clusters, category_review_index_from, generate_catalog_and_reviews,
+)
+
+from Vectorization.evaluation import catalog_coverage, ndcg_at_k, recall_at_k, sample_cases, split_recent_likes
+
+
+def read_reviews(path: str, business_index: dict):
+    """(user_id, business_id, stars, date) of the reviews of indexed businesses, in file order."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            review = json.loads(line)
+            if review.get("business_id") in business_index:
+                yield review.get("user_id"), review["business_id"], review.get("stars"), review.get("date")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="evaluate on complete_business_index.json here instead of synthetic data")
+    parser.add_argument("--reviews", help=f"Yelp review file for --data-dir (default: <data-dir>/{REVIEWS_FILENAME})")
+    parser.add_argument("--businesses", type=int, default=5000)
+    parser.add_argument("--yelp-users", type=int, default=20000)
+    parser.add_argument("--test-users", type=int, default=200, help="users queried (0 = every held-out user)")
+    parser.add_argument("--holdout", type=int, default=1, help="most recent liked businesses held out per user")
+    parser.add_argument("--min-history", type=int, default=2, help="liked businesses a user keeps to be evaluated")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--engines", nargs="+", help="registered engines to run (default: all)")
+    parser.add_argument("--vector-dtypes", nargs="+", default=[None],
+                        help="category vector storage to compare (default: RECOMMENDATION_VECTOR_DTYPE)")
+    parser.add_argument("--clusters", type=int, default=256, help="taste clusters for the clusters engine")
+    parser.add_argument("--diversity", type=float, nargs="+", default=[0.0],
+                        help="MMR weights to compare (0 = plain score order)")
+    parser.add_argument("--candidates", type=int, default=100, help="candidates re-ranked by MMR beyond the top k")
+    parser.add_argument("--als-factors", type=int, default=32)
+    parser.add_argument("--als-iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "unused.db"))
+    from api import recommendation_routes as rec
+    from Vectorization.als import train_als
+    from Vectorization.cooccurrence import build_cooccurrence
+    from Vectorization.diversity import category_columns
+    from Vectorization.vectorize import cat_to_index
+
+    if args.data_dir:
+        with open(os.path.join(args.data_dir, "complete_business_index.json"), encoding="utf-8") as f:
+            business_index = json.load(f)
+        reviews = read_reviews(args.reviews or os.path.join(args.data_dir, REVIEWS_FILENAME), business_index)
+    else:
+        business_index, _, synthetic = generate_catalog_and_reviews(args.businesses, args.yelp_users, args.seed)
+        reviews = ((uid, bid, stars, None) for uid, bid, stars in synthetic)  # generated in review order
+    train, held_out = split_recent_likes(reviews, args.holdout, args.min_history)
+    cases = sample_cases(held_out, args.test_users, args.seed)
+    if not cases:
+        parser.error(f"no user has {args.holdout + args.min_history} distinct liked businesses to evaluate")
+
+    build_times = {}
+    start = time.perf_counter()
+    category_review_index = category_review_index_from(train, business_index)
+    # Stored like the server does, once per compared dtype
+    category_vectors = {
+        dtype: (rec._build_user_vectors(category_review_index, dtype),
+                rec._build_restaurant_vectors(business_index, dtype))
+        for dtype in args.vector_dtypes
+    }
+    build_times["category"] = (time.perf_counter() - start) / len(category_vectors)
+    start = time.perf_counter()
+    taste_clusters = build_synthetic_taste_clusters(category_review_index, business_index, args.clusters, args.seed)
+    build_times["clusters"] = time.perf_counter() - start
+    start = time.perf_counter()
+    cooccurrence = build_cooccurrence(train.values())
+    build_times["cooccurrence"] = time.perf_counter() - start
+    start = time.perf_counter()
+    embeddings = train_als(train.values(), factors=args.als_factors, iterations=args.als_iterations, seed=args.seed)
+    build_times["als"] = time.perf_counter() - start
+
+    fragments = rec.build_business_fragments(business_index, {})
+    columns = category_columns(business_index, cat_to_index)
+    seen_positions = rec._build_seen_positions(business_index)
+
+    print(f"\n{len(business_index)} businesses, {len(train)} Yelp users, {len(cases)} of {len(held_out)} "
+          f"held-out users queried, {args.holdout} held out each, top {args.top_k}")
+    k = args.top_k
+    print(f"{'engine':22}{'diversity':>10}{'build s':>9}{f'recall@{k}':>11}{f'ndcg@{k}':>9}{'coverage':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name in args.engines or list(rec.ENGINES):
+        rank, _ = rec.ENGINES[name]
+        # Only the category engine reads the quantized vectors
+        for dtype in (args.vector_dtypes if name == "category" else args.vector_dtypes[:1]):
+            rec._install_indexes(business_index, [], *category_vectors[dtype], fragments, cooccurrence, embeddings,
+                                 None, taste_clusters, columns, seen_positions)
+            label = f"{name} [{rec._restaurant_vectors.vectors.dtype}]" if name == "category" else name
+            for diversity in args.diversity:
+                candidates = rec.diversity_candidates(k, diversity, args.candidates)
+                recalls, ndcgs, recommended, latencies = [], [], [], []
+                for history, relevant in cases:
+                    t = time.perf_counter()
+                    ranked = rec.diversify(rank(history, [], candidates, rec.seen_rows(history, [])), k, diversity)
+                    latencies.append((time.perf_counter() - t) * 1000)
+                    ids = [bid for bid, _ in ranked]
+                    recalls.append(recall_at_k(ids, relevant, k))
+                    ndcgs.append(ndcg_at_k(ids, relevant, k))
+                    recommended.append(ids)
+                print(f"{label:22}{diversity:>10.2f}{build_times.get(name, 0):>9.2f}"
+                      f"{sum(recalls) / len(cases):>11.3f}{sum(ndcgs) / len(cases):>9.3f}"
+                      f"{catalog_coverage(recommended, len(business_index)):>10.3f}"
+                      f"{percentile(latencies, 50):>9.2f}{percentile(latencies, 95):>9.2f}"
+                      f"{percentile(latencies, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Local stand-in for the Google Places text search and details endpoints
+
+Every response is delayed by a configurable latency so the API's fan-out
+behaviour can be measured without a Google key or network access:
+
+    FAKE_PLACES_LATENCY_MS=80 uvicorn benchmarks.fake_places_server:app --port 9000
+    GOOGLE_PLACES_BASE_URL=http://127.0.0.1:9000 GOOGLE_API_KEY=fake uvicorn api.main:app
+"""
+import asyncio
+import hashlib
+import os
+
+from fastapi import FastAPI
+
+LATENCY_MS = float(os.getenv("FAKE_PLACES_LATENCY_MS", "50"))
+RESULTS_PER_PAGE = 20
+
+app = FastAPI(title="Fake Google Places")
+app.state.latency_ms = LATENCY_MS
+app.state.requests = {"textsearch": 0, "details": 0}
+
+
+def _place_id(seed: str, i: int) -> str:
+    return "fake_" + hashlib.sha1(f"{seed}:{i}".encode()).hexdigest()[:20]
+
+
+@app.get("/textsearch/json")
+async def text_search(query: str = "restaurants", location: str = None, pagetoken: str = None, key: str = None):
+    app.state.requests["textsearch"] += 1
+    await asyncio.sleep(app.state.latency_ms / 1000)
+
+    seed = pagetoken or f"{query}|{location}"
+    page = int(pagetoken.rsplit(":", 1)[1]) if pagetoken else 0
+    lat, lng = (float(v) for v in location.split(",")) if location else (0.0, 0.0)
+    results = [
+        {
+            "place_id": _place_id(seed, i),
+            "name": f"{query.title()} Place {page * RESULTS_PER_PAGE + i + 1}",
+            "formatted_address": f"{i + 1} Fake Street",
+            "geometry": {"location": {"lat": lat + i * 1e-3, "lng": lng - i * 1e-3}},
+            "rating": round(3 + (i % 20) / 10, 1),
+        }
+        for i in range(RESULTS_PER_PAGE)
+    ]
+    return {
+        "status": "OK",
+        "results": results,
+        "next_page_token": f"{query}|{location}:{page + 1}" if page < 2 else None,
+    }
+
+
+@app.get("/details/json")
+async def place_details(place_id: str, fields: str = None, key: str = None):
+    app.state.requests["details"] += 1
+    await asyncio.sleep(app.state.latency_ms / 1000)
+    return {
+        "status": "OK",
+        "result": {
+            "website": f"https://example.com/{place_id}",
+            "formatted_phone_number": "(555) 010-0000",
+            "international_phone_number": "+1 555-010-0000",
+            "reviews": [],
+            "opening_hours": {"open_now": True},
+            "url": f"https://maps.example.com/?cid={place_id}",
+            "price_level": 2,
+            "editorial_summary": {"overview": "A fake place for benchmarks."},
+        },
+    }
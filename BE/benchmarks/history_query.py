@@ -0,0 +1,128 @@
+"""
+Recommendation history fetch latency as the interaction tables grow
+
+Seeds user_clicks/user_swipes with synthetic history for a fixed set of users,
+then times the exact UNION ALL query the recommendation path runs
+(`build_history_query`) with the old single-column user_id indexes and with
+the composite (user_id, time DESC) indexes from migration 0001.
+
+SQLite runs by default; pass --postgres-url to also run against a local
+Postgres (e.g. `docker run -p 5432:5432 -e POSTGRES_PASSWORD=pw postgres:16`).
+The Postgres database is dropped and recreated table by table, so point it
+at a scratch database.
+
+    python -m benchmarks.history_query --sizes 10000 100000 500000 --users 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BE_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'history-bench-unused.db')}")
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+
+from api.database import Base  # noqa: E402
+from api.models import User, UserClick, UserLocation, UserSwipe  # noqa: E402
+from api.recommendation_routes import build_history_query  # noqa: E402
+from migrations import m0001_interaction_history_indexes as composite  # noqa: E402
+
+from .local_server import percentile  # noqa: E402
+
+
+BENCH_TABLES = [User.__table__, UserClick.__table__, UserSwipe.__table__, UserLocation.__table__]
+
+
+def _reset(engine):
+    Base.metadata.drop_all(engine, tables=BENCH_TABLES)
+    Base.metadata.create_all(engine, tables=BENCH_TABLES)
+
+
+def _seed_users(engine, user_ids):
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": uid, "username": f"bench_{i}", "hashed_password": "x"}
+                                    for i, uid in enumerate(user_ids)])
+
+
+def _seed(engine, user_ids, rows: int, batch: int = 5000):
+    start_time = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for table, time_col, share in ((UserClick, "clicked_at", 0.8), (UserSwipe, "swiped_at", 0.2)):
+            total = int(rows * share)
+            for offset in range(0, total, batch):
+                conn.execute(insert(table), [
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": random.choice(user_ids),
+                        "business_id": f"biz_{random.randrange(50_000)}",
+                        time_col: start_time + timedelta(seconds=random.randrange(365 * 86400)),
+                    }
+                    for _ in range(min(batch, total - offset))
+                ])
+
+
+def _set_indexes(engine, use_composite: bool):
+    with engine.begin() as conn:
+        if use_composite:
+            composite.upgrade(conn)
+        else:
+            composite.downgrade(conn)
+        conn.execute(text("ANALYZE"))
+
+
+def _time_queries(engine, user_ids, queries: int, limit: int) -> list:
+    latencies = []
+    with engine.connect() as conn:
+        for _ in range(queries):
+            stmt = build_history_query(random.choice(user_ids), limit)
+            start = time.perf_counter()
+            conn.execute(stmt).all()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_backend(label: str, url: str, args):
+    engine = create_engine(url)
+    user_ids = [uuid.uuid4() for _ in range(args.users)]
+    print(f"\n{label}: {args.users} users, history LIMIT {args.limit}, {args.queries} queries per cell")
+    print(f"{'rows':>10}{'rows/user':>11}{'user_id idx p50':>17}{'p95':>9}{'composite p50':>15}{'p95':>9}")
+
+    _reset(engine)
+    _seed_users(engine, user_ids)
+    seeded = 0
+    for size in sorted(args.sizes):
+        _seed(engine, user_ids, size - seeded)
+        seeded = size
+        results = {}
+        for use_composite in (False, True):
+            _set_indexes(engine, use_composite)
+            results[use_composite] = _time_queries(engine, user_ids, args.queries, args.limit)
+        print(f"{size:>10}{size // args.users:>11}"
+              f"{percentile(results[False], 50):>15.2f}ms{percentile(results[False], 95):>7.2f}ms"
+              f"{percentile(results[True], 50):>13.2f}ms{percentile(results[True], 95):>7.2f}ms")
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--postgres-url", default=None, help="e.g. postgresql://postgres:pw@localhost:5432/bench")
+    args = parser.parse_args()
+
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix="history-bench-"), "bench.db")
+    run_backend("SQLite", f"sqlite:///{sqlite_path}", args)
+    if args.postgres_url:
+        run_backend("PostgreSQL", args.postgres_url, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Async load test for the whole API
+
+Registers and logs in synthetic users, seeds each with a little click
+history, then has `--concurrency` workers replay a weighted mix of tracking,
+recommendation and search requests for `--duration` seconds. Reports
+p50/p95/p99 and throughput per route.
+
+By default everything runs locally: a throwaway SQLite database, synthetic
+index files and the fake Places server. Pass --base-url to drive an already
+running deployment instead, and --json to save results for comparing builds.
+
+    python -m benchmarks.load_test --users 50 --concurrency 20 --duration 30
+    python -m benchmarks.load_test --mix click=5,swipe=2,recommend=3 --json before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from .fake_places_server import app as fake_places_app
+from .local_server import local_api_server, percentile, serve_in_thread
+from .synthetic_data import business_ids, write_synthetic_indexes
+
+PASSWORD = "load-test-password"
+SEED_CLICKS = 10
+SEARCH_TERMS = ["pizza", "sushi", "tacos", "ramen", "burgers", "thai", "coffee", "bbq"]
+
+DEFAULT_MIX = "click=40,swipe=15,location=5,recommend=20,top20=5,random=5,next=5,search=5"
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class VirtualUser:
+    username: str
+    headers: dict
+    lat: float
+    lng: float
+
+
+class Scenario:
+    """One request per operation name; each returns the httpx response."""
+
+    def __init__(self, client: httpx.AsyncClient, businesses: List[str], rng: random.Random):
+        self.client = client
+        self.businesses = businesses
+        self.rng = rng
+
+    def _business(self) -> str:
+        # Skewed towards the first businesses so some restaurants are "popular"
+        return self.businesses[min(int(self.rng.expovariate(1 / 200)), len(self.businesses) - 1)]
+
+    async def click(self, user: VirtualUser):
+        return await self.client.post("/tracking/click", headers=user.headers, json={
+            "business_id": self._business(), "lat": user.lat, "lng": user.lng,
+        })
+
+    async def swipe(self, user: VirtualUser):
+        return await self.client.post("/recommendations/swipe", headers=user.headers,
+                                      json={"business_id": self._business()})
+
+    async def location(self, user: VirtualUser):
+        return await self.client.post("/tracking/location", headers=user.headers, json={
+            "lat": user.lat + self.rng.uniform(-0.01, 0.01), "lng": user.lng + self.rng.uniform(-0.01, 0.01),
+        })
+
+    async def recommend(self, user: VirtualUser):
+        return await self.client.get("/recommendations/", headers=user.headers, params={"top_k": 10})
+
+    async def top20(self, user: VirtualUser):
+        return await self.client.get("/recommendations/top20", headers=user.headers)
+
+    async def random(self, user: VirtualUser):
+        return await self.client.get("/recommendations/random", headers=user.headers, params={"count": 10})
+
+    async def next(self, user: VirtualUser):
+        return await self.client.get("/recommendations/next", headers=user.headers)
+
+    async def search(self, user: VirtualUser):
+        return await self.client.get("/places/search", params={
+            "query": self.rng.choice(SEARCH_TERMS), "lat": user.lat, "lng": user.lng,
+        })
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Scenario, name) or name.startswith("_"):
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _setup_users(client: httpx.AsyncClient, scenario: Scenario, count: int,
+                       concurrency: int, rng: random.Random) -> List[VirtualUser]:
+    semaphore = asyncio.Semaphore(concurrency)
+    run_id = f"{int(time.time())}{rng.randint(0, 9999):04d}"
+
+    async def setup(i: int) -> VirtualUser:
+        username = f"load_{run_id}_{i}"
+        async with semaphore:
+            res = await client.post("/auth/register", json={"username": username, "password": PASSWORD})
+            res.raise_for_status()
+            res = await client.post("/auth/login", data={"username": username, "password": PASSWORD})
+            res.raise_for_status()
+            user = VirtualUser(
+                username=username,
+                headers={"Authorization": f"Bearer {res.json()['access_token']}"},
+                lat=36.16 + rng.uniform(-0.1, 0.1),
+                lng=-86.78 + rng.uniform(-0.1, 0.1),
+            )
+            clicks = [{"business_id": scenario._business()} for _ in range(SEED_CLICKS)]
+            res = await client.post("/tracking/clicks/batch", headers=user.headers, json={"clicks": clicks})
+            res.raise_for_status()
+            return user
+
+    return await asyncio.gather(*(setup(i) for i in range(count)))
+
+
+async def _worker(scenario: Scenario, users: List[VirtualUser], mix: Dict[str, float],
+                  stats: Dict[str, RouteStats], deadline: float, rng: random.Random) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights=weights)[0]
+        user = rng.choice(users)
+        route = stats.setdefault(name, RouteStats())
+        start = time.perf_counter()
+        try:
+            res = await getattr(scenario, name)(user)
+        except httpx.HTTPError:
+            route.errors += 1
+            continue
+        route.latencies.append((time.perf_counter() - start) * 1000)
+        route.statuses[res.status_code] = route.statuses.get(res.status_code, 0) + 1
+        if res.status_code >= 400:
+            route.errors += 1
+
+
+def summarize(stats: Dict[str, RouteStats], elapsed: float) -> dict:
+    routes = {}
+    for name, route in sorted(stats.items()):
+        samples = route.latencies
+        routes[name] = {
+            "requests": len(samples),
+            "errors":   route.errors,
+            "rps":      round(len(samples) / elapsed, 1),
+            "p50_ms":   round(percentile(samples, 50), 2),
+            "p95_ms":   round(percentile(samples, 95), 2),
+            "p99_ms":   round(percentile(samples, 99), 2),
+            "max_ms":   round(max(samples, default=0), 2),
+            "statuses": {str(code): n for code, n in sorted(route.statuses.items())},
+        }
+    all_samples = [ms for route in stats.values() for ms in route.latencies]
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total": {
+            "requests": len(all_samples),
+            "errors":   sum(route.errors for route in stats.values()),
+            "rps":      round(len(all_samples) / elapsed, 1),
+            "p50_ms":   round(percentile(all_samples, 50), 2),
+            "p95_ms":   round(percentile(all_samples, 95), 2),
+            "p99_ms":   round(percentile(all_samples, 99), 2),
+            "max_ms":   round(max(all_samples, default=0), 2),
+        },
+        "routes": routes,
+    }
+
+
+def print_report(report: dict, args) -> None:
+    print(f"\n{args.users} users, concurrency {args.concurrency}, {report['elapsed_seconds']} s")
+    print(f"{'route':12}{'n':>8}{'err':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for name, r in rows:
+        print(f"{name:12}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9.1f}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}")
+
+
+async def _run(base_url: str, args, businesses: List[str]) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        scenario = Scenario(client, businesses, rng)
+        users = await _setup_users(client, scenario, args.users, args.concurrency, rng)
+
+        stats: Dict[str, RouteStats] = {}
+        if args.warmup > 0:
+            warmup_deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*(
+                _worker(scenario, users, args.mix, {}, warmup_deadline, random.Random(rng.random()))
+                for _ in range(args.concurrency)
+            ))
+
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            _worker(scenario, users, args.mix, stats, deadline, random.Random(rng.random()))
+            for _ in range(args.concurrency)
+        ))
+        return summarize(stats, time.monotonic() - start)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted operations (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    parser.add_argument("--base-url", help="target a running API instead of starting one locally")
+    local = parser.add_argument_group("local server")
+    local.add_argument("--businesses", type=int, default=5000)
+    local.add_argument("--yelp-users", type=int, default=20000)
+    local.add_argument("--places-latency-ms", type=float, default=50)
+    local.add_argument("--bcrypt-rounds", type=int, default=4, help="cheap hashing so setup doesn't dominate")
+    args = parser.parse_args(argv)
+
+    if args.base_url:
+        # Remote targets use real business ids only if they match; synthetic ids still exercise every route
+        report = asyncio.run(_run(args.base_url, args, business_ids(args.businesses)))
+    else:
+        data_dir = write_synthetic_indexes(
+            tempfile.mkdtemp(prefix="food-rec-data-"), args.businesses, args.yelp_users, args.seed
+        )
+        fake_places_app.state.latency_ms = args.places_latency_ms
+        with serve_in_thread(fake_places_app, name="fake-places") as places_url:
+            env = {
+                "RECOMMENDATION_DATA_DIR": data_dir,
+                "GOOGLE_PLACES_BASE_URL":  places_url,
+                "GOOGLE_API_KEY":          "fake-key",
+                "BCRYPT_ROUNDS":           str(args.bcrypt_rounds),
+                "REVERSE_GEOCODE_REMOTE_FALLBACK": "false",
+            }
+            with local_api_server(env=env) as base_url:
+                report = asyncio.run(_run(base_url, args, business_ids(args.businesses)))
+
+    print_report(report, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "mix"} | {"mix": args.mix},
+                       **report}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Boot the API on a throwaway SQLite database for local benchmarks.
+
+The server runs in its own thread with its own event loop, so the client
+driving the benchmark never competes with the handlers it is measuring.
+"""
+import math
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BE_DIR)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _create_tables(database_url: str):
+    from sqlalchemy import create_engine
+    from api.database import Base
+    from api import models  # noqa: F401 — registers the tables on Base
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+@contextmanager
+def serve_in_thread(app, port: int = None, name: str = "bench-server"):
+    """Run an ASGI app with uvicorn in a background thread; yields its base URL."""
+    import uvicorn
+
+    port = port or _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name=name, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"{name} failed to start")
+        time.sleep(0.05)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def wait_until_ready(base_url: str, timeout: float = 300) -> dict:
+    """Poll /ready until the background index load finishes (or fails); returns its progress."""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = httpx.get(f"{base_url}/ready").json()["indexes"]
+        if progress["state"] in ("ready", "failed") or time.monotonic() > deadline:
+            return progress
+        time.sleep(0.1)
+
+
+@contextmanager
+def local_api_server(env: dict = None, port: int = None, wait_ready: bool = True):
+    """
+    Start `api.main:app` on 127.0.0.1 backed by a fresh SQLite file.
+
+    `env` is applied to os.environ before the API modules are imported, so
+    module-level settings (BCRYPT_ROUNDS, pool sizes, ...) can be overridden.
+    With `wait_ready`, waits for the recommendation indexes to finish loading.
+    Yields the base URL.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="food-rec-bench-")
+    database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.update(env or {})
+
+    _create_tables(database_url)
+    from api.main import app
+
+    with serve_in_thread(app, port, name="bench-api-server") as base_url:
+        if wait_ready:
+            wait_until_ready(base_url)
+        yield base_url
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,109 @@
+"""
+Login-storm benchmark
+
+Fires a burst of concurrent /auth/login requests while a probe keeps hitting
+an unrelated endpoint (/health by default), then reports the probe's latency
+percentiles with and without the storm. If password hashing blocks the event
+loop, the probe's p99 during the storm jumps to roughly the length of the burst.
+
+    python -m benchmarks.login_storm --users 20 --logins 200 --bcrypt-rounds 12
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .local_server import local_api_server, percentile
+
+PASSWORD = "storm-password-123"
+
+
+async def _probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _register_users(client: httpx.AsyncClient, count: int) -> list:
+    usernames = [f"storm_user_{i}" for i in range(count)]
+    for username in usernames:
+        res = await client.post("/auth/register", json={"username": username, "password": PASSWORD})
+        res.raise_for_status()
+    return usernames
+
+
+async def _run(base_url: str, args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        usernames = await _register_users(client, args.users)
+
+        # Baseline: probe on an idle server
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, args.probe_path, stop, args.probe_interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await probe
+
+        # Storm: probe while logins are in flight
+        semaphore = asyncio.Semaphore(args.concurrency)
+        login_latencies = []
+
+        async def login(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                res = await client.post(
+                    "/auth/login",
+                    data={"username": usernames[i % len(usernames)], "password": PASSWORD},
+                )
+                res.raise_for_status()
+                login_latencies.append((time.perf_counter() - start) * 1000)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, args.probe_path, stop, args.probe_interval))
+        storm_start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        storm_seconds = time.perf_counter() - storm_start
+        stop.set()
+        during = await probe
+
+    print(f"\n{args.logins} logins, concurrency {args.concurrency}, bcrypt rounds {args.bcrypt_rounds}, "
+          f"{args.hash_workers} hash workers")
+    print(f"Storm duration: {storm_seconds:.2f}s ({args.logins / storm_seconds:.1f} logins/s)")
+    print(f"{'':28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, samples in (
+        (f"{args.probe_path} idle", baseline),
+        (f"{args.probe_path} during storm", during),
+        ("/auth/login", login_latencies),
+    ):
+        print(f"{label:28}{len(samples):>6}"
+              f"{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}{max(samples, default=0):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--hash-workers", type=int, default=4)
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    env = {
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "PASSWORD_HASH_WORKERS": str(args.hash_workers),
+    }
+    with local_api_server(env=env) as base_url:
+        asyncio.run(_run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
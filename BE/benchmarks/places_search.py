@@ -0,0 +1,67 @@
+"""
+/places/search latency against the local fake Places server
+
+Runs searches with cold details caches (a new query each time) and then
+repeats them warm, reporting end-to-end latency next to the simulated
+upstream round trip. With a concurrent details fan-out a cold search costs
+roughly two round trips (text search + one parallel wave of details) rather
+than one per result.
+
+    python -m benchmarks.places_search --latency-ms 80 --searches 20
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .fake_places_server import app as fake_places_app
+from .local_server import local_api_server, percentile, serve_in_thread
+
+
+async def _search_round(client: httpx.AsyncClient, queries: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def search(query: str):
+        async with semaphore:
+            start = time.perf_counter()
+            res = await client.get("/places/search", params={"query": query, "lat": 36.16, "lng": -86.78})
+            res.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(search(q) for q in queries))
+    return latencies
+
+
+async def _run(base_url: str, args) -> None:
+    queries = [f"benchmark query {i}" for i in range(args.searches)]
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        cold = await _search_round(client, queries, args.concurrency)
+        warm = await _search_round(client, queries, args.concurrency)
+
+    print(f"\n{args.searches} searches, concurrency {args.concurrency}, "
+          f"simulated upstream latency {args.latency_ms:.0f} ms")
+    print(f"Upstream requests: {fake_places_app.state.requests}")
+    print(f"{'':16}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for label, samples in (("cold details", cold), ("warm details", warm)):
+        print(f"{label:16}{len(samples):>6}{percentile(samples, 50):>10.1f}"
+              f"{percentile(samples, 95):>10.1f}{max(samples, default=0):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    fake_places_app.state.latency_ms = args.latency_ms
+    with serve_in_thread(fake_places_app, name="fake-places") as places_url:
+        env = {"GOOGLE_PLACES_BASE_URL": places_url, "GOOGLE_API_KEY": "fake-key"}
+        with local_api_server(env=env) as base_url:
+            asyncio.run(_run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Category vector storage: memory, scoring latency and ranking stability per dtype
+
+Builds the Yelp user and restaurant matrices the category engine scores
+against, then for float64/float32/float16/int8 reports bytes, the time of
+one full scoring pass, top-k overlap with float64 and score error. Queries
+are a sample of the Yelp user vectors, like the profiles the engine scores.
+
+    python -m benchmarks.quantization --businesses 20000 --yelp-users 200000
+    python -m benchmarks.quantization --data-dir data_extraction   # the real Yelp-derived files
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from .local_server import BE_DIR, percentile  # noqa: F401 — puts BE/ on sys.path
+from .synthetic_data import category_review_index_from, generate_catalog_and_reviews, liked_businesses
+
+from Vectorization.quantize import VECTOR_DTYPES, QuantizedMatrix, quantization_report
+from Vectorization.vectorize import build_restaurant_matrix, build_yelp_user_matrix, cat_to_index
+
+
+def _scoring_ms(matrix: QuantizedMatrix, queries: np.ndarray) -> float:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        matrix.scores(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return percentile(latencies, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="read complete_business_index.json / category_review_index.json here")
+    parser.add_argument("--businesses", type=int, default=20000)
+    parser.add_argument("--yelp-users", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.data_dir:
+        with open(os.path.join(args.data_dir, "complete_business_index.json"), encoding="utf-8") as f:
+            business_index = json.load(f)
+        with open(os.path.join(args.data_dir, "category_review_index.json"), encoding="utf-8") as f:
+            category_review_index = json.load(f)
+    else:
+        business_index, _, reviews = generate_catalog_and_reviews(args.businesses, args.yelp_users, args.seed)
+        category_review_index = category_review_index_from(liked_businesses(reviews), business_index)
+
+    _, users = build_yelp_user_matrix(category_review_index, cat_to_index)
+    _, restaurants = build_restaurant_matrix(business_index, cat_to_index)
+    rng = np.random.default_rng(args.seed)
+    queries = users[rng.choice(len(users), min(args.queries, len(users)), replace=False)]
+
+    for name, matrix in (("yelp users", users), ("restaurants", restaurants)):
+        print(f"\n{name}: {matrix.shape[0]} x {matrix.shape[1]}, top {args.top_k}, {len(queries)} queries")
+        print(f"{'dtype':9}{'MB':>9}{'score ms':>10}{'overlap':>9}{'min ovl':>9}{'max err':>10}{'mean err':>10}")
+        for row in quantization_report(matrix, queries, k=args.top_k, dtypes=VECTOR_DTYPES):
+            ms = _scoring_ms(QuantizedMatrix.from_dense(matrix, row["dtype"]), queries)
+            print(f"{row['dtype']:9}{row['bytes'] / 1e6:>9.2f}{ms:>10.2f}{row['topk_overlap']:>9.3f}"
+                  f"{row['min_topk_overlap']:>9.3f}{row['max_abs_error']:>10.2e}{row['mean_abs_error']:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
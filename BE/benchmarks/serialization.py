@@ -0,0 +1,91 @@
+"""
+Recommendation response serialization: per-request dicts vs cached fragments
+
+Formats the same ranked top-k list both ways and checks the decoded output
+is identical:
+
+  dicts      build an item dict per result (name lookup, rounded score,
+             reason string), then jsonable_encoder + JSONResponse
+  fragments  splice pre-encoded per-business JSON around the scores,
+             rendered by FastJSONResponse
+
+    python -m benchmarks.serialization --businesses 50000 --top-k 20
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from .local_server import BE_DIR  # noqa: F401 — puts BE/ on sys.path
+from .synthetic_data import write_synthetic_indexes
+
+
+def _dict_response(ranked, business_index, business_names, render):
+    recommendations = []
+    for business_id, score in ranked:
+        categories = business_index[business_id]
+        recommendations.append({
+            "business_id": business_id,
+            "name":        business_names.get(business_id, f"Restaurant {business_id[:8]}..."),
+            "score":       round(float(score), 4),
+            "categories":  categories,
+            "reason":      f"Based on your preferences for {', '.join(categories[:2])}",
+        })
+    return render({"success": True, "total_recommendations": len(recommendations),
+                   "recommendations": recommendations})
+
+
+def _time_per_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--businesses", type=int, default=50000)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[10, 20, 50])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    data_dir = write_synthetic_indexes(tempfile.mkdtemp(prefix="food-rec-data-"), args.businesses, 1000)
+    os.environ["RECOMMENDATION_DATA_DIR"] = data_dir
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(data_dir, "unused.db"))
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from api import recommendation_routes as rec
+    from api.fast_json import FastJSONResponse
+
+    build_start = time.perf_counter()
+    rec.load_indexes()
+    print(f"response_fragments phase: {rec.index_progress.phases['response_fragments']['seconds']}s "
+          f"(total load {time.perf_counter() - build_start:.2f}s)")
+
+    def old_render(content):
+        return JSONResponse(jsonable_encoder(content)).body
+
+    def new_render(top):
+        return FastJSONResponse({"success": True, "total_recommendations": len(top),
+                                 "recommendations": rec.format_recommendations(top)}).body
+
+    rng = random.Random(0)
+    ids = list(rec._business_index)
+    print(f"\n{'top_k':>6}{'dicts us':>12}{'fragments us':>15}{'speedup':>10}")
+    for top_k in args.top_k:
+        top = [(bid, rng.random()) for bid in rng.sample(ids, top_k)]
+        old = _dict_response(top, rec._business_index, rec._business_names, old_render)
+        new = new_render(top)
+        assert json.loads(old) == json.loads(new), "fragment output differs from the dict path"
+
+        old_us = _time_per_call(lambda: _dict_response(top, rec._business_index, rec._business_names, old_render),
+                                args.repeat)
+        new_us = _time_per_call(lambda: new_render(top), args.repeat)
+        print(f"{top_k:>6}{old_us:>12.1f}{new_us:>15.1f}{old_us / new_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Synthetic stand-ins for the Yelp-derived index files
+
+Writes the files `load_indexes()` reads (same shapes as the real ones
+produced by data_extraction/) so the API can be benchmarked without the
+Yelp dataset. Point RECOMMENDATION_DATA_DIR at the output directory.
+
+    python -m benchmarks.synthetic_data /tmp/food-rec-data --businesses 20000 --yelp-users 50000
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+from .local_server import BE_DIR  # noqa: F401 — puts BE/ on sys.path
+
+from Vectorization.vectorize import FOOD_CATEGORIES, vocabulary, build_restaurant_matrix, build_yelp_user_matrix
+from Vectorization.vocabulary import VOCABULARY_FILENAME
+from Vectorization.cooccurrence import build_cooccurrence, COOCCURRENCE_FILENAME
+from Vectorization.als import train_als, ALS_FILENAME
+from Vectorization.popularity import build_popularity, POPULARITY_FILENAME
+from Vectorization.clusters import build_taste_clusters, TASTE_CLUSTERS_FILENAME
+
+# Same line format as yelp_academic_dataset_review.json (only the fields the pipeline reads)
+REVIEWS_FILENAME = "yelp_academic_dataset_review.json"
+
+# (city, state, lat, lng) centers businesses are scattered around
+CITIES = [
+    ("Philadelphia", "PA", 39.95, -75.16),
+    ("Tampa", "FL", 27.95, -82.46),
+    ("Nashville", "TN", 36.16, -86.78),
+    ("Tucson", "AZ", 32.22, -110.97),
+    ("Edmonton", "AB", 53.55, -113.49),
+]
+
+
+def business_ids(n_businesses: int) -> list:
+    return [f"synthetic-{i:07d}" for i in range(n_businesses)]
+
+
+def generate_catalog_and_reviews(n_businesses: int = 5000, n_yelp_users: int = 20000, seed: int = 0,
+                                 reviews_per_user: int = 8) -> Tuple[dict, dict, list]:
+    """
+    Synthetic businesses and Yelp reviews: (business_index, home_city, reviews).
+
+    Yelp users get a home city and a few favourite categories, and mostly
+    review (highly) businesses matching both. `reviews` holds
+    (user_id, business_id, stars) in review order.
+    """
+    rng = random.Random(seed)
+    categories = sorted(FOOD_CATEGORIES)
+
+    # A few popular categories dominate, like in the real data
+    weights = [1.0 / (rank + 1) for rank in range(len(categories))]
+    business_index = {
+        bid: sorted(set(rng.choices(categories, weights=weights, k=rng.randint(1, 4))))
+        for bid in business_ids(n_businesses)
+    }
+    home_city = {bid: i % len(CITIES) for i, bid in enumerate(business_index)}
+    by_city_category: dict = {}
+    by_category: dict = {}
+    for bid, cats in business_index.items():
+        for cat in cats:
+            by_city_category.setdefault((home_city[bid], cat), []).append(bid)
+            by_category.setdefault(cat, []).append(bid)
+    all_ids = list(business_index)
+
+    def pick(candidates: list) -> str:
+        # Earlier businesses in each list are more popular
+        return candidates[min(int(rng.expovariate(5 / len(candidates))), len(candidates) - 1)]
+
+    reviews = []
+    for u in range(n_yelp_users):
+        user_id = f"yelp-user-{u:07d}"
+        city = rng.randrange(len(CITIES))
+        favourites = sorted(set(rng.choices(categories, weights=weights, k=rng.randint(1, 3))))
+        for _ in range(max(1, int(rng.expovariate(1 / reviews_per_user)))):
+            if rng.random() < 0.85:
+                cat = rng.choice(favourites)
+                bid = pick(by_city_category.get((city, cat)) or by_category.get(cat) or all_ids)
+                stars = rng.choice((4, 5, 5))
+            else:
+                bid, stars = rng.choice(all_ids), rng.randint(1, 5)
+            reviews.append((user_id, bid, stars))
+    return business_index, home_city, reviews
+
+
+def liked_businesses(reviews: list, min_stars: float = 4.0) -> Dict[str, List[str]]:
+    """user_id -> businesses they rated `min_stars` or more, in review order."""
+    liked: Dict[str, List[str]] = {}
+    for user_id, bid, stars in reviews:
+        if stars >= min_stars:
+            liked.setdefault(user_id, []).append(bid)
+    return liked
+
+
+def category_review_index_from(liked: Dict[str, List[str]], business_index: dict) -> dict:
+    """Category -> {user_id: liked reviews in that category}, like data_extraction builds it."""
+    index: dict = {}
+    for user_id, bids in liked.items():
+        for bid in bids:
+            for cat in business_index[bid]:
+                users = index.setdefault(cat, {})
+                users[user_id] = users.get(user_id, 0) + 1
+    return index
+
+
+def build_synthetic_taste_clusters(category_review_index: dict, business_index: dict, n_clusters: int = 256,
+                                   seed: int = 0):
+    _, user_vectors = build_yelp_user_matrix(category_review_index, vocabulary.index)
+    business_ids, restaurant_vectors = build_restaurant_matrix(business_index, vocabulary.index)
+    return build_taste_clusters(user_vectors, restaurant_vectors, business_ids, n_clusters=n_clusters, seed=seed,
+                                meta={"vocabulary_version": vocabulary.version})
+
+
+def write_synthetic_indexes(out_dir: str, n_businesses: int = 5000, n_yelp_users: int = 20000,
+                            seed: int = 0, reviews_per_user: int = 8, als_iterations: int = 8,
+                            taste_clusters: int = 256) -> str:
+    """
+    Generate the index files into `out_dir` and return it.
+
+    The category review index, taste clusters, co-occurrence index and ALS
+    embeddings are derived from the synthetic reviews the same way
+    data_extraction/ derives them from the real review file; the popularity lists from the business
+    file's stars and review counts.
+    """
+    rng = random.Random(seed + 1)
+    os.makedirs(out_dir, exist_ok=True)
+    business_index, home_city, reviews = generate_catalog_and_reviews(
+        n_businesses, n_yelp_users, seed, reviews_per_user
+    )
+    liked = liked_businesses(reviews)
+    category_review_index = category_review_index_from(liked, business_index)
+
+    vocabulary.save(os.path.join(out_dir, VOCABULARY_FILENAME))
+    build_cooccurrence(liked.values()).save(os.path.join(out_dir, COOCCURRENCE_FILENAME))
+    train_als(liked.values(), iterations=als_iterations).save(os.path.join(out_dir, ALS_FILENAME))
+    build_synthetic_taste_clusters(category_review_index, business_index, taste_clusters).save(
+        os.path.join(out_dir, TASTE_CLUSTERS_FILENAME)
+    )
+    with open(os.path.join(out_dir, "complete_business_index.json"), "w", encoding="utf-8") as f:
+        json.dump(business_index, f)
+    with open(os.path.join(out_dir, "category_review_index.json"), "w", encoding="utf-8") as f:
+        json.dump(category_review_index, f)
+    with open(os.path.join(out_dir, REVIEWS_FILENAME), "w", encoding="utf-8") as f:
+        for user_id, bid, stars in reviews:
+            f.write(json.dumps({"user_id": user_id, "business_id": bid, "stars": float(stars)}) + "\n")
+    popularity_rows = []
+    with open(os.path.join(out_dir, "yelp_business_food_only.jsonl"), "w", encoding="utf-8") as f:
+        for i, (bid, cats) in enumerate(business_index.items()):
+            city, state, lat, lng = CITIES[home_city[bid]]
+            stars, review_count = rng.randint(2, 10) / 2, rng.randint(5, 2000)
+            popularity_rows.append((bid, city, cats, stars, review_count))
+            f.write(json.dumps({
+                "business_id":  bid,
+                "name":         f"Synthetic Eatery {i}",
+                "city":         city,
+                "state":        state,
+                "latitude":     round(lat + rng.uniform(-0.2, 0.2), 6),
+                "longitude":    round(lng + rng.uniform(-0.2, 0.2), 6),
+                "stars":        stars,
+                "review_count": review_count,
+                "categories":   ", ".join(cats),
+            }) + "\n")
+    build_popularity(popularity_rows).save(os.path.join(out_dir, POPULARITY_FILENAME))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--businesses", type=int, default=5000)
+    parser.add_argument("--yelp-users", type=int, default=20000)
+    parser.add_argument("--reviews-per-user", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_indexes(args.out_dir, args.businesses, args.yelp_users, args.seed, args.reviews_per_user)
+    print(f"Wrote synthetic indexes to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,34 @@
 import json
-from os import getcwd
+import os
+import sys
 from buisiness_cleaning import FOOD_CATEGORIES
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Vectorization")))
+from vocabulary import CategoryVocabulary, VOCABULARY_FILENAME
+from cooccurrence import build_cooccurrence, COOCCURRENCE_FILENAME
+from als import train_als, ALS_FILENAME
+from popularity import build_popularity, POPULARITY_FILENAME
+from clusters import build_taste_clusters, TASTE_CLUSTERS_FILENAME
+from vectorize import vocabulary, build_yelp_user_matrix, build_restaurant_matrix
+
 # ---------------- CONFIG ----------------
 INPUT_PATH = "yelp_business_food_only.jsonl"
 INPUT_PATH_REVIEWS = "Yelp-JSON/yelp_academic_dataset_review.json" 
 INPUT_PATH_BUSINESS_INDEX = "complete_business_index.json"
 OUTPUT_DIR = "."
 BUFFER_SIZE = 15_000
+LIKED_MIN_STARS = 4.0
+COOCCURRENCE_TOP_N = 50         # neighbors kept per business
+COOCCURRENCE_MIN_SUPPORT = 2    # users who must like both businesses
+ALS_FACTORS = 32
+ALS_ITERATIONS = 10
+ALS_REGULARIZATION = 0.1
+ALS_ALPHA = 10.0                # confidence of a liked review over an unobserved pair
+POPULARITY_TOP_N = 200          # businesses kept per popularity list
+POPULARITY_PRIOR_COUNT = 25     # pseudo-reviews at the mean rating added to every business
+TASTE_CLUSTERS = 256            # k-means clusters over the Yelp user vectors
+TASTE_CLUSTER_LIST_SIZE = 500   # ranked businesses kept per cluster
+TASTE_CLUSTER_ITERATIONS = 20
 # ----------------------------------------
 
 def build_reviews_indexes():
@@ -52,7 +73,84 @@ def build_reviews_indexes():
     if category_reviews_index:
         write_category_review_index(sorted_index)
             
-            
+
+
+def read_liked_businesses():
+    """uid -> [bid, ...] of the food businesses each user rated LIKED_MIN_STARS or higher."""
+    with open(INPUT_PATH_BUSINESS_INDEX, "r", encoding="utf-8") as file:
+        business_index = json.load(file)
+    # Reuse the index's key objects so millions of review rows don't each hold a copy of the id
+    canonical_ids = {bid: bid for bid in business_index}
+
+    liked = {}
+    with open(INPUT_PATH_REVIEWS, "r", encoding="utf-8") as file:
+        for line in file:
+            review = json.loads(line)
+            bid = canonical_ids.get(review.get("business_id"))
+            if bid is None or (review.get("stars") or 0) < LIKED_MIN_STARS:
+                continue
+            liked.setdefault(review.get("user_id"), []).append(bid)
+    return liked
+
+
+def build_cooccurrence_index(liked=None):
+    # Business-business similarity from users who rated both highly, top-N pruned
+    liked = liked if liked is not None else read_liked_businesses()
+    index = build_cooccurrence(
+        liked.values(), top_n=COOCCURRENCE_TOP_N, min_support=COOCCURRENCE_MIN_SUPPORT
+    )
+    index.save(f"{OUTPUT_DIR}/{COOCCURRENCE_FILENAME}")
+    print(f"Co-occurrence index: {len(index)} businesses, {len(index.neighbors)} neighbor entries")
+
+
+def build_als_embeddings(liked=None):
+    # Latent business factors from the user x business liked matrix (business side only)
+    liked = liked if liked is not None else read_liked_businesses()
+    embeddings = train_als(
+        liked.values(), factors=ALS_FACTORS, reg=ALS_REGULARIZATION,
+        alpha=ALS_ALPHA, iterations=ALS_ITERATIONS,
+    )
+    embeddings.save(f"{OUTPUT_DIR}/{ALS_FILENAME}")
+    print(f"ALS embeddings: {len(embeddings)} businesses x {embeddings.factors} factors")
+
+
+def build_popularity_lists():
+    # Cold-start rankings by shrunk Yelp stars: global, per city and per category
+    with open(INPUT_PATH_BUSINESS_INDEX, "r", encoding="utf-8") as file:
+        business_index = json.load(file)
+
+    rows = []
+    with open(INPUT_PATH, "r", encoding="utf-8") as file:
+        for line in file:
+            business = json.loads(line)
+            bid = business.get("business_id")
+            if bid in business_index:
+                rows.append((bid, business.get("city"), business_index[bid],
+                             business.get("stars"), business.get("review_count")))
+
+    lists = build_popularity(rows, top_n=POPULARITY_TOP_N, prior_count=POPULARITY_PRIOR_COUNT)
+    lists.save(f"{OUTPUT_DIR}/{POPULARITY_FILENAME}")
+    print(f"Popularity lists: {len(lists.by_city)} cities, {len(lists.by_category)} categories")
+
+
+def build_taste_clusters_index():
+    # k-means taste clusters of the Yelp user vectors, each with its precomputed business ranking
+    with open(INPUT_PATH_BUSINESS_INDEX, "r", encoding="utf-8") as file:
+        business_index = json.load(file)
+    with open(f"{OUTPUT_DIR}/category_review_index.json", "r", encoding="utf-8") as file:
+        category_review_index = json.load(file)
+
+    _, user_vectors = build_yelp_user_matrix(category_review_index, vocabulary.index)
+    business_ids, restaurant_vectors = build_restaurant_matrix(business_index, vocabulary.index)
+    clusters = build_taste_clusters(
+        user_vectors, restaurant_vectors, business_ids, n_clusters=TASTE_CLUSTERS,
+        list_size=TASTE_CLUSTER_LIST_SIZE, iterations=TASTE_CLUSTER_ITERATIONS,
+        meta={"vocabulary_version": vocabulary.version},
+    )
+    clusters.save(f"{OUTPUT_DIR}/{TASTE_CLUSTERS_FILENAME}")
+    print(f"Taste clusters: {len(clusters)} clusters over {len(user_vectors)} Yelp users")
+
+
 def build_indexes():
     complete_business_index = {}
     category_index = {}   # category -> [bid(city,state), ...]
@@ -150,8 +248,18 @@ def write_complete_business_index(index):
     with open(path, 'w', encoding='utf-8') as out:
         json.dump(index, out, indent=4)
 
+def write_category_vocabulary():
+    # Ordered category list (and its version) that every vector artifact is built against
+    CategoryVocabulary(FOOD_CATEGORIES).save(f"{OUTPUT_DIR}/{VOCABULARY_FILENAME}")
+
 
 # ---------------- RUN ----------------
 if __name__ == "__main__":
+    write_category_vocabulary()
     build_indexes()
     build_reviews_indexes()
+    build_taste_clusters_index()
+    build_popularity_lists()
+    liked = read_liked_businesses()
+    build_cooccurrence_index(liked)
+    build_als_embeddings(liked)
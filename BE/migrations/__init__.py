@@ -0,0 +1,88 @@
+"""
+Plain-SQL schema migrations
+
+Each `mNNNN_*.py` module in this package defines:
+
+    VERSION       ordered id, e.g. "0001"
+    DESCRIPTION   one line shown by `status`
+    OPTIONAL      True if it only runs with --include-optional
+    DIALECTS      dialect names it applies to (None = all)
+    upgrade(conn) / downgrade(conn)
+
+Applied versions are recorded in the `schema_migrations` table. Run with:
+
+    python -m migrations status|upgrade|downgrade [--include-optional]
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import text
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def discover() -> List:
+    """All migration modules in version order."""
+    modules = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("m") and info.name[1:5].isdigit()
+    ]
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def _applies_to(migration, dialect: str) -> bool:
+    return migration.DIALECTS is None or dialect in migration.DIALECTS
+
+
+def _ensure_table(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            " version VARCHAR(32) PRIMARY KEY,"
+            " description VARCHAR(255),"
+            " applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_versions(engine) -> set:
+    _ensure_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def upgrade(engine, include_optional: bool = False, target: str = None) -> List[str]:
+    """Apply pending migrations (up to `target`, inclusive); returns the versions applied."""
+    done = applied_versions(engine)
+    applied = []
+    for migration in discover():
+        if target is not None and migration.VERSION > target:
+            break
+        if migration.VERSION in done or not _applies_to(migration, engine.dialect.name):
+            continue
+        if migration.OPTIONAL and not include_optional:
+            continue
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": migration.VERSION, "d": migration.DESCRIPTION, "t": datetime.utcnow()},
+            )
+        applied.append(migration.VERSION)
+    return applied
+
+
+def downgrade(engine, target: str) -> List[str]:
+    """Revert applied migrations newer than `target`; returns the versions reverted."""
+    done = applied_versions(engine)
+    reverted = []
+    for migration in reversed(discover()):
+        if migration.VERSION <= target or migration.VERSION not in done:
+            continue
+        with engine.begin() as conn:
+            migration.downgrade(conn)
+            conn.execute(text(f"DELETE FROM {MIGRATIONS_TABLE} WHERE version = :v"), {"v": migration.VERSION})
+        reverted.append(migration.VERSION)
+    return reverted
@@ -0,0 +1,60 @@
+"""
+Command line entry point: python -m migrations status|upgrade|downgrade|partitions
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from . import _applies_to, applied_versions, discover, downgrade, upgrade
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to DATABASE_URL")
+    parser.add_argument("command", choices=["status", "upgrade", "downgrade", "partitions"])
+    parser.add_argument("--target", help="upgrade up to / downgrade back to this version")
+    parser.add_argument("--include-optional", action="store_true",
+                        help="also apply optional migrations (e.g. user_clicks partitioning)")
+    parser.add_argument("--months-ahead", type=int, default=3,
+                        help="partitions: how many future monthly partitions to keep created")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        sys.exit("DATABASE_URL is not set")
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    engine = create_engine(database_url)
+
+    if args.command == "status":
+        done = applied_versions(engine)
+        for migration in discover():
+            if migration.VERSION in done:
+                state = "applied"
+            elif not _applies_to(migration, engine.dialect.name):
+                state = "n/a"
+            else:
+                state = "pending"
+            extra = " (optional)" if migration.OPTIONAL else ""
+            print(f"{migration.VERSION}  {state:8} {migration.DESCRIPTION}{extra}")
+    elif args.command == "upgrade":
+        applied = upgrade(engine, include_optional=args.include_optional, target=args.target)
+        print(f"Applied: {', '.join(applied) or 'nothing to do'}")
+    elif args.command == "downgrade":
+        if not args.target:
+            sys.exit("downgrade needs --target (use 0000 to revert everything)")
+        reverted = downgrade(engine, args.target)
+        print(f"Reverted: {', '.join(reverted) or 'nothing to do'}")
+    elif args.command == "partitions":
+        from .m0002_partition_user_clicks import ensure_monthly_partitions
+        with engine.begin() as conn:
+            created = ensure_monthly_partitions(conn, months_ahead=args.months_ahead)
+        print(f"Created partitions: {', '.join(created) or 'none needed'}")
+
+
+if __name__ == "__main__":
+    main()
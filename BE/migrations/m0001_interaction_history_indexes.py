@@ -0,0 +1,33 @@
+"""
+Composite (user_id, timestamp DESC) indexes for the interaction tables.
+
+Every history query filters on user_id and orders by the event time with a
+LIMIT; with these indexes the planner reads the newest rows straight off the
+index instead of sorting the user's whole history. The old single-column
+user_id indexes become redundant (user_id is the leading column) and are dropped.
+"""
+from sqlalchemy import text
+
+VERSION = "0001"
+DESCRIPTION = "Composite (user_id, time DESC) indexes on user_clicks, user_swipes, user_location"
+OPTIONAL = False
+DIALECTS = None
+
+# table, timestamp column, new index, old single-column index
+INDEXES = [
+    ("user_clicks",   "clicked_at",  "ix_user_clicks_user_id_clicked_at",    "ix_user_clicks_user_id"),
+    ("user_swipes",   "swiped_at",   "ix_user_swipes_user_id_swiped_at",     "ix_user_swipes_user_id"),
+    ("user_location", "recorded_at", "ix_user_location_user_id_recorded_at", "ix_user_location_user_id"),
+]
+
+
+def upgrade(conn):
+    for table, column, index, old_index in INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (user_id, {column} DESC)"))
+        conn.execute(text(f"DROP INDEX IF EXISTS {old_index}"))
+
+
+def downgrade(conn):
+    for table, column, index, old_index in INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {old_index} ON {table} (user_id)"))
+        conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
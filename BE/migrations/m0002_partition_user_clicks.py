@@ -0,0 +1,113 @@
+"""
+Optional monthly range partitioning of user_clicks on clicked_at (PostgreSQL only).
+
+The table is rebuilt as `PARTITION BY RANGE (clicked_at)` with one partition
+per calendar month plus a DEFAULT partition, and existing rows are copied
+over. Old months can then be detached or dropped cheaply, and recent-history
+queries only touch the newest partitions. The primary key becomes
+(id, clicked_at), because PostgreSQL requires the partition key in every
+unique constraint.
+
+Keep future partitions created ahead of time, e.g. from a daily cron:
+
+    python -m migrations partitions --months-ahead 3
+"""
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+
+VERSION = "0002"
+DESCRIPTION = "Partition user_clicks by month on clicked_at (PostgreSQL)"
+OPTIONAL = True
+DIALECTS = {"postgresql"}
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"user_clicks_{month:%Y_%m}"
+
+
+def _create_partition(conn, month: date) -> str:
+    name = _partition_name(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF user_clicks "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+def ensure_monthly_partitions(conn, months_ahead: int = 3, start: date = None) -> List[str]:
+    """Create monthly partitions from `start` (default: this month) through months_ahead; returns new ones."""
+    existing = {
+        row[0] for row in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'user_clicks'"
+        ))
+    }
+    month = _month_start(start or date.today())
+    last = _add_months(_month_start(date.today()), months_ahead)
+    created = []
+    while month <= last:
+        if _partition_name(month) not in existing:
+            created.append(_create_partition(conn, month))
+        month = _add_months(month, 1)
+    return created
+
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE user_clicks RENAME TO user_clicks_unpartitioned"))
+    conn.execute(text("ALTER INDEX IF EXISTS ix_user_clicks_user_id_clicked_at RENAME TO ix_user_clicks_unpartitioned_user_time"))
+    conn.execute(text("ALTER INDEX IF EXISTS ix_user_clicks_id RENAME TO ix_user_clicks_unpartitioned_id"))
+    conn.execute(text(
+        "CREATE TABLE user_clicks ("
+        " id UUID NOT NULL,"
+        " user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,"
+        " business_id VARCHAR(100) NOT NULL,"
+        " lat DOUBLE PRECISION,"
+        " lng DOUBLE PRECISION,"
+        " clicked_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),"
+        " PRIMARY KEY (id, clicked_at)"
+        ") PARTITION BY RANGE (clicked_at)"
+    ))
+    conn.execute(text("CREATE INDEX ix_user_clicks_user_id_clicked_at ON user_clicks (user_id, clicked_at DESC)"))
+    conn.execute(text("CREATE INDEX ix_user_clicks_id ON user_clicks (id)"))
+    conn.execute(text("CREATE TABLE user_clicks_default PARTITION OF user_clicks DEFAULT"))
+
+    oldest = conn.execute(text("SELECT min(clicked_at) FROM user_clicks_unpartitioned")).scalar()
+    ensure_monthly_partitions(conn, months_ahead=3, start=oldest.date() if oldest else None)
+
+    conn.execute(text(
+        "INSERT INTO user_clicks (id, user_id, business_id, lat, lng, clicked_at) "
+        "SELECT id, user_id, business_id, lat, lng, coalesce(clicked_at, now()) FROM user_clicks_unpartitioned"
+    ))
+    conn.execute(text("DROP TABLE user_clicks_unpartitioned"))
+
+
+def downgrade(conn):
+    conn.execute(text("ALTER TABLE user_clicks RENAME TO user_clicks_partitioned"))
+    conn.execute(text("ALTER INDEX ix_user_clicks_user_id_clicked_at RENAME TO ix_user_clicks_partitioned_user_time"))
+    conn.execute(text("ALTER INDEX ix_user_clicks_id RENAME TO ix_user_clicks_partitioned_id"))
+    conn.execute(text(
+        "CREATE TABLE user_clicks ("
+        " id UUID PRIMARY KEY,"
+        " user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,"
+        " business_id VARCHAR(100) NOT NULL,"
+        " lat DOUBLE PRECISION,"
+        " lng DOUBLE PRECISION,"
+        " clicked_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()"
+        ")"
+    ))
+    conn.execute(text("CREATE INDEX ix_user_clicks_user_id_clicked_at ON user_clicks (user_id, clicked_at DESC)"))
+    conn.execute(text("CREATE INDEX ix_user_clicks_id ON user_clicks (id)"))
+    conn.execute(text("INSERT INTO user_clicks SELECT id, user_id, business_id, lat, lng, clicked_at FROM user_clicks_partitioned"))
+    conn.execute(text("DROP TABLE user_clicks_partitioned"))
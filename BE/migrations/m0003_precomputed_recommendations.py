@@ -0,0 +1,32 @@
+"""
+precomputed_recommendations: one ranked list per user, written by the batch job.
+
+`python -m api.precompute` ranks every user with click history and replaces
+their row; the API serves the row when no click or swipe is newer than its
+generated_at, and ranks online otherwise.
+"""
+from sqlalchemy import text
+
+VERSION = "0003"
+DESCRIPTION = "precomputed_recommendations table for the nightly batch job"
+OPTIONAL = False
+DIALECTS = None
+
+
+def upgrade(conn):
+    uuid_type = "UUID" if conn.dialect.name == "postgresql" else "CHAR(32)"
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS precomputed_recommendations ("
+        f" user_id {uuid_type} PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,"
+        " engine VARCHAR(32) NOT NULL,"
+        " diversity FLOAT NOT NULL,"
+        " top_k INTEGER NOT NULL,"
+        " recommendations TEXT NOT NULL,"
+        " click_count INTEGER NOT NULL,"
+        " swipe_count INTEGER NOT NULL,"
+        " generated_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def downgrade(conn):
+    conn.execute(text("DROP TABLE IF EXISTS precomputed_recommendations"))
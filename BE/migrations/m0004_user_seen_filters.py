@@ -0,0 +1,30 @@
+"""
+user_seen_filters: one Bloom filter per user of every business they clicked or swiped.
+
+Rows are created on the user's next click or swipe, from their full history,
+and updated incrementally after that; ranking excludes what the filter holds.
+"""
+from sqlalchemy import text
+
+VERSION = "0004"
+DESCRIPTION = "user_seen_filters table for full-history exclusion"
+OPTIONAL = False
+DIALECTS = None
+
+
+def upgrade(conn):
+    postgres = conn.dialect.name == "postgresql"
+    uuid_type = "UUID" if postgres else "CHAR(32)"
+    binary_type = "BYTEA" if postgres else "BLOB"
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS user_seen_filters ("
+        f" user_id {uuid_type} PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,"
+        f" bits {binary_type} NOT NULL,"
+        " hashes INTEGER NOT NULL,"
+        " item_count INTEGER NOT NULL,"
+        " updated_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def downgrade(conn):
+    conn.execute(text("DROP TABLE IF EXISTS user_seen_filters"))